@@ -0,0 +1,145 @@
+import unittest
+
+from monkey import objects
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator, NULL
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+def run(input: str) -> objects.Object:
+    return Evaluator().eval(parse(input), Environment())
+
+
+PROGRAMS = [
+    "[1, 2 * 2, 3 + 3]",
+    "[]",
+    "[1, 2, 3][0] + [1, 2, 3][2]",
+    "let i = 0; [1][i]",
+    "let a = [1, 2, 3]; a[0] + a[1] + a[2]",
+    "let a = [1, 2, 3]; let i = a[0]; a[i]",
+    "[1, 2, 3][3]",
+    "[1, 2, 3][-1]",
+    "[\"a\", true, [1]][2][0]",
+    "{\"one\": 1, \"two\": 2}[\"two\"]",
+    "let key = \"k\"; {key: 5, true: 6, 4: 7}[\"k\"]",
+    "{true: 6, 4: 7}[4] + {true: 6}[true]",
+    "{\"a\": 1}[\"b\"]",
+    "{}[\"a\"]",
+    "let double = fn(x) { x * 2 }; [double(1), double(2)][1]",
+    "let f = fn(a) { if (len(a) == 0) { 0 } else { first(a) + f(rest(a)) } }; f([1, 2, 3, 4])",
+    "sum(push(range(5), 10))",
+    "last(sort([3, 1, 2]))",
+    "sum(map(range(10), fn(x) { x * x }))",
+    "len(filter(range(10), fn(x) { x / 2 * 2 == x }))",
+    "[1, 2][\"a\"]",
+    "{fn(x) { x }: 1}",
+    "{\"a\": 1}[[1]]",
+    "1[0]",
+    "map([1, \"a\"], fn(x) { x + 1 })",
+    "let a = [1, 2, 3]; let b = set(a, 1, \"two\"); [a, b]",
+    "let h = {\"a\": 1}; let g = set(set(h, \"b\", 2), \"a\", 3); [h, g, len(push([], g))]",
+    "let build = fn(i, acc) { if (i == 100) { acc } else { build(i + 1, push(acc, i * i)) } }; let a = build(0, []); a[99] + len(a)",
+    "let build = fn(i, h) { if (i == 100) { h } else { build(i + 1, set(h, i, i * i)) } }; build(0, {})[99]",
+]
+
+
+class ArrayTest(unittest.TestCase):
+    def test_integer_arrays_are_stored_compactly(self):
+        array = run("[1, 2, 3]")
+        assert array.ints is not None and list(array.ints) == [1, 2, 3]
+        assert array.inspect() == "[1, 2, 3]"
+
+        for input in ["[1, \"a\"]", "[1, 9223372036854775808]", "push(range(3), true)"]:
+            assert run(input).ints is None, input
+
+        assert run("push(range(3), true)").inspect() == "[0, 1, 2, True]"
+
+    def test_elements_of_compact_arrays_are_integers(self):
+        assert run("range(2, 5)[1]").value == 3
+        assert run("first(range(2, 5))").value == 2
+        assert run("rest(range(2, 5))").inspect() == "[3, 4]"
+        assert run("let a = range(3); push(a, 3); a").inspect() == "[0, 1, 2]"
+
+    def test_hash_inspect(self):
+        assert run("{\"one\": 1, 2: true}").inspect() == "{one: 1, 2: True}"
+        assert run("set(set({\"b\": 1, \"a\": 2}, \"c\", 3), \"b\", 4)").inspect() == "{b: 4, a: 2, c: 3}"
+        assert run("{\"a\": 1, \"a\": 2}").inspect() == "{a: 2}"
+
+    def test_updates_share_structure(self):
+        env = Environment()
+        Evaluator().eval(parse("let a = push(range(100), 100); let b = push(a, 101); let c = set(b, 0, -1);"), env)
+        a, b, c = env.get("a"), env.get("b"), env.get("c")
+
+        assert (len(a), len(b), len(c)) == (101, 102, 102)
+        assert a.elements.root[0] is b.elements.root[0]
+        assert c.elements.root[1] is b.elements.root[1]
+        assert a.get(0).value == 0 and c.get(0).value == -1
+
+    def test_rest_shares_structure(self):
+        env = Environment()
+        Evaluator().eval(parse("let a = push(range(100), true); let b = rest(rest(a)); let c = set(push(b, 7), 0, 1); let i = rest(sort([3, 1, 2]));"), env)
+        a, b, c, i = env.get("a"), env.get("b"), env.get("c"), env.get("i")
+
+        assert b.elements.root is a.elements.root
+        assert b.inspect() == "[" + ", ".join(map(str, range(2, 100))) + ", True]"
+        assert c.get(0).value == 1 and c.get(98).inspect() == "True" and c.get(99).value == 7
+        assert type(i.ints) is memoryview and i.inspect() == "[2, 3]"
+        assert run("let f = fn(a) { if (len(a) == 0) { 0 } else { first(a) + f(rest(a)) } }; f(rest(sort([3, 1, 2])))").value == 5
+
+    def test_builtins(self):
+        tests = [
+            ("len([1, 2, 3])", 3),
+            ("len([])", 0),
+            ("len({1: 2, 3: 4})", 2),
+            ("sum(range(1000))", 499500),
+            ("sum([])", 0),
+            ("first([])", None),
+            ("last([1, 2])", 2),
+            ("rest([])", None),
+            ("len(range(0))", 0),
+            ("len(range(0 - 1, 9223372036854775806))", 9223372036854775807),
+            ("sort([\"b\", \"a\"])[0]", "a"),
+            ("filter([1, 2, 3], fn(x) { x > 1 })[0]", 2),
+        ]
+
+        for input, expected in tests:
+            result = run(input)
+            if expected is None:
+                assert result is NULL, input
+            else:
+                assert result.value == expected, input
+
+    def test_builtin_errors(self):
+        tests = [
+            ("first(1)", "argument to 'first' must be ARRAY or ITERATOR, got INTEGER"),
+            ("push([])", "wrong number of arguments, got=1, want=2"),
+            ("range(1, 2, 3)", "wrong number of arguments, got=3, want=1 or 2"),
+            ("sum([1, \"a\"])", "argument to 'sum' must be ARRAY of INTEGER, got STRING"),
+            ("sort([1, \"a\"])", "argument to 'sort' must be ARRAY of INTEGER or of STRING"),
+            ("map([1], fn(x, y) { x })", "wrong number of arguments: want=2, got=1"),
+            ("[1, 2][\"a\"]", "index operator not supported: ARRAY"),
+            ("{[1]: 2}", "unusable as hash key: ARRAY"),
+            ("set([1], 1, 2)", "index to 'set' out of range: 1"),
+            ("first(range(0 - 9223372036854775807, 9223372036854775807))", "range too long: 18446744073709551614 elements, at most 9223372036854775807"),
+            ("set([1], true, 2)", "index to 'set' must be INTEGER, got BOOLEAN"),
+            ("set({}, [], 2)", "unusable as hash key: ARRAY"),
+            ("set(1, 1, 2)", "argument to 'set' must be ARRAY or HASH, got INTEGER"),
+        ]
+
+        for input, expected in tests:
+            result = run(input)
+            assert result.type() == objects.ERROR_OBJ, input
+            assert result.message == expected, input
+
+    def test_engines_match_evaluator(self):
+        for engine in ["vm", "closure", "resolved", "stack", "native", "quick", "tiered", "exceptions", "flat", "pooled"]:
+            for input in PROGRAMS:
+                expected = run(input)
+                actual = Interpreter(engine).run(input)
+                assert (actual and actual.inspect()) == (expected and expected.inspect()), (engine, input)
@@ -0,0 +1,49 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import ENGINES, Interpreter
+
+
+# Tail-recursive arithmetic loop: every iteration does a comparison and three
+# integer operations, so wrapper objects dominate what gets allocated.
+LOOP = """
+let loop = fn(i, acc) {
+    if (i < 1) { acc } else { loop(i - 1, acc + i * 2) }
+};
+loop(%d, 0);
+"""
+
+
+def measure(engine: str, source: str) -> "tuple[float, int]":
+    interpreter = Interpreter(engine)
+    program = interpreter.parse(source)
+
+    start = time.perf_counter()
+    interpreter.engine.execute(program)
+    elapsed = time.perf_counter() - start
+
+    interpreter = Interpreter(engine)
+    tracemalloc.start()
+    try:
+        interpreter.engine.execute(program)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare boxed and unboxed values on an arithmetic loop")
+    arg_parser.add_argument("-n", type=int, default=50000)
+    arg_parser.add_argument("--engine", action="append", choices=list(ENGINES))
+    args = arg_parser.parse_args()
+
+    source = LOOP % args.n
+    for engine in args.engine or ["eval", "native"]:
+        elapsed, peak = measure(engine, source)
+        print(f"{engine:>8}: {elapsed * 1000:9.1f} ms  peak {peak / 1024:7.1f} KiB")
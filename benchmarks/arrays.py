@@ -0,0 +1,74 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey import objects
+from monkey.interpreter import Interpreter
+
+
+# The same reductions, once through the batched builtins and once as Monkey
+# loops over single elements.
+PROGRAMS = {
+    "sum": (
+        "sum(xs)",
+        "let loop = fn(i, acc) { if (i == n) { acc } else { loop(i + 1, acc + xs[i]) } }; loop(0, 0)",
+    ),
+    "sort": (
+        "sort(xs)[0]",
+        None,
+    ),
+    "map+sum": (
+        "sum(map(xs, fn(x) { x * 2 }))",
+        "let loop = fn(i, acc) { if (i == n) { acc } else { loop(i + 1, acc + xs[i] * 2) } }; loop(0, 0)",
+    ),
+    "filter+len": (
+        "len(filter(xs, fn(x) { x > n / 2 }))",
+        "let loop = fn(i, acc) { if (i == n) { acc } else { if (xs[i] > n / 2) { loop(i + 1, acc + 1) } else { loop(i + 1, acc) } } }; loop(0, 0)",
+    ),
+}
+
+
+def time_program(n: int, source: str) -> float:
+    interpreter = Interpreter("eval")
+    interpreter.run(f"let n = {n}; let xs = range(n);")
+    program = interpreter.parse(source)
+
+    start = time.perf_counter()
+    interpreter.engine.execute(program)
+    return time.perf_counter() - start
+
+
+def array_memory(n: int, compact: bool) -> int:
+    tracemalloc.start()
+    try:
+        if compact:
+            array = objects.Array.of_ints(range(n))
+        else:
+            array = objects.Array([objects.Integer(v) for v in range(n)])
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        del array
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Batched array builtins against per-element Monkey loops")
+    arg_parser.add_argument("-n", type=int, default=1000000, help="elements in the array")
+    arg_parser.add_argument("--loop-n", type=int, default=20000, help="elements for the per-element loops")
+    args = arg_parser.parse_args()
+
+    for name, (batched, loop) in PROGRAMS.items():
+        elapsed = time_program(args.n, batched)
+        line = f"{name:>10}: batched {elapsed * 1000:9.1f} ms for {args.n}"
+        if loop is not None:
+            looped = time_program(args.loop_n, loop)
+            line += f"  loop {looped * 1000:9.1f} ms for {args.loop_n} ({looped / args.loop_n * args.n * 1000:9.1f} ms scaled)"
+        print(line)
+
+    for compact in (False, True):
+        name = "array('q')" if compact else "Integer list"
+        print(f"{name:>12}: {array_memory(args.n, compact) / 1024:9.1f} KiB for {args.n} elements")
@@ -0,0 +1,56 @@
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import ENGINES, Interpreter
+
+
+# Each call to make() builds a large string it never lets escape and returns
+# a closure over prev and i only. The chain of closures stays reachable from
+# the global `chain`, so whatever each closure retains is kept alive too.
+# `pad + pad` alone would be a rope node sharing pad; using it as a hash key
+# reads its text, which gives big a new string of its own.
+CHAIN = """
+let pad = "%s";
+let make = fn(prev, i) {
+    let big = pad + pad;
+    let key = {big: i};
+    fn() { prev() + i }
+};
+let build = fn(n, acc) {
+    if (n == 0) { acc } else { build(n - 1, make(acc, n)) }
+};
+let chain = build(%d, fn() { 0 });
+"""
+
+
+def retained(engine: str, source: str) -> "tuple[int, int]":
+    interpreter = Interpreter(engine)
+    program = interpreter.parse(source)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        interpreter.engine.execute(program)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current, peak
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Memory kept alive by a chain of closures")
+    arg_parser.add_argument("-n", type=int, default=1000, help="closures in the chain")
+    arg_parser.add_argument("--pad", type=int, default=1024, help="characters in the padding string")
+    arg_parser.add_argument("--engine", action="append", choices=list(ENGINES))
+    args = arg_parser.parse_args()
+
+    source = CHAIN % ("x" * args.pad, args.n)
+    for engine in args.engine or ["eval", "flat"]:
+        current, peak = retained(engine, source)
+        print(f"{engine:>8}: retained {current / 1024:9.1f} KiB  peak {peak / 1024:9.1f} KiB")
@@ -0,0 +1,88 @@
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey import ast
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+
+
+class IsinstanceEvaluator(Evaluator):
+    # The isinstance chain Evaluator.eval used before the dispatch table,
+    # routed to the same handlers so only the dispatch cost differs.
+    def eval(self, node, env):
+        if isinstance(node, ast.Program):
+            return self.eval_program(node, env)
+        elif isinstance(node, ast.ExpressionStatement):
+            return self.eval_expression_statement(node, env)
+        elif isinstance(node, ast.IntegerLiteral):
+            return self.eval_integer_literal(node, env)
+        elif isinstance(node, ast.Boolean):
+            return self.eval_boolean_literal(node, env)
+        elif isinstance(node, ast.PrefixExpression):
+            return self.eval_prefix_node(node, env)
+        elif isinstance(node, ast.InfixExpression):
+            return self.eval_infix_node(node, env)
+        elif isinstance(node, ast.IfExpression):
+            return self.eval_if_expression(node, env)
+        elif isinstance(node, ast.BlockStatement):
+            return self.eval_block_statements(node, env)
+        elif isinstance(node, ast.ReturnStatement):
+            return self.eval_return_statement(node, env)
+        elif isinstance(node, ast.LetStatement):
+            return self.eval_let_statement(node, env)
+        elif isinstance(node, ast.Identifier):
+            return self.eval_identifier(node, env)
+        elif isinstance(node, ast.FunctionLiteral):
+            return self.eval_function_literal(node, env)
+        elif isinstance(node, ast.StringLiteral):
+            return self.eval_string_literal(node, env)
+        elif isinstance(node, ast.CallExpression):
+            return self.eval_call_expression(node, env)
+
+
+# One representative node per class; children are literals so the node's own
+# dispatch dominates.
+SAMPLES = [
+    ("Program", "1", lambda p: p),
+    ("ExpressionStatement", "1", lambda p: p.statements[0]),
+    ("IntegerLiteral", "1", lambda p: p.statements[0].expression),
+    ("Boolean", "true", lambda p: p.statements[0].expression),
+    ("PrefixExpression", "-1", lambda p: p.statements[0].expression),
+    ("InfixExpression", "1 + 2", lambda p: p.statements[0].expression),
+    ("IfExpression", "if (true) { 1 }", lambda p: p.statements[0].expression),
+    ("BlockStatement", "if (true) { 1 }", lambda p: p.statements[0].expression.consequence),
+    ("ReturnStatement", "return 1", lambda p: p.statements[0]),
+    ("LetStatement", "let a = 1", lambda p: p.statements[0]),
+    ("Identifier", "x", lambda p: p.statements[0].expression),
+    ("FunctionLiteral", "fn(a) { a }", lambda p: p.statements[0].expression),
+    ("StringLiteral", '"s"', lambda p: p.statements[0].expression),
+    ("CallExpression", "f()", lambda p: p.statements[0].expression),
+]
+
+
+def per_node_ns(evaluator: Evaluator, node: ast.Node, env: Environment, number: int) -> float:
+    timer = timeit.Timer(lambda: evaluator.eval(node, env))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e9
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    env = Environment()
+    env.set("x", Evaluator().eval(Parser(Lexer("1")).parse_program(), env))
+    env.set("f", Evaluator().eval(Parser(Lexer("fn() { 1 }")).parse_program(), env))
+
+    before = IsinstanceEvaluator()
+    after = Evaluator()
+
+    print(f"{'node':<22}{'isinstance':>12}{'table':>10}{'saved':>10}")
+    for name, source, pick in SAMPLES:
+        node = pick(Parser(Lexer(source)).parse_program())
+        old = per_node_ns(before, node, env, number)
+        new = per_node_ns(after, node, env, number)
+        print(f"{name:<22}{old:>10.0f}ns{new:>8.0f}ns{old - new:>8.0f}ns")
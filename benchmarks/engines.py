@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import ENGINES, Interpreter
+
+
+FIB = """
+let fib = fn(x) {
+    if (x < 2) { x } else { fib(x - 1) + fib(x - 2) }
+};
+fib(%d);
+"""
+
+
+def bench(engine: str, source: str, repeat: int, optimize: bool = False) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter(engine, optimize)
+        start = time.perf_counter()
+        interpreter.run(source)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare Monkey execution engines on fib(n)")
+    arg_parser.add_argument("-n", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--engine", action="append", choices=list(ENGINES))
+    arg_parser.add_argument("--optimize", action="store_true")
+    args = arg_parser.parse_args()
+
+    source = FIB % args.n
+    baseline = None
+    for engine in args.engine or list(ENGINES):
+        elapsed = bench(engine, source, args.repeat, args.optimize)
+        baseline = baseline or elapsed
+        print(f"{engine:>8}: {elapsed * 1000:9.1f} ms  ({baseline / elapsed:.2f}x)")
@@ -0,0 +1,65 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import ENGINES, Interpreter
+
+
+# Helper-heavy loop: every iteration calls two functions that create no
+# closures, so neither call's frame can outlive it.
+LOOP = """
+let add = fn(a, b) { a + b };
+let loop = fn(i, acc) {
+    if (i < 1) { acc } else { loop(i - 1, add(acc, i)) }
+};
+loop(%d, 0);
+"""
+
+# Non-tail recursion keeps one frame per level alive at the deepest point,
+# so the traced peak divided by the depth is what each active call holds.
+RECURSION = """
+let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } };
+sum(%d);
+"""
+
+
+def measure(engine: str, source: str) -> "tuple[float, int, object]":
+    interpreter = Interpreter(engine)
+    program = interpreter.parse(source)
+    # Warm up, so pooled frames are already there when tracing starts.
+    interpreter.engine.execute(program)
+
+    start = time.perf_counter()
+    interpreter.engine.execute(program)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        interpreter.engine.execute(program)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, interpreter.engine.evaluator
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Frame allocations of calls that cannot escape")
+    arg_parser.add_argument("-n", type=int, default=20000, help="loop iterations")
+    arg_parser.add_argument("--depth", type=int, default=50, help="recursion depth")
+    arg_parser.add_argument("--engine", action="append", choices=list(ENGINES))
+    args = arg_parser.parse_args()
+
+    calls = 2 * args.n + 1
+    for engine in args.engine or ["eval", "pooled"]:
+        elapsed, _, evaluator = measure(engine, LOOP % args.n)
+        _, peak, _ = measure(engine, RECURSION % args.depth)
+
+        allocated = getattr(evaluator, "allocated", None)
+        # Counts cover the warm-up, timed and traced runs.
+        frames = f"{allocated / (3 * calls):6.3f}" if allocated is not None else "     -"
+        print(f"{engine:>8}: {elapsed * 1000:9.1f} ms  {elapsed / calls * 1e6:6.2f} us/call"
+              f"  frames allocated/call {frames}  peak {peak / args.depth:7.1f} B/active call")
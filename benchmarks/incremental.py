@@ -0,0 +1,73 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.incremental import Document
+from monkey.parser import Parser
+from monkey.token_stream import TokenStream
+
+
+# Five lines of source, repeated to size; Monkey identifiers have no
+# digits, so the numbers vary instead.
+CHUNK = """let fib = fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+let table = {"name": "row %(i)d", "values": [%(i)d, 2, 3, 4 * 5], "ok": true};
+let total = fib(%(i)d) * 2 - table["values"][0];
+if (total != 42 == false) { total } else { total / 7 };
+
+"""
+
+
+def generate(lines: int) -> str:
+    return "".join(CHUNK % {"i": i} for i in range(lines // CHUNK.count("\n")))
+
+
+def full(source: str, offset: int, removed: int, inserted: str) -> str:
+    source = source[:offset] + inserted + source[offset + removed:]
+    Parser(TokenStream(source)).parse_program()
+    return source
+
+
+def edits(source: str, n: int, spread: bool) -> "list[tuple[int, int, str]]":
+    # Single-character edits: an "x" typed and then deleted again, either
+    # at random places or one line after another, as while typing.
+    rng = random.Random(1)
+    offset = rng.randrange(len(source))
+    result = []
+    for _ in range(n):
+        offset = rng.randrange(len(source)) if spread else (offset + 40) % len(source)
+        result += [(offset, 0, "x"), (offset, 1, "")]
+    return result
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Single-character edits in a large file: incremental against full re-lex and re-parse")
+    arg_parser.add_argument("--lines", type=int, default=50_000, help="lines of generated source")
+    arg_parser.add_argument("-n", type=int, default=200, help="edits of each kind")
+    args = arg_parser.parse_args()
+
+    source = generate(args.lines)
+    start = time.perf_counter()
+    document = Document(source)
+    print(f"{source.count(chr(10))} lines, {len(document)} statements, first parse {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for name, spread in (("random places", True), ("while typing", False)):
+        changes = edits(source, args.n, spread)
+        start = time.perf_counter()
+        reparsed = 0
+        for change in changes:
+            document.edit(*change)
+            reparsed += document.reparsed
+        incremental = (time.perf_counter() - start) / len(changes)
+        assert document.source == source
+
+        text = source
+        start = time.perf_counter()
+        for change in changes[:10]:
+            text = full(text, *change)
+        whole = (time.perf_counter() - start) / 10
+
+        print(f"{name:>13}: incremental {incremental * 1000:7.3f} ms/edit ({reparsed / len(changes):.1f} statements)  full {whole * 1000:8.1f} ms/edit  {whole / incremental:8.0f}x")
@@ -0,0 +1,59 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.lexer import CharLexer, Lexer, tokenize
+from monkey.token import TokenType
+
+
+# A chunk of the generated code the lexer is fed, repeated to size.
+CHUNK = """
+let fib_%(i)d = fn(n) { if (n < 2) { n } else { fib_%(i)d(n - 1) + fib_%(i)d(n - 2) } };
+let table_%(i)d = {"name": "row %(i)d", "values": [%(i)d, 2, 3, 4 * 5], "ok": true};
+let total_%(i)d = sum(map(range(100), fn(x) { x * %(i)d / 7 - 1 }));
+if (total_%(i)d != 42 == false) { return table_%(i)d["values"][0]; }
+"""
+
+
+def generate(size: int) -> str:
+    parts, length, i = [], 0, 0
+    while length < size:
+        part = CHUNK % {"i": i}
+        parts.append(part)
+        length += len(part)
+        i += 1
+    return "".join(parts)
+
+
+def drain(lexer) -> int:
+    count = 0
+    while lexer.next_token().token_type != TokenType.EOF:
+        count += 1
+    return count + 1
+
+
+BACKENDS = {
+    "char": lambda source: drain(CharLexer(source)),
+    "regex": lambda source: drain(Lexer(source)),
+    "tokenize": lambda source: len(tokenize(source)),
+}
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Lexer throughput in tokens per second")
+    arg_parser.add_argument("--size", type=int, default=2_000_000, help="characters of generated source")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per backend; the best is reported")
+    args = arg_parser.parse_args()
+
+    source = generate(args.size)
+    for name, run in BACKENDS.items():
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            count = run(source)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:>8}: {count} tokens in {best * 1000:8.1f} ms  {count / best / 1e6:6.2f} M tokens/s")
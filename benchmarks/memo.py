@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import Interpreter
+
+
+FIB = """
+let fib = fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+fib(%d);
+"""
+
+
+def measure(source: str, **options) -> "tuple[float, object, dict]":
+    interpreter = Interpreter("eval", **options)
+    program = interpreter.parse(source)
+
+    start = time.perf_counter()
+    result = interpreter.engine.execute(program)
+    elapsed = time.perf_counter() - start
+    return elapsed, result, interpreter.engine.evaluator.memoizer.stats()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Recursive fib with and without memoization")
+    arg_parser.add_argument("-n", type=int, default=22)
+    arg_parser.add_argument("--memo-size", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    source = FIB % args.n
+    runs = [
+        ("plain", source, {}),
+        ("memoize", source, {"memoize": True, "memo_size": args.memo_size}),
+        ("memo()", source.replace("fn(n)", "memo(fn(n)", 1).replace("};", "});", 1), {"memo_size": args.memo_size}),
+    ]
+    for name, program, options in runs:
+        elapsed, result, stats = measure(program, **options)
+        print(f"{name:>8}: {elapsed * 1000:9.1f} ms  fib={result.inspect()}  "
+              f"hits {stats['hits']}  misses {stats['misses']}  evictions {stats['evictions']}")
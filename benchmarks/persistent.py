@@ -0,0 +1,73 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey import objects
+from monkey.builtins import builtins
+from monkey.interpreter import Interpreter
+
+
+# Builds a collection of n elements one non-destructive update at a time, as a
+# recursive Monkey program has to.
+PROGRAMS = {
+    "push": "let build = fn(i, acc) { if (i == %d) { acc } else { build(i + 1, push(acc, i)) } }; len(build(0, []))",
+    "set": "let build = fn(i, acc) { if (i == %d) { acc } else { build(i + 1, set(acc, i, i)) } }; len(build(0, {}))",
+}
+
+
+def copying_push(*args):
+    # push as it would be over a flat list: every call copies the array.
+    arr, element = args
+    return objects.Array(arr.objects() + [element])
+
+
+class FlatHash(objects.Hash):
+    # A hash over a dict that every update copies.
+    def __init__(self, entries: dict = None) -> None:
+        self.entries = entries if entries is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def set(self, key: objects.Object, value: objects.Object) -> "FlatHash":
+        return FlatHash({**self.entries, key.hash_key(): (key, value)})
+
+
+def copying_set(*args):
+    collection, key, value = args
+    if not isinstance(collection, FlatHash):
+        collection = FlatHash()
+    return collection.set(key, value)
+
+
+def measure(n: int, name: str, persistent: bool) -> float:
+    interpreter = Interpreter("eval")
+    saved = builtins[name]
+    if not persistent:
+        builtins[name] = objects.Builtin(copying_push if name == "push" else copying_set)
+    try:
+        program = interpreter.parse(PROGRAMS[name] % n)
+        start = time.perf_counter()
+        result = interpreter.engine.execute(program)
+        elapsed = time.perf_counter() - start
+    finally:
+        builtins[name] = saved
+    assert result.value == n
+    return elapsed
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Building collections by repeated push/set, persistent against copying")
+    arg_parser.add_argument("-n", type=int, action="append", help="elements to build (repeatable)")
+    arg_parser.add_argument("--copy-limit", type=int, default=20000, help="largest n run with copying updates")
+    args = arg_parser.parse_args()
+
+    for name in PROGRAMS:
+        for n in args.n or [1000, 5000, 20000, 100000, 1000000]:
+            line = f"{name:>5} {n:>8}: persistent {measure(n, name, True) * 1000:10.1f} ms"
+            if n <= args.copy_limit:
+                line += f"  copying {measure(n, name, False) * 1000:10.1f} ms"
+            print(line, flush=True)
@@ -0,0 +1,45 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import Interpreter
+
+
+PROGRAMS = {
+    # Success path only: every node result used to be checked for Error.
+    "fib": "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(%d)",
+    # Statement-heavy bodies with early returns.
+    "returns": """
+        let step = fn(n) { let a = n + 1; let b = a * 2; if (b > 10) { return b - 10; } return b; };
+        let loop = fn(n, acc) { if (n == 0) { acc } else { loop(n - 1, acc + step(n)) } };
+        loop(%d * 100, 0)""",
+    # An error raised at the bottom of a deep recursion.
+    "error": "let down = fn(n) { if (n == 0) { true + 1 } else { 1 + down(n - 1) } }; down(%d * 2)",
+}
+
+
+def bench(engine: str, source: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        interpreter = Interpreter(engine)
+        program = interpreter.parse(source)
+        start = time.perf_counter()
+        interpreter.engine.execute(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Value checks against exceptions for error/return propagation")
+    arg_parser.add_argument("-n", type=int, default=18)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'program':<10}{'checks':>11}{'exceptions':>13}")
+    for name, source in PROGRAMS.items():
+        checked = bench("eval", source % args.n, args.repeat)
+        unwound = bench("exceptions", source % args.n, args.repeat)
+        print(f"{name:<10}{checked * 1000:>9.1f}ms{unwound * 1000:>11.1f}ms  ({checked / unwound:.2f}x)")
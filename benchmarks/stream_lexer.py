@@ -0,0 +1,73 @@
+import argparse
+import mmap
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lexer import CHUNK
+from monkey.lexer import tokenize
+from monkey.stream_lexer import stream_tokens
+
+
+def write_source(path: str, size: int) -> None:
+    with open(path, "w") as file:
+        written, i = 0, 0
+        while written < size:
+            written += file.write(CHUNK % {"i": i})
+            i += 1
+
+
+def whole_string(path: str) -> int:
+    with open(path) as file:
+        return len(tokenize(file.read()))
+
+
+def from_file(path: str) -> int:
+    with open(path, "rb") as file:
+        return sum(1 for _ in stream_tokens(file))
+
+
+def from_mmap(path: str) -> int:
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return sum(1 for _ in stream_tokens(mapped))
+
+
+READERS = {
+    "read + tokenize": whole_string,
+    "stream file": from_file,
+    "stream mmap": from_mmap,
+}
+
+
+def measure(read, path: str) -> "tuple[float, int, int]":
+    start = time.perf_counter()
+    read(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        count = read(path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, count
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Peak memory of lexing a large file whole against streaming it")
+    arg_parser.add_argument("--size", type=int, default=20_000_000, help="bytes of generated source")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "generated.monkey")
+        write_source(path, args.size)
+        for name, read in READERS.items():
+            elapsed, peak, count = measure(read, path)
+            # Pages of the mapping belong to the OS page cache, not the heap
+            # tracemalloc sees.
+            print(f"{name:>15}: {count} tokens  {elapsed * 1000:8.1f} ms  peak {peak / 1024:10.1f} KiB")
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import Interpreter
+
+
+# Four statements, repeated with a different i each time. The function is
+# redefined every time, so the old one and its body can be freed.
+STATEMENTS = (
+    "let step = fn(x) {{ if (x > {i}) {{ x - {i} }} else {{ x + {i} }} }};\n"
+    "let total = step(total) + {i} * 2;\n"
+    'let name = "item {i}";\n'
+    "total;\n"
+)
+
+
+def write_script(path: str, n: int) -> None:
+    with open(path, "w") as file:
+        file.write("let total = 0;\n")
+        for i in range(n // 4):
+            file.write(STATEMENTS.format(i=i))
+
+
+def whole(path: str):
+    # Parse everything, then run it: the first result is the last one.
+    with open(path) as file:
+        yield Interpreter().run(file.read())
+
+
+def streamed(path: str):
+    with open(path) as file:
+        yield from Interpreter().stream(file)
+
+
+RUNNERS = {
+    "parse then run": whole,
+    "stream": streamed,
+}
+
+
+def measure(runner, path: str) -> "tuple[float, float, int]":
+    start = time.perf_counter()
+    results = runner(path)
+    next(results)
+    first = time.perf_counter() - start
+    for _ in results:
+        pass
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for _ in runner(path):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return first, total, peak
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Time to first result and peak memory, parsing a whole script against streaming it")
+    arg_parser.add_argument("-n", type=int, default=100_000, help="top-level statements in the script")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "script.monkey")
+        write_script(path, args.n)
+        for name, runner in RUNNERS.items():
+            first, total, peak = measure(runner, path)
+            print(f"{name:>14}: first result {first * 1000:8.1f} ms  total {total * 1000:8.1f} ms  peak {peak / 1024 / 1024:7.1f} MiB")
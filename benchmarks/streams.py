@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import Interpreter
+
+
+# Total length of the ERROR lines of a log, once with every stage built as an
+# array and once as a lazy pipeline.
+EAGER = 'sum(map(filter(collect(lines("%s")), fn(line) { len(line) > 30 }), len))'
+LAZY = 'sum(map(filter(lines("%s"), fn(line) { len(line) > 30 }), len))'
+
+
+def write_log(path: str, n: int) -> None:
+    with open(path, "w") as file:
+        for i in range(n):
+            if i % 10 == 0:
+                file.write(f"ERROR request {i} failed: disk full\n")
+            else:
+                file.write(f"INFO request {i} ok\n")
+
+
+def measure(source: str) -> "tuple[float, int, int]":
+    interpreter = Interpreter("eval")
+    program = interpreter.parse(source)
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = interpreter.engine.execute(program)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, result.value
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Eager against lazy log-processing pipelines")
+    arg_parser.add_argument("-n", type=int, action="append", help="lines in the log (repeatable)")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "app.log")
+        for n in args.n or [10000, 100000]:
+            write_log(path, n)
+            for name, template in (("eager", EAGER), ("lazy", LAZY)):
+                elapsed, peak, total = measure(template % path)
+                print(f"{n:>7} lines {name:>5}: {elapsed * 1000:9.1f} ms  peak {peak / 1024:9.1f} KiB  (total {total})")
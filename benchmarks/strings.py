@@ -0,0 +1,58 @@
+import argparse
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey import objects
+from monkey.interpreter import Interpreter
+
+
+# Accumulates a report one line at a time, then asks for its length and its
+# text, as a program printing the report would.
+REPORT = """
+let build = fn(i, acc) {
+    if (i == 0) { acc } else { build(i - 1, acc + "row of the generated report\\n") }
+};
+let report = build(%d, "");
+len(report);
+report;
+"""
+
+
+def flat_concat(self, operator: str, left: objects.String, right: objects.String) -> objects.String:
+    # Concatenation as it was before ropes: a new Python string every time.
+    return objects.String(left.value + right.value)
+
+
+def measure(source: str, ropes: bool) -> "tuple[float, int]":
+    interpreter = Interpreter("eval")
+    if not ropes:
+        interpreter.engine.evaluator.eval_string_infix_expression = types.MethodType(flat_concat, interpreter.engine.evaluator)
+    program = interpreter.parse(source)
+
+    start = time.perf_counter()
+    interpreter.engine.execute(program).inspect()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        interpreter.engine.execute(program).inspect()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Repeated string concatenation with and without ropes")
+    arg_parser.add_argument("-n", type=int, action="append", help="lines in the report (repeatable)")
+    args = arg_parser.parse_args()
+
+    for n in args.n or [5000, 10000, 20000, 40000]:
+        for name, ropes in (("flat", False), ("rope", True)):
+            elapsed, peak = measure(REPORT % n, ropes)
+            print(f"{n:>7} lines {name:>5}: {elapsed * 1000:9.1f} ms  peak {peak / 1024:9.1f} KiB")
@@ -0,0 +1,44 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from monkey.interpreter import Interpreter
+from monkey.tiered import DEFAULT_THRESHOLD
+
+
+PROGRAM = """
+let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } };
+let sum = fn(n, acc) { if (n == 0) { acc } else { sum(n - 1, acc + n * n) } };
+let apply = fn(f, x) { f(x) };
+fib(%d) + sum(2000, 0) + apply(fn(x) { x * 2 }, 21);
+"""
+
+
+def timed(source: str, **options) -> "tuple[float, Interpreter]":
+    interpreter = Interpreter("tiered", **options)
+    start = time.perf_counter()
+    interpreter.run(source)
+    return time.perf_counter() - start, interpreter
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Tree walker against tiered execution")
+    arg_parser.add_argument("-n", type=int, default=18)
+    arg_parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD)
+    args = arg_parser.parse_args()
+
+    source = PROGRAM % args.n
+    cold, _ = timed(source, tiering=False)
+    hot, _ = timed(source, threshold=args.threshold)
+    print(f"tiering off: {cold * 1000:8.1f} ms")
+    print(f"tiering on:  {hot * 1000:8.1f} ms  ({cold / hot:.2f}x)")
+
+    # A separate profiled run, since timing every call costs time of its own.
+    _, interpreter = timed(source, threshold=args.threshold, profile=True)
+    print(f"\n{'function':<12}{'promoted':>10}{'interp':>9}{'compiled':>10}{'speedup':>9}")
+    for stats in interpreter.engine.evaluator.report():
+        speedup = f"{stats.speedup:.2f}x" if stats.speedup else "-"
+        print(f"{stats.name:<12}{stats.promoted_after:>10}{stats.interpreted_calls:>9}{stats.compiled_calls:>10}{speedup:>9}")
@@ -0,0 +1,63 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lexer import generate
+from monkey.lexer import CharLexer, Lexer, tokenize
+from monkey.parser import Parser
+from monkey.token import TokenType
+from monkey.token_stream import TokenStream
+
+
+def char_tokens(source: str) -> list:
+    # One Token object, with its own literal string, per token.
+    lexer = CharLexer(source)
+    tokens = [lexer.next_token()]
+    while tokens[-1].token_type != TokenType.EOF:
+        tokens.append(lexer.next_token())
+    return tokens
+
+
+REPRESENTATIONS = {
+    "CharLexer tokens": char_tokens,
+    "tokenize() list": tokenize,
+    "TokenStream": TokenStream,
+}
+
+
+def measure(build, source: str) -> "tuple[float, int, int]":
+    start = time.perf_counter()
+    build(source)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        tokens = build(source)
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return elapsed, retained, len(tokens)
+
+
+def parse_time(source: str, make_lexer) -> float:
+    start = time.perf_counter()
+    Parser(make_lexer(source)).parse_program()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Memory held by a token sequence, per representation")
+    arg_parser.add_argument("--size", type=int, default=2_600_000, help="characters of generated source (about 1M tokens)")
+    args = arg_parser.parse_args()
+
+    source = generate(args.size)
+    for name, build in REPRESENTATIONS.items():
+        elapsed, retained, count = measure(build, source)
+        print(f"{name:>17}: {count} tokens  {retained / 1024 / 1024:7.1f} MiB  {retained / count:6.1f} B/token  {elapsed * 1000:8.1f} ms")
+
+    for name, make_lexer in (("Lexer", Lexer), ("TokenStream", TokenStream)):
+        print(f"{'parse from ' + name:>23}: {parse_time(source, make_lexer) * 1000:8.1f} ms")
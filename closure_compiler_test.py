@@ -0,0 +1,37 @@
+import unittest
+
+import monkey.objects as OBJ
+from monkey.closure_compiler import compile_program
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class ClosureCompilerTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        for input in PROGRAMS:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = compile_program(parse(input))(Environment())
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_compiled_program_is_reusable(self):
+        code = compile_program(parse("let double = fn(x) { x * 2 }; double(n)"))
+
+        for n in range(5):
+            env = Environment()
+            env.set("n", OBJ.Integer(n))
+            assert code(env).value == n * 2
+
+    def test_errors_short_circuit(self):
+        code = compile_program(parse("let a = 1; a + true; let b = 2;"))
+        env = Environment()
+
+        assert code(env).message == "Type mismatch: INTEGER + BOOLEAN"
+        assert env.get("b") is None
@@ -0,0 +1,126 @@
+import unittest
+
+from monkey.code import Opcode, make, read_operands, lookup, disassemble
+from monkey.compiler import CompileError, Compiler
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+import monkey.objects as OBJ
+
+
+def compile_source(input: str):
+    program = Parser(Lexer(input)).parse_program()
+    return Compiler().compile(program)
+
+
+class CodeTest(unittest.TestCase):
+    def test_make(self):
+        tests = [
+            (Opcode.CONSTANT, [65534], bytes([Opcode.CONSTANT, 255, 254])),
+            (Opcode.ADD, [], bytes([Opcode.ADD])),
+            (Opcode.GET_LOCAL, [255], bytes([Opcode.GET_LOCAL, 255])),
+            (Opcode.CLOSURE, [65534, 255], bytes([Opcode.CLOSURE, 255, 254, 255])),
+        ]
+
+        for op, operands, expected in tests:
+            assert make(op, *operands) == expected
+
+    def test_read_operands(self):
+        ins = make(Opcode.CLOSURE, 65535, 255)
+        operands, offset = read_operands(lookup(ins[0]), ins, 1)
+        assert operands == [65535, 255]
+        assert offset == 4
+
+    def test_disassemble(self):
+        ins = make(Opcode.ADD) + make(Opcode.GET_LOCAL, 1) + make(Opcode.CONSTANT, 2) + make(Opcode.CLOSURE, 65535, 255)
+        expected = "0000 ADD\n0001 GET_LOCAL 1\n0003 CONSTANT 2\n0006 CLOSURE 65535 255"
+        assert disassemble(ins) == expected
+
+
+class CompilerTest(unittest.TestCase):
+    def test_integer_arithmetic(self):
+        bytecode = compile_source("1 + 2; 3")
+
+        assert [c.value for c in bytecode.constants] == [1, 2, 3]
+        assert bytecode.instructions == b''.join([
+            make(Opcode.CONSTANT, 0),
+            make(Opcode.CONSTANT, 1),
+            make(Opcode.ADD),
+            make(Opcode.POP),
+            make(Opcode.CONSTANT, 2),
+            make(Opcode.RETURN_VALUE),
+        ])
+
+    def test_conditionals(self):
+        bytecode = compile_source("if (true) { 10 }; 3333;")
+
+        assert bytecode.instructions == b''.join([
+            make(Opcode.TRUE),
+            make(Opcode.JUMP_NOT_TRUTHY, 10),
+            make(Opcode.CONSTANT, 0),
+            make(Opcode.JUMP, 11),
+            make(Opcode.NULL),
+            make(Opcode.POP),
+            make(Opcode.CONSTANT, 1),
+            make(Opcode.RETURN_VALUE),
+        ])
+
+    def test_global_let_statements(self):
+        bytecode = compile_source("let one = 1; let one = 2; one;")
+
+        assert bytecode.global_names == ["one"]
+        assert bytecode.instructions == b''.join([
+            make(Opcode.CONSTANT, 0),
+            make(Opcode.SET_GLOBAL, 0),
+            make(Opcode.CONSTANT, 1),
+            make(Opcode.SET_GLOBAL, 0),
+            make(Opcode.GET_GLOBAL, 0),
+            make(Opcode.RETURN_VALUE),
+        ])
+
+    def test_builtins(self):
+        bytecode = compile_source('len("")')
+
+        assert bytecode.instructions == b''.join([
+            make(Opcode.GET_BUILTIN, 0),
+            make(Opcode.STRING, 0),
+            make(Opcode.CALL, 1),
+            make(Opcode.RETURN_VALUE),
+        ])
+
+    def test_closures(self):
+        bytecode = compile_source("fn(a) { fn(b) { a + b } }")
+
+        inner: OBJ.CompiledFunction = bytecode.constants[0]
+        assert inner.instructions == b''.join([
+            make(Opcode.GET_FREE, 0),
+            make(Opcode.GET_LOCAL, 0),
+            make(Opcode.ADD),
+            make(Opcode.RETURN_VALUE),
+        ])
+
+        outer: OBJ.CompiledFunction = bytecode.constants[1]
+        assert outer.num_parameters == 1
+        assert outer.instructions == b''.join([
+            make(Opcode.MAKE_CELL, 0),
+            make(Opcode.LOAD_CELL, 0),
+            make(Opcode.CLOSURE, 0, 1),
+            make(Opcode.RETURN_VALUE),
+        ])
+
+    def test_unresolved_identifiers_become_globals(self):
+        bytecode = compile_source("let f = fn() { g() }; let g = fn() { 1 };")
+
+        assert bytecode.global_names == ["f", "g"]
+
+    def test_literal_constants_are_shared(self):
+        bytecode = compile_source('1 + 1; "a" + "a"; 1')
+
+        assert [c.inspect() for c in bytecode.constants] == ["1", "a"]
+        # The String constant is only copied from: every evaluation of a
+        # literal makes a new String, as == compares strings by identity.
+        assert bytecode.instructions.count(bytes(make(Opcode.STRING, 1))) == 2
+
+    def test_operands_out_of_range(self):
+        with self.assertRaises(CompileError) as raised:
+            compile_source("let a = 1;\n" * 11000 + "if (a) { 1 }")
+        assert str(raised.exception) == "program too large: JUMP_NOT_TRUTHY operand 66012 does not fit in 2 byte(s)"
@@ -1,3 +1,5 @@
+import gc
+import sys
 import unittest
 
 import pytest
@@ -6,6 +8,7 @@ import monkey.ast as AST
 import monkey.objects as OBJ
 from monkey.environment import Environment
 from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
 from monkey.objects import Function
 from monkey.lexer import Lexer
 from monkey.parser import Parser
@@ -197,6 +200,53 @@ class EvalTest(unittest.TestCase):
 
         assert string_value.value == "Hello World!"
 
+    def test_tail_calls_use_constant_stack(self):
+        tests = [
+            ("let count = fn(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } }; count(10000, 0)", 10000),
+            ("let count = fn(n) { if (n == 0) { return 0; } return count(n - 1); }; count(10000)", 0),
+            (r'''
+                let even = fn(n) { if (n == 0) { true } else { odd(n - 1) } };
+                let odd = fn(n) { if (n == 0) { false } else { even(n - 1) } };
+                even(10001)''', False),
+        ]
+
+        for t in tests:
+            assert self.test_eval(t[0]).value == t[1]
+
+    def test_tail_call_marking(self):
+        program = Parser(Lexer("fn(n) { let a = f(n); if (a) { return g(a); }; h(f(n)) }")).parse_program()
+        body = program.statements[0].expression.body
+
+        let_call = body.statements[0].value
+        return_call = body.statements[1].expression.consequence.statements[0].return_value
+        last_call = body.statements[2].expression
+
+        assert not let_call.tail
+        assert return_call.tail
+        assert last_call.tail
+        assert not last_call.arguments[0].tail
+
+    def test_return_inside_expression_is_not_a_tail_call(self):
+        program = Parser(Lexer("fn() { let x = if (true) { return g(); }; 1 + if (true) { return g(); }; 5 }")).parse_program()
+        body = program.statements[0].expression.body
+
+        assert not body.statements[0].value.consequence.statements[0].return_value.tail
+        assert not body.statements[1].expression.right.consequence.statements[0].return_value.tail
+
+        evaluated = self.test_eval("let g = fn() { 1 + true }; let f = fn() { let x = if (true) { return g(); }; 5 }; f()")
+        assert evaluated.message == "Type mismatch: INTEGER + BOOLEAN"
+
+    def test_dispatch_table_covers_all_nodes(self):
+        node_classes = [
+            cls for cls in vars(AST).values()
+            if isinstance(cls, type) and issubclass(cls, AST.Node)
+            and cls not in (AST.Node, AST.Statement, AST.Expression)
+        ]
+
+        handlers = Evaluator().handlers
+        for cls in node_classes:
+            assert cls in handlers, cls.__name__
+
     @pytest.mark.skip(reason="Don't test helper function")
     def test_eval(self, input: str) -> Object:
         l = Lexer(input)
@@ -253,3 +303,107 @@ class EvalTest(unittest.TestCase):
                 self.test_integer_object(evaluated, test[1])
             elif isinstance(test[1], str):
                 assert evaluated.message == test[1]
+
+
+class CallSiteCacheTest(unittest.TestCase):
+    def test_cache_is_reused_for_the_same_callee(self):
+        program = Parser(Lexer("let double = fn(x) { x * 2 }; let a = double(1); double(a)")).parse_program()
+        evaluator = Evaluator()
+        env = Environment()
+        evaluated = evaluator.eval(program, env)
+
+        site = program.statements[2].expression
+        cache = site.cache
+        assert evaluated.value == 4
+        assert cache.fn() is env.get("double") and cache.plan == ("x",)
+
+        evaluator.eval(program.statements[2], env)
+        assert site.cache is cache
+
+    def test_cache_follows_a_new_callee(self):
+        program = Parser(Lexer("let apply = fn(f) { f(3) }; let a = apply(fn(x) { x + 1 }); apply(len)")).parse_program()
+        env = Environment()
+        evaluated = Evaluator().eval(program, env)
+
+        site = program.statements[0].value.body.statements[0].expression
+        assert site.cache.kind == OBJ.BUILTIN_OBJ
+        assert evaluated.message == "argument to 'len' is not supported, got INTEGER"
+
+    def test_cache_does_not_keep_the_callee_alive(self):
+        program = Parser(Lexer("let apply = fn(f) { f(3) }; apply(fn(x) { x + 1 })")).parse_program()
+        evaluated = Evaluator().eval(program, Environment())
+
+        site = program.statements[0].value.body.statements[0].expression
+        gc.collect()
+        assert evaluated.value == 4
+        assert site.cache.kind == OBJ.FUNCTION_OBJ and site.cache.fn() is None
+
+    def test_wrong_number_of_arguments(self):
+        tests = [
+            ("fn(a, b) { a }(1)", "wrong number of arguments: want=2, got=1"),
+            ("fn(a) { a }(1, 2)", "wrong number of arguments: want=1, got=2"),
+            ("let f = fn(n) { if (n == 0) { 0 } else { f() } }; f(3)", "wrong number of arguments: want=1, got=0"),
+        ]
+
+        for input, message in tests:
+            program = Parser(Lexer(input)).parse_program()
+            assert Evaluator().eval(program, Environment()).message == message, input
+
+
+class StringRopeTest(unittest.TestCase):
+    def test_long_concatenation_builds_a_rope(self):
+        left, right = OBJ.String("a" * 40), OBJ.String("b" * 40)
+        joined = OBJ.String.concat(left, right)
+
+        assert (joined.left, joined.right) == (left, right)
+        assert joined.length == 80
+
+        assert joined.inspect() == "a" * 40 + "b" * 40
+        assert joined.left is None and joined.right is None
+
+    def test_short_concatenation_is_joined(self):
+        joined = OBJ.String.concat(OBJ.String("ab"), OBJ.String("cd"))
+        assert joined.left is None and joined.value == "abcd"
+
+    def test_short_appends_share_leaves(self):
+        rope = OBJ.String("")
+        for _ in range(10000):
+            rope = OBJ.String.concat(rope, OBJ.String("0123456789"))
+
+        nodes = 0
+        node = rope
+        while node.left is not None:
+            assert node.right.length < OBJ.ROPE_CHUNK
+            nodes += 1
+            node = node.left
+        assert nodes <= 10000 * 10 // (OBJ.ROPE_CHUNK - 10) + 1
+        assert rope.value == "0123456789" * 10000
+
+    def test_len_does_not_flatten(self):
+        program = Parser(Lexer("let build = fn(i, acc) { if (i == 0) { acc } else { build(i - 1, acc + \"0123456789\") } }; let s = build(50000, \"\"); len(s)")).parse_program()
+        env = Environment()
+        evaluated = Evaluator().eval(program, env)
+
+        assert evaluated.value == 500000
+        rope = env.get("s")
+        assert rope.left is not None
+        assert rope.value == "0123456789" * 50000
+
+
+class RecursionDepthTest(unittest.TestCase):
+    # Non-tail recursion uses Python's stack on these engines. The original
+    # tree walker managed 164 levels under the default recursion limit of
+    # 1000; they must all still get there.
+    SUM_TO = "let g = fn(n) { if (n == 0) { return 0; } return n + g(n - 1); }; g(%d)"
+    ENGINES = ["eval", "resolved", "exceptions", "quick", "flat", "pooled", "native", "closure"]
+
+    def test_supported_depth(self):
+        assert sys.getrecursionlimit() == 1000
+        for engine in self.ENGINES:
+            evaluated = Interpreter(engine).run(self.SUM_TO % 164)
+            assert evaluated.inspect() == "13530", engine
+
+    def test_deeper_recursion_is_an_error(self):
+        for engine in self.ENGINES:
+            evaluated = Interpreter(engine).run(self.SUM_TO % 100000)
+            assert evaluated.inspect() == "ERROR: Maximum call depth exceeded", engine
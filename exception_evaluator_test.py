@@ -0,0 +1,47 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.exception_evaluator import ExceptionEvaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.objects import Object
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class ExceptionEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case with exception-based propagation.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        return ExceptionEvaluator().eval(parse(input), Environment())
+
+
+class ExceptionEvaluatorTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "let f = fn(x) { if (x) { return 1; } 2 }; f(true) + f(false)",
+            "let f = fn() { return g(); }; let g = fn() { return -true; }; f(); 5",
+            "let f = fn(x) { x(1) }; f(len)",
+            "let f = fn(n) { if (n == 0) { return true + 1; } f(n - 1) }; f(100)",
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("exceptions").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_error_stops_the_program(self):
+        env = Environment()
+        evaluated = ExceptionEvaluator().eval(parse("let a = 1; let b = a + true; let c = 3;"), env)
+
+        assert evaluated.message == "Type mismatch: INTEGER + BOOLEAN"
+        assert env.get("b") is None and env.get("c") is None
@@ -0,0 +1,66 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.frame_pool import PooledEvaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.objects import Object
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class PooledEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case with pooled frames.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        return PooledEvaluator().eval(parse(input), Environment())
+
+
+class PooledEvaluatorTest(unittest.TestCase):
+    def test_non_escaping_frames_are_reused(self):
+        evaluator = PooledEvaluator()
+        evaluator.eval(parse("let add = fn(a, b) { a + b }; add(1, add(2, add(3, 4))); add(5, 6)"), Environment())
+
+        assert evaluator.allocated == 1
+        assert evaluator.reused == 3
+        assert len(evaluator.pool) == 1 and evaluator.pool[0].store == {}
+
+    def test_recursion_takes_one_frame_per_level(self):
+        evaluator = PooledEvaluator()
+        env = Environment()
+        evaluator.eval(parse("let sum = fn(n) { if (n == 0) { 0 } else { n + sum(n - 1) } }; sum(10)"), env)
+        evaluator.eval(parse("sum(10)"), env)
+
+        assert evaluator.allocated == 11
+        assert evaluator.reused == 11
+
+    def test_escaping_frames_are_not_pooled(self):
+        evaluator = PooledEvaluator()
+        result = evaluator.eval(parse("let adder = fn(a) { fn(b) { a + b } }; let one = adder(1); let two = adder(2); one(10) + two(10)"), Environment())
+
+        # Both adder frames are kept by the closures; the calls of those
+        # closures share one pooled frame.
+        assert result.value == 23
+        assert evaluator.allocated == 3
+        assert evaluator.reused == 1
+
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "let f = fn(x) { if (x) { return 1; } 2 }; f(true) + f(false)",
+            "let f = fn(n) { let m = n * 2; g(m) }; let g = fn(m) { m + 1 }; f(1) + f(2)",
+            "let f = fn(a) { a(1) }; f(fn(x) { x + 1 })",
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("pooled").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
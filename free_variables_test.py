@@ -0,0 +1,62 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.free_variables import FlatClosureEvaluator, analyze_program
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.objects import Object
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class FlatClosureEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case with flat closures.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        return FlatClosureEvaluator().eval(parse(input), Environment())
+
+
+class FreeVariablesTest(unittest.TestCase):
+    def test_analysis(self):
+        program = parse("let g = 1; fn(a, b) { let c = 2; fn(x) { fn() { a + x + g } } }")
+        analyze_program(program)
+
+        outer = program.statements[1].expression
+        middle = outer.body.statements[1].expression
+        inner = middle.body.statements[0].expression
+        assert (outer.free, outer.cells) == ((), ("a",))
+        assert (middle.free, middle.cells) == (("a",), ("x",))
+        assert (inner.free, inner.cells) == (("a", "x"), ())
+
+    def test_closure_keeps_only_what_it_reads(self):
+        interpreter = Interpreter("flat")
+        interpreter.run("let make = fn(n) { let big = \"unused\"; let small = n * 2; fn() { small } }; let f = make(21);")
+
+        f = interpreter.engine.env.get("f")
+        assert list(f.env.store) == ["small"]
+        assert f.env.outer is interpreter.engine.env
+        assert interpreter.run("f()").value == 42
+
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "let f = fn() { let g = fn() { x }; let x = 5; g() }; f()",
+            "let f = fn() { let g = fn(n) { if (n == 0) { 0 } else { n + g(n - 1) } }; g(10) }; f()",
+            "let x = 1; let f = fn() { let g = fn() { x }; let r = g(); let x = 2; r + g() }; f()",
+            "let x = 1; let f = fn() { let y = x; let x = 2; y + x }; f()",
+            "let f = fn(a, a) { fn() { a } }; f(1, 2)()",
+            "let adder = fn(a) { fn(b) { fn(c) { a + b + c } } }; adder(1)(2)(3)",
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("flat").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
@@ -0,0 +1,76 @@
+import random
+import unittest
+
+from monkey.incremental import Document
+from monkey.lexer import Lexer, tokenize
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+SOURCE = "let a = 1;\nlet b = a + 2;\nlet c = fn(x) { x * b };\nc(a);\n"
+
+
+def assert_matches_full_parse(document: Document) -> None:
+    parser = Parser(Lexer(document.source))
+    program = parser.parse_program()
+
+    assert document.errors == parser.errors, document.source
+    if not parser.errors:
+        assert str(document.program) == str(program), document.source
+    expected = [(t.token_type, t.literal) for t in tokenize(document.source)]
+    assert [(t.token_type, t.literal) for t in document.all_tokens()] == expected, document.source
+
+
+class DocumentTest(unittest.TestCase):
+    def test_parses_like_parser(self):
+        for source in PROGRAMS + [SOURCE, "", "  \n"]:
+            assert_matches_full_parse(Document(source))
+
+    def test_edit_reuses_statements_after_the_edit(self):
+        document = Document(SOURCE)
+        before = list(document.statements)
+
+        offset = SOURCE.index("2")
+        document.edit(offset, 1, "20")
+
+        assert document.source == SOURCE.replace("2", "20")
+        assert str(document.statements[1].value) == "(a + 20)"
+        assert document.statements[2] is before[2] and document.statements[3] is before[3]
+        assert document.reparsed == 2
+        assert_matches_full_parse(document)
+
+    def test_edits_that_merge_and_split_statements(self):
+        document = Document(SOURCE)
+        # Removing ";\n" after the first statement makes `1 let` a parse
+        # error; putting it back restores four statements.
+        offset = SOURCE.index(";")
+        document.edit(offset, 2, "")
+        assert_matches_full_parse(document)
+        document.edit(offset, 0, ";\n")
+        assert document.source == SOURCE and len(document) == 4
+        assert_matches_full_parse(document)
+
+    def test_open_string_reparses_to_the_end(self):
+        document = Document(SOURCE)
+        document.edit(SOURCE.index("1"), 0, '"')
+        assert document.reparsed == 1
+        assert_matches_full_parse(document)
+
+        document.edit(SOURCE.index("1"), 1, "")
+        assert document.source == SOURCE
+        assert_matches_full_parse(document)
+
+    def test_random_edits(self):
+        rng = random.Random(7)
+        pieces = list('ab1 ;=!(){}[]"+\n') + ["let ", "fn(", "if ", "=="]
+        document = Document("\n".join(PROGRAMS))
+        for _ in range(500):
+            offset = rng.randint(0, len(document.source))
+            removed = rng.randint(0, min(3, len(document.source) - offset))
+            document.edit(offset, removed, "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3))))
+            assert_matches_full_parse(document)
+
+    def test_edit_outside_source(self):
+        document = Document("1 + 2")
+        with self.assertRaises(ValueError):
+            document.edit(4, 2, "")
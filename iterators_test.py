@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from monkey import objects
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator, NULL
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+def run(input: str) -> objects.Object:
+    return Evaluator().eval(parse(input), Environment())
+
+
+# Far too many elements to materialize: only lazy pipelines finish.
+HUGE = "range(1000000000000)"
+
+
+class IteratorTest(unittest.TestCase):
+    def test_range_takes_constant_memory(self):
+        huge = run(HUGE)
+        assert type(huge.ints) is range
+        assert run(f"len({HUGE})").value == 1000000000000
+        assert run(f"{HUGE}[999999999999]").value == 999999999999
+        assert run("range(3, 6)").inspect() == "[3, 4, 5]"
+
+    def test_pipelines_are_lazy(self):
+        tests = [
+            (f"collect(take(map(iter({HUGE}), fn(x) {{ x * x }}), 4))", "[0, 1, 4, 9]"),
+            (f"first(filter(iter({HUGE}), fn(x) {{ x > 41 }}))", "42"),
+            (f"sum(take(filter(map(iter({HUGE}), fn(x) {{ x * 3 }}), fn(x) {{ x / 2 * 2 == x }}), 5))", "60"),
+            ("len(take(iter([1, 2, 3]), 10))", "3"),
+            ("take([1, 2, 3], 2)", "[1, 2]"),
+            ("collect(map(iter([\"a\", \"bb\"]), len))", "[1, 2]"),
+            ("iter([1])", "iterator"),
+        ]
+
+        for input, expected in tests:
+            assert run(input).inspect() == expected, input
+
+    def test_iterators_are_single_pass(self):
+        result = run("let it = iter([1, 2, 3]); let a = first(it); let b = collect(it); [a, b, first(it)]")
+        assert result.inspect() == "[1, [2, 3], null]"
+        assert run("first(iter([]))") is NULL
+
+    def test_errors_stop_the_pipeline(self):
+        tests = [
+            ("collect(map(iter([1, \"a\", 2]), fn(x) { x + 1 }))", "Type mismatch: STRING + INTEGER"),
+            ("sum(filter(iter([1, 2]), fn(x) { y }))", "Identifier not found: y"),
+            ("len(map(iter([1]), fn(x, y) { x }))", "wrong number of arguments: want=2, got=1"),
+            ("take(iter([1]), true)", "argument to 'take' must be INTEGER, got BOOLEAN"),
+            ("iter(1)", "argument to 'iter' must be ARRAY, got INTEGER"),
+            ("lines(1)", "argument to 'lines' must be STRING, got INTEGER"),
+        ]
+
+        for input, expected in tests:
+            result = run(input)
+            assert result.type() == objects.ERROR_OBJ, input
+            assert result.message == expected, input
+
+    def test_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "app.log")
+            with open(path, "w") as file:
+                file.write("INFO start\nERROR disk full\nINFO retry\nERROR disk full\n")
+
+            program = f"""
+            let errors = filter(lines("{path}"), fn(line) {{ len(line) > 10 }});
+            len(errors)
+            """
+            assert run(program).value == 2
+            assert run(f'collect(take(lines("{path}"), 2))').inspect() == "[INFO start, ERROR disk full]"
+            assert run(f'sum(map(lines("{path}"), len))').value == 50
+
+            with open(path, "wb") as file:
+                file.write(b"caf\xc3\xa9\n\xff\xfe binary\n")
+            assert run(f'collect(lines("{path}"))').inspect() == "[caf\u00e9, \ufffd\ufffd binary]"
+
+            missing = run(f'lines("{os.path.join(directory, "missing.log")}")')
+            assert missing.message.startswith("could not open")
+
+    def test_engines_match_evaluator(self):
+        programs = [
+            f"collect(take(map(iter({HUGE}), fn(x) {{ x + 1 }}), 3))",
+            "sum(filter(iter(range(100)), fn(x) { x > 50 }))",
+            "collect(map(iter([1, \"a\"]), fn(x) { x + 1 }))",
+        ]
+        for engine in ["vm", "closure", "stack", "native", "exceptions", "flat", "pooled"]:
+            for input in programs:
+                expected = run(input)
+                actual = Interpreter(engine).run(input)
+
+                assert actual.inspect() == expected.inspect(), (engine, input)
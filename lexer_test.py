@@ -1,5 +1,5 @@
 from monkey.token import Token, TokenType
-from monkey.lexer import Lexer
+from monkey.lexer import CharLexer, Lexer, tokenize
 
 def test_next_token():
     input = '''
@@ -114,5 +114,70 @@ if (5 < 10) {
         assert tok.literal == t[1]
 
 
+def test_collection_tokens():
+    input = '[1, 2]; {"one": 1}'
+
+    tests = [
+        (TokenType.LBRACKET, "["),
+        (TokenType.INT, "1"),
+        (TokenType.COMMA, ","),
+        (TokenType.INT, "2"),
+        (TokenType.RBRACKET, "]"),
+        (TokenType.SEMICOLON, ";"),
+        (TokenType.LBRACE, "{"),
+        (TokenType.STRING, "one"),
+        (TokenType.COLON, ":"),
+        (TokenType.INT, "1"),
+        (TokenType.RBRACE, "}"),
+        (TokenType.EOF, None),
+    ]
+
+    lexer = Lexer(input)
+
+    for t in tests:
+        tok = lexer.next_token()
+
+        assert tok.token_type == t[0]
+        assert tok.literal == t[1]
+
+
+def test_backends_agree():
+    sources = [
+        'let five = 5; let add = fn(x, y) { x + y; }; add(five, 10) == 15 != false',
+        '  \t\n"unterminated string',
+        '"" "a b" x1 _under_score !-/*5 <> [1, 2][0] {"k": v}',
+        'if(a){return true}else{return false}',
+        '',
+        '   \n',
+    ]
+
+    for source in sources:
+        expected = []
+        lexer = CharLexer(source)
+        while not expected or expected[-1].token_type != TokenType.EOF:
+            expected.append(lexer.next_token())
+        expected = [(t.token_type, t.literal) for t in expected]
+
+        lexer = Lexer(source)
+        assert [(t.token_type, t.literal) for t in (lexer.next_token() for _ in expected)] == expected, source
+        assert lexer.next_token().token_type == TokenType.EOF
+        assert [(t.token_type, t.literal) for t in tokenize(source)] == expected, source
+
+
+def test_illegal_characters_are_skipped():
+    tokens = [(t.token_type, t.literal) for t in tokenize('a @ b é')]
+
+    assert tokens == [
+        (TokenType.IDENT, "a"),
+        (TokenType.ILLEGAL, "@"),
+        (TokenType.IDENT, "b"),
+        (TokenType.ILLEGAL, "é"),
+        (TokenType.EOF, None),
+    ]
+
+
 if __name__ == '__main__':
-    test_next_token()
\ No newline at end of file
+    test_next_token()
+    test_collection_tokens()
+    test_backends_agree()
+    test_illegal_characters_are_skipped()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import unittest
+
+from monkey.builtins import builtins
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.memo import MemoCache, purity_guard
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+FIB = "let fib = fn(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };"
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+def function(input: str, name: str):
+    env = Environment()
+    Evaluator().eval(parse(input), env)
+    return env.get(name)
+
+
+class PurityTest(unittest.TestCase):
+    def test_pure_functions(self):
+        fib = function(FIB, "fib")
+        assert purity_guard(fib, builtins) == (("fib", fib),)
+
+        f = function("let g = fn(s) { len(s) * 2 }; let f = fn(x) { let y = x + 1; g(y) };", "f")
+        assert {name for name, _ in purity_guard(f, builtins)} == {"g", "len"}
+
+    def test_impure_functions(self):
+        tests = [
+            "let a = 1; let f = fn(x) { x + a };",
+            "let f = fn(x) { fn(y) { x + y } };",
+            "let f = fn(g) { g(1) };",
+            "let f = fn(x) { memo(x) };",
+            "let g = fn(x) { x + a }; let a = 1; let f = fn(x) { g(x) };",
+            "let y = 1; let f = fn(x) { let z = y; let y = 2; z };",
+        ]
+
+        for input in tests:
+            assert purity_guard(function(input, "f"), builtins) is None, input
+
+
+class MemoCacheTest(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = MemoCache(2)
+        cache.put(("a",), 1)
+        cache.put(("b",), 2)
+        assert cache.get(("a",)) == 1
+        cache.put(("c",), 3)
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("c",)) == 3
+        assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (2, 1, 1, 2)
+
+
+class MemoizationTest(unittest.TestCase):
+    def test_memo_builtin(self):
+        interpreter = Interpreter("eval")
+        result = interpreter.run(FIB.replace("fn(n)", "memo(fn(n)", 1).replace("};", "});", 1) + "fib(30)")
+
+        assert result.value == 832040
+        assert interpreter.engine.evaluator.memoizer.stats() == {"hits": 28, "misses": 31, "evictions": 0, "size": 31}
+
+    def test_memo_errors(self):
+        assert Interpreter("eval").run("memo(1)").message == "argument to 'memo' must be FUNCTION, got INTEGER"
+        assert Interpreter("eval").run("memo()").message == "wrong number of arguments, got=0, want=1"
+
+    def test_automatic_memoization(self):
+        interpreter = Interpreter("eval", memoize=True, memo_size=8)
+        assert interpreter.run(FIB + "fib(25)").value == 75025
+
+        stats = interpreter.engine.evaluator.memoizer.stats()
+        assert stats["hits"] > 0 and stats["evictions"] > 0 and stats["size"] == 8
+
+    def test_changed_binding_disables_memoization(self):
+        interpreter = Interpreter("eval", memoize=True)
+        interpreter.run("let g = fn(x) { x + 1 }; let f = fn(x) { g(x) };")
+        assert interpreter.run("f(1)").value == 2
+        interpreter.run("let g = fn(x) { x + 2 };")
+
+        assert interpreter.run("f(1)").value == 3
+
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            FIB + "fib(15)",
+            "let f = memo(fn(n) { \"a\" }); f(1) == f(1)",
+            "let f = memo(fn(a, b) { if (a) { b } else { -b } }); f(true, 2) + f(false, 2) + f(true, 2)",
+            "let f = memo(fn(n) { if (n == 0) { 0 } else { f(n - 1) } }); f(50)",
+            "let f = memo(fn(n) { n + true }); f(1)",
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("eval", memoize=True).run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
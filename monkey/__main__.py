@@ -0,0 +1,32 @@
+import argparse
+
+from .codegen import GenerateError
+from .transpiler import load, transpile_file
+
+
+def main(argv: "list[str]" = None) -> None:
+    arg_parser = argparse.ArgumentParser(prog="python -m monkey", description="Monkey command line tools")
+    subcommands = arg_parser.add_subparsers(dest="command", required=True)
+
+    transpile = subcommands.add_parser("transpile", help="write <name>_monkey.py next to each .monkey file")
+    transpile.add_argument("files", nargs="+")
+
+    run = subcommands.add_parser("run", help="transpile (if changed) and run a .monkey file")
+    run.add_argument("file")
+
+    args = arg_parser.parse_args(argv)
+    file = args.file if args.command == "run" else None
+    try:
+        if args.command == "transpile":
+            for file in args.files:
+                print(transpile_file(file))
+        elif args.command == "run":
+            evaluated = load(args.file).run()
+            if evaluated:
+                print(evaluated.inspect())
+    except (SyntaxError, GenerateError) as error:
+        arg_parser.exit(1, f"{arg_parser.prog}: {file}: {error}\n")
+
+
+if __name__ == "__main__":
+    main()
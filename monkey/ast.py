@@ -49,6 +49,11 @@ class Identifier(Expression):
     def __init__(self, token: Token, value: str) -> None:
         self.token = token
         self.value = value
+        # Lexical address filled in by monkey.resolver: frames to walk out and
+        # the slot in that frame, and the builtin an unbound global falls back to.
+        self.depth: int = None
+        self.slot: int = None
+        self.builtin = None
     
     def expression_Node(self) -> Node:
         return None
@@ -112,6 +117,8 @@ class IntegerLiteral(Expression):
     def __init__(self, token: Token, value: int):
         self.token = token
         self.value = value
+        # Runtime Integer cached by monkey.optimizer.
+        self.obj = None
 
     def expression_node(self):
         return None
@@ -216,6 +223,12 @@ class FunctionLiteral(Expression):
         self.token = token
         self.parameters = parameters
         self.body = body
+        # Frame layout (parameters first, then `let` names), set by monkey.resolver.
+        self.scope = None
+        # Names captured from enclosing functions, and the parameters and lets
+        # that nested closures capture; set by monkey.free_variables.
+        self.free = None
+        self.cells = None
 
     def expression_node(self):
         return None
@@ -235,6 +248,11 @@ class CallExpression(Expression):
         self.token = token
         self.function = function
         self.arguments = arguments
+        # Set by mark_tail_calls when the call's value is the enclosing
+        # function's result.
+        self.tail = False
+        # Inline cache for the callee seen last, kept by the evaluator.
+        self.cache = None
 
     def expression_node(self):
         return None
@@ -248,3 +266,83 @@ class CallExpression(Expression):
             args.append(str(a))
 
         return f"{self.function}({', '.join(args)})"
+
+
+class ArrayLiteral(Expression):
+    def __init__(self, token: Token, elements: "list[Expression]" = None) -> None:
+        self.token = token
+        self.elements = elements if elements is not None else []
+
+    def expression_node(self):
+        return None
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def __str__(self) -> str:
+        return f"[{', '.join(str(e) for e in self.elements)}]"
+
+
+class IndexExpression(Expression):
+    def __init__(self, token: Token, left: Expression, index: Expression = None) -> None:
+        self.token = token
+        self.left = left
+        self.index = index
+
+    def expression_node(self):
+        return None
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def __str__(self) -> str:
+        return f"({self.left}[{self.index}])"
+
+
+class HashLiteral(Expression):
+    def __init__(self, token: Token, pairs: "list[tuple[Expression, Expression]]" = None) -> None:
+        self.token = token
+        # (key, value) expressions in source order.
+        self.pairs = pairs if pairs is not None else []
+
+    def expression_node(self):
+        return None
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def __str__(self) -> str:
+        return "{" + ", ".join(f"{key}: {value}" for key, value in self.pairs) + "}"
+
+
+def mark_tail_calls(body: BlockStatement) -> None:
+    # Flags the calls whose value is returned unchanged from the function with
+    # this body: the last expression of the body (through if/else blocks) and
+    # the value of every `return` in statement position. A `return` inside an
+    # expression, such as a let value or an operand, only makes that
+    # expression's value a ReturnValue, so its call must still run in place.
+    def tail_expression(node):
+        if isinstance(node, CallExpression):
+            node.tail = True
+        elif isinstance(node, IfExpression):
+            tail_block(node.consequence)
+            tail_block(node.alternative)
+
+    def tail_block(block):
+        if block and block.statements and isinstance(block.statements[-1], ExpressionStatement):
+            tail_expression(block.statements[-1].expression)
+
+    def returns(block):
+        # Statements of the body, and of the blocks of if expressions that
+        # are statements themselves.
+        if not block:
+            return
+        for statement in block.statements:
+            if isinstance(statement, ReturnStatement):
+                tail_expression(statement.return_value)
+            elif isinstance(statement, ExpressionStatement) and isinstance(statement.expression, IfExpression):
+                returns(statement.expression.consequence)
+                returns(statement.expression.alternative)
+
+    tail_block(body)
+    returns(body)
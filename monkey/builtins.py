@@ -1,5 +1,10 @@
+import copy
+import itertools
+import sys
+from array import array
+
 from . import objects
-from .evaluator import new_error
+from .evaluator import Evaluator, FALSE, NULL, new_error
 
 
 def _len(*args):
@@ -8,10 +13,278 @@ def _len(*args):
 
     arg = args[0]
     if arg.type() == objects.STRING_OBJ:
-        return objects.Integer(len(arg.value))
+        return objects.Integer(arg.length)
+    elif arg.type() == objects.ARRAY_OBJ or arg.type() == objects.HASH_OBJ:
+        return objects.Integer(len(arg))
+    elif arg.type() == objects.ITERATOR_OBJ:
+        # Counts by consuming the iterator.
+        count = 0
+        for element in arg:
+            if type(element) is objects.Error:
+                return element
+            count += 1
+        return objects.Integer(count)
     else:
         return new_error(f"argument to 'len' is not supported, got {arg.type()}")
 
+def _memo(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+
+    fn = args[0]
+    if fn.type() != objects.FUNCTION_OBJ:
+        return new_error(f"argument to 'memo' must be FUNCTION, got {fn.type()}")
+    if not isinstance(fn, objects.Function):
+        # Engines without a memoization layer call it as it is.
+        return fn
+
+    memoized = copy.copy(fn)
+    memoized.memo = True
+    return memoized
+
+def _first(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() == objects.ITERATOR_OBJ:
+        return next(iter(args[0]), NULL)
+    if args[0].type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'first' must be ARRAY or ITERATOR, got {args[0].type()}")
+
+    arr = args[0]
+    return arr.get(0) if len(arr) else NULL
+
+def _last(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'last' must be ARRAY, got {args[0].type()}")
+
+    arr = args[0]
+    return arr.get(len(arr) - 1) if len(arr) else NULL
+
+def _rest(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'rest' must be ARRAY, got {args[0].type()}")
+
+    arr = args[0]
+    if not len(arr):
+        return NULL
+    # Both share the elements of arr, so recursing down an array with rest
+    # takes linear time: a range slices to a range, and a compact array to
+    # a memoryview of its buffer.
+    if arr.ints is not None:
+        ints = memoryview(arr.ints) if type(arr.ints) is array else arr.ints
+        return objects.Array(ints=ints[1:])
+    return objects.Array(arr.elements.rest())
+
+def _push(*args):
+    if len(args) != 2:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=2")
+    if args[0].type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'push' must be ARRAY, got {args[0].type()}")
+
+    arr, element = args
+    return arr.push(element)
+
+def _set(*args):
+    if len(args) != 3:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=3")
+
+    collection, key, value = args
+    if collection.type() == objects.ARRAY_OBJ:
+        if key.type() != objects.INTEGER_OBJ:
+            return new_error(f"index to 'set' must be INTEGER, got {key.type()}")
+        if key.value < 0 or key.value >= len(collection):
+            return new_error(f"index to 'set' out of range: {key.value}")
+        return collection.set(key.value, value)
+    elif collection.type() == objects.HASH_OBJ:
+        if not hasattr(key, "hash_key"):
+            return new_error(f"unusable as hash key: {key.type()}")
+        return collection.set(key, value)
+    return new_error(f"argument to 'set' must be ARRAY or HASH, got {collection.type()}")
+
+def _range(*args):
+    if len(args) not in (1, 2):
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1 or 2")
+    for arg in args:
+        if arg.type() != objects.INTEGER_OBJ:
+            return new_error(f"argument to 'range' must be INTEGER, got {arg.type()}")
+
+    values = range(*[arg.value for arg in args])
+    # len() of a longer range raises OverflowError.
+    if values.stop - values.start > sys.maxsize:
+        return new_error(f"range too long: {values.stop - values.start} elements, at most {sys.maxsize}")
+    return objects.Array.of_ints(values)
+
+def _sum(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() not in (objects.ARRAY_OBJ, objects.ITERATOR_OBJ):
+        return new_error(f"argument to 'sum' must be ARRAY or ITERATOR, got {args[0].type()}")
+
+    arr = args[0]
+    if arr.type() == objects.ARRAY_OBJ and arr.ints is not None:
+        return objects.Integer(sum(arr.ints))
+    total = 0
+    for element in arr:
+        if type(element) is not objects.Integer:
+            if type(element) is objects.Error:
+                return element
+            return new_error(f"argument to 'sum' must be ARRAY of INTEGER, got {element.type()}")
+        total += element.value
+    return objects.Integer(total)
+
+def _sort(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'sort' must be ARRAY, got {args[0].type()}")
+
+    arr = args[0]
+    if arr.ints is not None:
+        return objects.Array(ints=array('q', sorted(arr.ints)))
+    kinds = {type(element) for element in arr.elements}
+    if kinds <= {objects.Integer} or kinds == {objects.String}:
+        return objects.Array.of(sorted(arr.elements, key=lambda element: element.value))
+    return new_error("argument to 'sort' must be ARRAY of INTEGER or of STRING")
+
+def _map(*args, apply=None):
+    if len(args) != 2:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=2")
+    arr, fn = args
+    apply = apply or default_apply
+    if arr.type() == objects.ITERATOR_OBJ:
+        return objects.Iterator(apply(fn, [element]) if type(element) is not objects.Error else element for element in arr)
+    if arr.type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'map' must be ARRAY or ITERATOR, got {arr.type()}")
+
+    results = []
+    for element in arr:
+        result = apply(fn, [element])
+        if result is not None and result.type() == objects.ERROR_OBJ:
+            return result
+        results.append(result)
+    return objects.Array.of(results)
+
+def _filter(*args, apply=None):
+    if len(args) != 2:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=2")
+    arr, fn = args
+    apply = apply or default_apply
+    if arr.type() == objects.ITERATOR_OBJ:
+        return objects.Iterator(lazy_filter(arr, fn, apply))
+    if arr.type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'filter' must be ARRAY or ITERATOR, got {arr.type()}")
+
+    kept = []
+    for element in arr:
+        result = apply(fn, [element])
+        if result is not None and result.type() == objects.ERROR_OBJ:
+            return result
+        if result is not FALSE and result is not NULL:
+            kept.append(element)
+    return objects.Array.of(kept)
+
+def lazy_filter(source: objects.Iterator, fn, apply):
+    for element in source:
+        if type(element) is objects.Error:
+            yield element
+            return
+        result = apply(fn, [element])
+        if result is not None and result.type() == objects.ERROR_OBJ:
+            yield result
+            return
+        if result is not FALSE and result is not NULL:
+            yield element
+
+def _take(*args):
+    if len(args) != 2:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=2")
+    seq, n = args
+    if n.type() != objects.INTEGER_OBJ:
+        return new_error(f"argument to 'take' must be INTEGER, got {n.type()}")
+
+    count = max(n.value, 0)
+    if seq.type() == objects.ITERATOR_OBJ:
+        return objects.Iterator(itertools.islice(seq, count))
+    elif seq.type() == objects.ARRAY_OBJ:
+        if seq.ints is not None:
+            return objects.Array(ints=seq.ints[:count])
+        return objects.Array.of(list(itertools.islice(seq, count)))
+    return new_error(f"argument to 'take' must be ARRAY or ITERATOR, got {seq.type()}")
+
+def _iter(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() == objects.ITERATOR_OBJ:
+        return args[0]
+    if args[0].type() != objects.ARRAY_OBJ:
+        return new_error(f"argument to 'iter' must be ARRAY, got {args[0].type()}")
+
+    return objects.Iterator(iter(args[0]))
+
+def _collect(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() == objects.ARRAY_OBJ:
+        return args[0]
+    if args[0].type() != objects.ITERATOR_OBJ:
+        return new_error(f"argument to 'collect' must be ITERATOR, got {args[0].type()}")
+
+    elements = []
+    for element in args[0]:
+        if type(element) is objects.Error:
+            return element
+        elements.append(element)
+    return objects.Array.of(elements)
+
+def _lines(*args):
+    if len(args) != 1:
+        return new_error(f"wrong number of arguments, got={len(args)}, want=1")
+    if args[0].type() != objects.STRING_OBJ:
+        return new_error(f"argument to 'lines' must be STRING, got {args[0].type()}")
+
+    path = args[0].value
+    try:
+        # Undecodable bytes read as U+FFFD rather than failing mid-pipeline.
+        file = open(path, encoding="utf-8", errors="replace")
+    except OSError as error:
+        return new_error(f"could not open {path}: {error.strerror}")
+    return objects.Iterator(read_lines(file))
+
+def read_lines(file):
+    # The file is closed when the iterator is exhausted or collected.
+    with file:
+        for line in file:
+            yield objects.String(line.rstrip("\n"))
+
+_evaluator = None
+
+def default_apply(fn, args):
+    # How map and filter call fn when the engine running them passes no
+    # `apply` of its own.
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = Evaluator()
+    return _evaluator.apply_function(fn, args)
+
 builtins = {
-    "len": objects.Builtin(_len)
+    "len": objects.Builtin(_len),
+    "memo": objects.Builtin(_memo, pure=False),
+    "first": objects.Builtin(_first),
+    "last": objects.Builtin(_last),
+    "rest": objects.Builtin(_rest),
+    "push": objects.Builtin(_push),
+    "set": objects.Builtin(_set),
+    "range": objects.Builtin(_range),
+    "sum": objects.Builtin(_sum),
+    "sort": objects.Builtin(_sort),
+    "map": objects.Builtin(_map, pure=False, higher_order=True),
+    "filter": objects.Builtin(_filter, pure=False, higher_order=True),
+    "take": objects.Builtin(_take, pure=False),
+    "iter": objects.Builtin(_iter, pure=False),
+    "collect": objects.Builtin(_collect, pure=False),
+    "lines": objects.Builtin(_lines, pure=False),
 }
\ No newline at end of file
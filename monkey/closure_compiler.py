@@ -0,0 +1,367 @@
+import operator
+from typing import Callable
+
+from . import ast
+from . import objects
+from .builtins import builtins
+from .compiler import CompileError
+from .environment import Environment
+from .evaluator import Evaluator, TRUE, FALSE, NULL, arity_error, new_error, recursion_error
+
+
+Code = Callable[[Environment], objects.Object]
+
+Integer = objects.Integer
+Error = objects.Error
+ReturnValue = objects.ReturnValue
+Builtin = objects.Builtin
+
+ARITHMETIC_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.floordiv,
+}
+
+COMPARISON_OPERATORS = {
+    '<': operator.lt,
+    '>': operator.gt,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+class ClosureFunction(objects.Function):
+    def __init__(self, parameters: "list[ast.Identifier]", body: ast.BlockStatement, env: Environment, code: Code) -> None:
+        super().__init__(parameters, body, env)
+        self.code = code
+        self.names = [p.value for p in parameters]
+
+
+class ClosureCompiler:
+    """Turns an AST into nested Python closures taking the environment to run in.
+
+    Dispatch on node type and operator happens once here instead of on every
+    evaluation; anything outside the fast paths defers to Evaluator so both
+    engines agree on results and error messages.
+    """
+
+    def __init__(self) -> None:
+        self.evaluator = Evaluator()
+
+    def compile(self, node: ast.Node) -> Code:
+        if isinstance(node, ast.Program):
+            return self.compile_program(node)
+        elif isinstance(node, ast.ExpressionStatement):
+            return self.compile(node.expression)
+        elif isinstance(node, ast.IntegerLiteral):
+            return self.compile_integer_literal(node)
+        elif isinstance(node, ast.Boolean):
+            value = TRUE if node.value else FALSE
+            return lambda env: value
+        elif isinstance(node, ast.PrefixExpression):
+            return self.compile_prefix_expression(node)
+        elif isinstance(node, ast.InfixExpression):
+            return self.compile_infix_expression(node)
+        elif isinstance(node, ast.IfExpression):
+            return self.compile_if_expression(node)
+        elif isinstance(node, ast.BlockStatement):
+            return self.compile_block_statement(node)
+        elif isinstance(node, ast.ReturnStatement):
+            return self.compile_return_statement(node)
+        elif isinstance(node, ast.LetStatement):
+            return self.compile_let_statement(node)
+        elif isinstance(node, ast.Identifier):
+            return self.compile_identifier(node)
+        elif isinstance(node, ast.FunctionLiteral):
+            return self.compile_function_literal(node)
+        elif isinstance(node, ast.StringLiteral):
+            value = node.value
+            return lambda env: objects.String(value)
+        elif isinstance(node, ast.CallExpression):
+            return self.compile_call_expression(node)
+        elif isinstance(node, ast.ArrayLiteral):
+            return self.compile_array_literal(node)
+        elif isinstance(node, ast.IndexExpression):
+            return self.compile_index_expression(node)
+        elif isinstance(node, ast.HashLiteral):
+            return self.compile_hash_literal(node)
+        else:
+            raise CompileError(f"cannot compile {type(node).__name__}")
+
+    def compile_program(self, program: ast.Program) -> Code:
+        statements = [self.compile(s) for s in program.statements]
+
+        def run_program(env):
+            result = None
+            for statement in statements:
+                try:
+                    result = statement(env)
+                except RecursionError:
+                    return recursion_error()
+                if type(result) is ReturnValue:
+                    return result.value
+                elif type(result) is Error:
+                    return result
+            return result
+
+        return run_program
+
+    def compile_block_statement(self, block: ast.BlockStatement) -> Code:
+        statements = [self.compile(s) for s in block.statements]
+
+        if len(statements) == 1:
+            return statements[0]
+
+        def run_block(env):
+            result = None
+            for statement in statements:
+                result = statement(env)
+                if type(result) is ReturnValue or type(result) is Error:
+                    return result
+            return result
+
+        return run_block
+
+    def compile_integer_literal(self, node: ast.IntegerLiteral) -> Code:
+        if node.obj:
+            obj = node.obj
+            return lambda env: obj
+        value = node.value
+        return lambda env: Integer(value)
+
+    def compile_prefix_expression(self, node: ast.PrefixExpression) -> Code:
+        right_code = self.compile(node.right)
+
+        if node.operator == '!':
+            def bang(env):
+                right = right_code(env)
+                if right is TRUE:
+                    return FALSE
+                elif right is FALSE or right is NULL:
+                    return TRUE
+                elif type(right) is Error:
+                    return right
+                return FALSE
+            return bang
+
+        if node.operator == '-':
+            def minus(env):
+                right = right_code(env)
+                if type(right) is Integer:
+                    return Integer(-right.value)
+                elif type(right) is Error:
+                    return right
+                return self.evaluator.eval_prefix_expression('-', right)
+            return minus
+
+        operator = node.operator
+
+        def prefix(env):
+            right = right_code(env)
+            if type(right) is Error:
+                return right
+            return self.evaluator.eval_prefix_expression(operator, right)
+
+        return prefix
+
+    def compile_infix_expression(self, node: ast.InfixExpression) -> Code:
+        left_code = self.compile(node.left)
+        right_code = self.compile(node.right)
+        operator = node.operator
+        generic = self.evaluator.eval_infix_expression
+
+        if operator in ARITHMETIC_OPERATORS:
+            op = ARITHMETIC_OPERATORS[operator]
+
+            def arithmetic(env):
+                left = left_code(env)
+                if type(left) is Error:
+                    return left
+                right = right_code(env)
+                if type(right) is Integer and type(left) is Integer:
+                    try:
+                        return Integer(op(left.value, right.value))
+                    except ZeroDivisionError:
+                        return generic(operator, left, right)
+                elif type(right) is Error:
+                    return right
+                return generic(operator, left, right)
+
+            return arithmetic
+
+        if operator in COMPARISON_OPERATORS:
+            op = COMPARISON_OPERATORS[operator]
+
+            def comparison(env):
+                left = left_code(env)
+                if type(left) is Error:
+                    return left
+                right = right_code(env)
+                if type(right) is Integer and type(left) is Integer:
+                    return TRUE if op(left.value, right.value) else FALSE
+                elif type(right) is Error:
+                    return right
+                return generic(operator, left, right)
+
+            return comparison
+
+        def infix(env):
+            left = left_code(env)
+            if type(left) is Error:
+                return left
+            right = right_code(env)
+            if type(right) is Error:
+                return right
+            return generic(operator, left, right)
+
+        return infix
+
+    def compile_if_expression(self, node: ast.IfExpression) -> Code:
+        condition_code = self.compile(node.condition)
+        consequence_code = self.compile(node.consequence)
+        alternative_code = self.compile(node.alternative) if node.alternative else None
+
+        def if_expression(env):
+            condition = condition_code(env)
+            if condition is FALSE or condition is NULL:
+                if alternative_code is None:
+                    return NULL
+                return alternative_code(env)
+            elif type(condition) is Error:
+                return condition
+            return consequence_code(env)
+
+        return if_expression
+
+    def compile_return_statement(self, node: ast.ReturnStatement) -> Code:
+        value_code = self.compile(node.return_value)
+
+        def return_statement(env):
+            value = value_code(env)
+            if type(value) is Error:
+                return value
+            return ReturnValue(value)
+
+        return return_statement
+
+    def compile_let_statement(self, node: ast.LetStatement) -> Code:
+        value_code = self.compile(node.value)
+        name = node.name.value
+
+        def let_statement(env):
+            value = value_code(env)
+            if type(value) is Error:
+                return value
+            env.set(name, value)
+
+        return let_statement
+
+    def compile_identifier(self, node: ast.Identifier) -> Code:
+        name = node.value
+        builtin = builtins.get(name)
+
+        def identifier(env):
+            value = env.get(name)
+            if value:
+                return value
+            if builtin:
+                return builtin
+            return new_error(f"Identifier not found: {name}")
+
+        return identifier
+
+    def compile_function_literal(self, node: ast.FunctionLiteral) -> Code:
+        parameters = node.parameters
+        body = node.body
+        body_code = self.compile(body)
+
+        def function_literal(env):
+            return ClosureFunction(parameters, body, env, body_code)
+
+        return function_literal
+
+    def compile_call_expression(self, node: ast.CallExpression) -> Code:
+        function_code = self.compile(node.function)
+        argument_codes = [self.compile(a) for a in node.arguments]
+        apply_function = self.evaluator.apply_function
+
+        def call_expression(env):
+            fn = function_code(env)
+            if type(fn) is Error:
+                return fn
+
+            args = []
+            for argument_code in argument_codes:
+                arg = argument_code(env)
+                if type(arg) is Error:
+                    return arg
+                args.append(arg)
+
+            if type(fn) is ClosureFunction:
+                if len(fn.names) != len(args):
+                    return arity_error(len(fn.names), len(args))
+                extended_env = Environment(fn.env)
+                extended_env.store = dict(zip(fn.names, args))
+                result = fn.code(extended_env)
+                if type(result) is ReturnValue:
+                    return result.value
+                return result
+            elif type(fn) is Builtin:
+                return fn._fn(*args)
+            return apply_function(fn, args)
+
+        return call_expression
+
+    def compile_array_literal(self, node: ast.ArrayLiteral) -> Code:
+        element_codes = [self.compile(e) for e in node.elements]
+
+        def array_literal(env):
+            elements = []
+            for element_code in element_codes:
+                element = element_code(env)
+                if type(element) is Error:
+                    return element
+                elements.append(element)
+            return objects.Array.of(elements)
+
+        return array_literal
+
+    def compile_index_expression(self, node: ast.IndexExpression) -> Code:
+        left_code = self.compile(node.left)
+        index_code = self.compile(node.index)
+        generic = self.evaluator.eval_index_expression
+
+        def index_expression(env):
+            left = left_code(env)
+            if type(left) is Error:
+                return left
+            index = index_code(env)
+            if type(index) is Error:
+                return index
+            return generic(left, index)
+
+        return index_expression
+
+    def compile_hash_literal(self, node: ast.HashLiteral) -> Code:
+        pair_codes = [(self.compile(key), self.compile(value)) for key, value in node.pairs]
+
+        def hash_literal(env):
+            pairs = []
+            for key_code, value_code in pair_codes:
+                key = key_code(env)
+                if type(key) is Error:
+                    return key
+                if not hasattr(key, "hash_key"):
+                    return new_error(f"unusable as hash key: {key.type()}")
+                value = value_code(env)
+                if type(value) is Error:
+                    return value
+                pairs.append((key, value))
+            return objects.Hash.of(pairs)
+
+        return hash_literal
+
+
+def compile_program(program: ast.Program) -> Code:
+    return ClosureCompiler().compile(program)
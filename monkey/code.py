@@ -0,0 +1,137 @@
+from enum import IntEnum, auto
+
+
+class Opcode(IntEnum):
+    CONSTANT=auto()
+    POP=auto()
+
+    ADD=auto()
+    SUB=auto()
+    MUL=auto()
+    DIV=auto()
+    EQUAL=auto()
+    NOT_EQUAL=auto()
+    GREATER_THAN=auto()
+    LESS_THAN=auto()
+    MINUS=auto()
+    BANG=auto()
+
+    TRUE=auto()
+    FALSE=auto()
+    NULL=auto()
+
+    JUMP_NOT_TRUTHY=auto()
+    JUMP=auto()
+
+    GET_GLOBAL=auto()
+    SET_GLOBAL=auto()
+    GET_LOCAL=auto()
+    SET_LOCAL=auto()
+    GET_BUILTIN=auto()
+
+    # Locals captured by nested functions live in cells so that closures
+    # observe later `let` bindings, exactly like a shared Environment.
+    MAKE_CELL=auto()
+    GET_CELL=auto()
+    SET_CELL=auto()
+    LOAD_CELL=auto()
+    GET_FREE=auto()
+    LOAD_FREE=auto()
+    CLOSURE=auto()
+
+    CALL=auto()
+    RETURN_VALUE=auto()
+    RETURN=auto()
+
+    ARRAY=auto()
+    HASH=auto()
+    INDEX=auto()
+    # Pushes a new String copied from a constant: == compares strings by
+    # identity, so each evaluation of a literal must make its own.
+    STRING=auto()
+
+
+class Definition:
+    def __init__(self, name: str, operand_widths: "list[int]"):
+        self.name = name
+        self.operand_widths = operand_widths
+
+
+definitions = {
+    Opcode.CONSTANT: Definition("CONSTANT", [2]),
+    Opcode.POP: Definition("POP", []),
+    Opcode.ADD: Definition("ADD", []),
+    Opcode.SUB: Definition("SUB", []),
+    Opcode.MUL: Definition("MUL", []),
+    Opcode.DIV: Definition("DIV", []),
+    Opcode.EQUAL: Definition("EQUAL", []),
+    Opcode.NOT_EQUAL: Definition("NOT_EQUAL", []),
+    Opcode.GREATER_THAN: Definition("GREATER_THAN", []),
+    Opcode.LESS_THAN: Definition("LESS_THAN", []),
+    Opcode.MINUS: Definition("MINUS", []),
+    Opcode.BANG: Definition("BANG", []),
+    Opcode.TRUE: Definition("TRUE", []),
+    Opcode.FALSE: Definition("FALSE", []),
+    Opcode.NULL: Definition("NULL", []),
+    Opcode.JUMP_NOT_TRUTHY: Definition("JUMP_NOT_TRUTHY", [2]),
+    Opcode.JUMP: Definition("JUMP", [2]),
+    Opcode.GET_GLOBAL: Definition("GET_GLOBAL", [2]),
+    Opcode.SET_GLOBAL: Definition("SET_GLOBAL", [2]),
+    Opcode.GET_LOCAL: Definition("GET_LOCAL", [1]),
+    Opcode.SET_LOCAL: Definition("SET_LOCAL", [1]),
+    Opcode.GET_BUILTIN: Definition("GET_BUILTIN", [1]),
+    Opcode.MAKE_CELL: Definition("MAKE_CELL", [1]),
+    Opcode.GET_CELL: Definition("GET_CELL", [1]),
+    Opcode.SET_CELL: Definition("SET_CELL", [1]),
+    Opcode.LOAD_CELL: Definition("LOAD_CELL", [1]),
+    Opcode.GET_FREE: Definition("GET_FREE", [1]),
+    Opcode.LOAD_FREE: Definition("LOAD_FREE", [1]),
+    Opcode.CLOSURE: Definition("CLOSURE", [2, 1]),
+    Opcode.CALL: Definition("CALL", [1]),
+    Opcode.RETURN_VALUE: Definition("RETURN_VALUE", []),
+    Opcode.RETURN: Definition("RETURN", []),
+    Opcode.ARRAY: Definition("ARRAY", [2]),
+    Opcode.HASH: Definition("HASH", [2]),
+    Opcode.INDEX: Definition("INDEX", []),
+    Opcode.STRING: Definition("STRING", [2]),
+}
+
+
+def lookup(op: int) -> Definition:
+    definition = definitions.get(op)
+    if definition is None:
+        raise KeyError(f"opcode {op} undefined")
+    return definition
+
+
+def make(op: Opcode, *operands: int) -> bytes:
+    definition = definitions.get(op)
+    if definition is None:
+        return b''
+
+    instruction = bytearray([op])
+    for operand, width in zip(operands, definition.operand_widths):
+        instruction += operand.to_bytes(width, 'big')
+
+    return bytes(instruction)
+
+
+def read_operands(definition: Definition, ins: bytes, offset: int) -> "tuple[list[int], int]":
+    operands = []
+    for width in definition.operand_widths:
+        operands.append(int.from_bytes(ins[offset:offset + width], 'big'))
+        offset += width
+
+    return operands, offset
+
+
+def disassemble(ins: bytes) -> str:
+    out = []
+    i = 0
+    while i < len(ins):
+        definition = lookup(ins[i])
+        operands, next_i = read_operands(definition, ins, i + 1)
+        out.append(f"{i:04d} {' '.join([definition.name] + [str(o) for o in operands])}")
+        i = next_i
+
+    return '\n'.join(out)
@@ -0,0 +1,346 @@
+from . import ast
+from . import objects
+from .builtins import builtins
+from .compiler import let_names
+from .environment import Environment
+from .evaluator import Evaluator, TRUE, FALSE, NULL, new_error
+
+
+class GenerateError(Exception):
+    # A node the generator has no translation for, such as an array literal.
+    # The tiered engine keeps interpreting such functions; the transpiler
+    # reports it.
+    pass
+
+
+ARITHMETIC_OPERATORS = {'+': '+', '-': '-', '*': '*', '/': '//'}
+COMPARISON_OPERATORS = {'<': '<', '>': '>', '==': '==', '!=': '!='}
+
+
+class PythonGenerator:
+    """Translates Monkey function literals and programs into Python source.
+
+    Every generated def takes the Environment the Monkey function closed over
+    followed by its arguments, and returns the Monkey value (an Error, or a
+    TailCall for calls in tail position) instead of a ReturnValue. Bodies
+    without nested function literals, whose lets are all made before they are
+    read, keep their variables in Python locals; anything else goes through an
+    Environment exactly like Evaluator. The source refers to these names,
+    which runtime_namespace() provides:
+
+        Integer, String, Error, TailCall, TRUE, FALSE, NULL, Environment
+        lookup(env, name), infix(op, l, r), prefix(op, r), call(fn, args)
+        make_function(literal, env), k<i> integer constants, L<i> literals
+    """
+
+    def __init__(self) -> None:
+        self.constants: "list[int]" = []
+        self.literals: "list[ast.FunctionLiteral]" = []
+        self.definitions: "list[str]" = []
+        self.lines: "list[str]" = []
+        self.indent = 0
+        self.temps = 0
+        self.locals: "set[str]" = None
+        # Expressions being generated around the current node. A `return`
+        # inside one only makes its value a ReturnValue in Evaluator, which
+        # a Python return cannot express, so such bodies are refused.
+        self.expression_depth = 0
+
+    def source(self) -> str:
+        return "\n\n".join(self.definitions) + "\n"
+
+    def function(self, literal: ast.FunctionLiteral, name: str) -> str:
+        lines, indent, temps, local_vars, depth = self.lines, self.indent, self.temps, self.locals, self.expression_depth
+        self.lines, self.indent, self.temps, self.expression_depth = [], 1, 0, 0
+        self.locals = fast_locals(literal)
+
+        names = [p.value for p in literal.parameters]
+        if self.locals is not None:
+            parameters = [local(n) for n in names]
+        else:
+            parameters = [f"p{i}" for i in range(len(names))]
+            self.emit("env = Environment(env)")
+            store = ", ".join(f"{n!r}: p{i}" for i, n in enumerate(names))
+            self.emit(f"env.store = {{{store}}}")
+
+        value = self.block(literal.body)
+        self.emit(f"return {value}")
+        self.definitions.append("\n".join([f"def {name}({', '.join(['env'] + parameters)}):"] + self.lines))
+
+        self.lines, self.indent, self.temps, self.locals, self.expression_depth = lines, indent, temps, local_vars, depth
+        return name
+
+    def program(self, program: ast.Program, name: str = "main") -> str:
+        # Runs in the given Environment, so top-level lets stay visible to
+        # later programs and to the functions that closed over it.
+        lines, indent, temps, local_vars, depth = self.lines, self.indent, self.temps, self.locals, self.expression_depth
+        self.lines, self.indent, self.temps, self.locals, self.expression_depth = [], 1, 0, None, 0
+
+        value = self.block(program)
+        self.emit(f"return {value}")
+        self.definitions.append("\n".join([f"def {name}(env):"] + self.lines))
+
+        self.lines, self.indent, self.temps, self.locals, self.expression_depth = lines, indent, temps, local_vars, depth
+        return name
+
+    def emit(self, line: str) -> None:
+        self.lines.append("    " * self.indent + line)
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"t{self.temps}"
+
+    def check(self, name: str) -> None:
+        self.emit(f"if type({name}) is Error:")
+        self.emit(f"    return {name}")
+
+    def block(self, block: "ast.BlockStatement | ast.Program") -> str:
+        value = "None"
+        for statement in block.statements:
+            value = self.statement(statement)
+        return value
+
+    def statement(self, node: ast.Statement) -> str:
+        if isinstance(node, ast.ExpressionStatement):
+            if isinstance(node.expression, ast.IfExpression):
+                # The statements of its blocks are statements of this body.
+                return self.if_expression(node.expression)
+            return self.expression(node.expression)
+        elif isinstance(node, ast.LetStatement):
+            value = self.expression(node.value)
+            name = node.name.value
+            if self.locals is not None and name in self.locals:
+                self.emit(f"{local(name)} = {value}")
+            else:
+                self.emit(f"env.set({name!r}, {value})")
+            return "None"
+        elif isinstance(node, ast.ReturnStatement):
+            if self.expression_depth:
+                raise GenerateError("cannot generate return inside an expression")
+            self.emit(f"return {self.expression(node.return_value)}")
+            return "None"
+        raise GenerateError(f"cannot generate {type(node).__name__}")
+
+    def expression(self, node: ast.Expression) -> str:
+        # Emits the code computing node and returns a name holding its value,
+        # which is never an Error: errors return from the generated def.
+        self.expression_depth += 1
+        try:
+            return self.generate_expression(node)
+        finally:
+            self.expression_depth -= 1
+
+    def generate_expression(self, node: ast.Expression) -> str:
+        if isinstance(node, ast.IntegerLiteral):
+            if node.value not in self.constants:
+                self.constants.append(node.value)
+            return f"k{self.constants.index(node.value)}"
+        elif isinstance(node, ast.Boolean):
+            return "TRUE" if node.value else "FALSE"
+        elif isinstance(node, ast.StringLiteral):
+            # A fresh String each time, since == compares strings by identity.
+            result = self.temp()
+            self.emit(f"{result} = String({node.value!r})")
+            return result
+        elif isinstance(node, ast.Identifier):
+            return self.identifier(node)
+        elif isinstance(node, ast.PrefixExpression):
+            return self.prefix(node)
+        elif isinstance(node, ast.InfixExpression):
+            return self.infix(node)
+        elif isinstance(node, ast.IfExpression):
+            return self.if_expression(node)
+        elif isinstance(node, ast.CallExpression):
+            return self.call(node)
+        elif isinstance(node, ast.FunctionLiteral):
+            result = self.temp()
+            self.emit(f"{result} = {self.function_value(node)}")
+            return result
+        elif isinstance(node, ast.BlockStatement):
+            return self.block(node)
+        raise GenerateError(f"cannot generate {type(node).__name__}")
+
+    def identifier(self, node: ast.Identifier) -> str:
+        if self.locals is not None and node.value in self.locals:
+            return local(node.value)
+        result = self.temp()
+        self.emit(f"{result} = lookup(env, {node.value!r})")
+        self.check(result)
+        return result
+
+    def prefix(self, node: ast.PrefixExpression) -> str:
+        right = self.expression(node.right)
+        result = self.temp()
+        if node.operator == '!':
+            self.emit(f"{result} = TRUE if {right} is FALSE or {right} is NULL else FALSE")
+            return result
+        if node.operator == '-':
+            self.emit(f"if type({right}) is Integer:")
+            self.emit(f"    {result} = Integer(-{right}.value)")
+            self.emit("else:")
+            self.indent += 1
+        self.emit(f"{result} = prefix({node.operator!r}, {right})")
+        self.check(result)
+        if node.operator == '-':
+            self.indent -= 1
+        return result
+
+    def infix(self, node: ast.InfixExpression) -> str:
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        result = self.temp()
+        operator = node.operator
+
+        if operator in ARITHMETIC_OPERATORS or operator in COMPARISON_OPERATORS:
+            # Division by zero is left to infix(), which returns the Error.
+            nonzero = f" and {right}.value" if operator == '/' else ""
+            self.emit(f"if type({left}) is Integer and type({right}) is Integer{nonzero}:")
+            if operator in ARITHMETIC_OPERATORS:
+                self.emit(f"    {result} = Integer({left}.value {ARITHMETIC_OPERATORS[operator]} {right}.value)")
+            else:
+                self.emit(f"    {result} = TRUE if {left}.value {COMPARISON_OPERATORS[operator]} {right}.value else FALSE")
+            self.emit("else:")
+            self.indent += 1
+        self.emit(f"{result} = infix({operator!r}, {left}, {right})")
+        self.check(result)
+        if operator in ARITHMETIC_OPERATORS or operator in COMPARISON_OPERATORS:
+            self.indent -= 1
+        return result
+
+    def if_expression(self, node: ast.IfExpression) -> str:
+        condition = self.expression(node.condition)
+        result = self.temp()
+
+        self.emit(f"if {condition} is not FALSE and {condition} is not NULL:")
+        self.indent += 1
+        self.emit(f"{result} = {self.block(node.consequence)}")
+        self.indent -= 1
+        self.emit("else:")
+        self.indent += 1
+        if node.alternative:
+            self.emit(f"{result} = {self.block(node.alternative)}")
+        else:
+            self.emit(f"{result} = NULL")
+        self.indent -= 1
+        return result
+
+    def call(self, node: ast.CallExpression) -> str:
+        function = self.expression(node.function)
+        arguments = ", ".join(self.expression(a) for a in node.arguments)
+
+        if node.tail:
+            # The caller's trampoline runs it, as with Evaluator's TailCall.
+            self.emit(f"return TailCall({function}, [{arguments}])")
+            return "None"
+
+        result = self.temp()
+        self.emit(f"{result} = call({function}, [{arguments}])")
+        self.check(result)
+        return result
+
+    def function_value(self, node: ast.FunctionLiteral) -> str:
+        self.literals.append(node)
+        return f"make_function(L{len(self.literals) - 1}, env)"
+
+
+def local(name: str) -> str:
+    return "v_" + name
+
+
+def fast_locals(literal: ast.FunctionLiteral) -> "set[str]":
+    # The names that can live in Python locals, or None when the body needs a
+    # real Environment: it creates closures, repeats a parameter, or may read
+    # one of its own let names before the let has run (Evaluator would then
+    # find the outer binding).
+    params = [p.value for p in literal.parameters]
+    if len(set(params)) != len(params) or contains_function_literal(literal.body):
+        return None
+
+    pending = set(let_names(literal.body)) - set(params)
+    names = set(params)
+    for statement in literal.body.statements:
+        if read_names(statement) & pending:
+            return None
+        if isinstance(statement, ast.LetStatement):
+            pending.discard(statement.name.value)
+            names.add(statement.name.value)
+        elif set(let_names(ast.BlockStatement(None, [statement]))) - names:
+            return None
+    return names
+
+
+def contains_function_literal(node: ast.Node) -> bool:
+    if isinstance(node, ast.FunctionLiteral):
+        return True
+    return any(contains_function_literal(child) for child in children(node))
+
+
+def read_names(node: ast.Node) -> "set[str]":
+    if isinstance(node, ast.Identifier):
+        return {node.value}
+    names = set()
+    for child in children(node):
+        names |= read_names(child)
+    return names
+
+
+def children(node: ast.Node) -> "list[ast.Node]":
+    if isinstance(node, (ast.Program, ast.BlockStatement)):
+        return list(node.statements)
+    elif isinstance(node, ast.ExpressionStatement):
+        return [node.expression]
+    elif isinstance(node, ast.LetStatement):
+        return [node.value]
+    elif isinstance(node, ast.ReturnStatement):
+        return [node.return_value]
+    elif isinstance(node, ast.PrefixExpression):
+        return [node.right]
+    elif isinstance(node, ast.InfixExpression):
+        return [node.left, node.right]
+    elif isinstance(node, ast.IfExpression):
+        return [c for c in (node.condition, node.consequence, node.alternative) if c]
+    elif isinstance(node, ast.CallExpression):
+        return [node.function] + list(node.arguments)
+    elif isinstance(node, ast.FunctionLiteral):
+        return [node.body]
+    elif isinstance(node, ast.ArrayLiteral):
+        return list(node.elements)
+    elif isinstance(node, ast.IndexExpression):
+        return [node.left, node.index]
+    elif isinstance(node, ast.HashLiteral):
+        return [child for pair in node.pairs for child in pair]
+    return []
+
+
+def lookup(env: Environment, name: str) -> objects.Object:
+    val = env.get(name)
+    if val is not None:
+        return val
+    builtin = builtins.get(name)
+    if builtin:
+        return builtin
+    return new_error(f"Identifier not found: {name}")
+
+
+def runtime_namespace(generator: PythonGenerator, call, make_function) -> dict:
+    evaluator = Evaluator()
+    namespace = {
+        "Integer": objects.Integer,
+        "String": objects.String,
+        "Error": objects.Error,
+        "TailCall": objects.TailCall,
+        "TRUE": TRUE,
+        "FALSE": FALSE,
+        "NULL": NULL,
+        "Environment": Environment,
+        "lookup": lookup,
+        "infix": evaluator.eval_infix_expression,
+        "prefix": evaluator.eval_prefix_expression,
+        "call": call,
+        "make_function": make_function,
+    }
+    for index, value in enumerate(generator.constants):
+        namespace[f"k{index}"] = objects.Integer(value)
+    for index, literal in enumerate(generator.literals):
+        namespace[f"L{index}"] = literal
+    return namespace
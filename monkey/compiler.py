@@ -0,0 +1,437 @@
+from . import ast
+from . import objects
+from .builtins import builtins
+from .code import Opcode, make, lookup
+
+
+GLOBAL_SCOPE = "GLOBAL"
+LOCAL_SCOPE = "LOCAL"
+CELL_SCOPE = "CELL"
+FREE_SCOPE = "FREE"
+BUILTIN_SCOPE = "BUILTIN"
+
+BUILTIN_NAMES = list(builtins)
+
+
+class CompileError(Exception):
+    # A program the bytecode cannot express, such as one with more constants
+    # or a longer jump than an operand holds. Engines report it as an Error.
+    pass
+
+
+class Symbol:
+    def __init__(self, name: str, scope: str, index: int) -> None:
+        self.name = name
+        self.scope = scope
+        self.index = index
+
+
+class SymbolTable:
+    def __init__(self, outer: "SymbolTable" = None, captured: "set[str]" = frozenset()) -> None:
+        self.outer = outer
+        self.captured = captured
+        self.store: dict[str, Symbol] = {}
+        self.names: list[str] = []
+        self.free_symbols: list[Symbol] = []
+
+    @property
+    def num_definitions(self) -> int:
+        return len(self.names)
+
+    def define(self, name: str) -> Symbol:
+        # Re-binding a name in the same scope reuses its slot, so closures that
+        # already refer to it see the new value (as with Environment.set).
+        symbol = self.store.get(name)
+        if symbol and symbol.scope in (GLOBAL_SCOPE, LOCAL_SCOPE, CELL_SCOPE):
+            return symbol
+
+        if self.outer is None:
+            scope = GLOBAL_SCOPE
+        elif name in self.captured:
+            scope = CELL_SCOPE
+        else:
+            scope = LOCAL_SCOPE
+
+        symbol = Symbol(name, scope, len(self.names))
+        self.names.append(name)
+        self.store[name] = symbol
+        return symbol
+
+    def define_builtin(self, index: int, name: str) -> Symbol:
+        symbol = Symbol(name, BUILTIN_SCOPE, index)
+        self.store[name] = symbol
+        return symbol
+
+    def define_free(self, original: Symbol) -> Symbol:
+        self.free_symbols.append(original)
+        symbol = Symbol(original.name, FREE_SCOPE, len(self.free_symbols) - 1)
+        self.store[original.name] = symbol
+        return symbol
+
+    def resolve(self, name: str) -> Symbol:
+        symbol = self.store.get(name)
+        if symbol is not None or self.outer is None:
+            return symbol
+
+        symbol = self.outer.resolve(name)
+        if symbol is None or symbol.scope in (GLOBAL_SCOPE, BUILTIN_SCOPE):
+            return symbol
+
+        return self.define_free(symbol)
+
+    def root(self) -> "SymbolTable":
+        table = self
+        while table.outer is not None:
+            table = table.outer
+        return table
+
+
+def new_symbol_table() -> SymbolTable:
+    table = SymbolTable()
+    for index, name in enumerate(BUILTIN_NAMES):
+        table.define_builtin(index, name)
+    return table
+
+
+class Bytecode:
+    def __init__(self, instructions: bytes, constants: "list[objects.Object]", global_names: "list[str]") -> None:
+        self.instructions = instructions
+        self.constants = constants
+        self.global_names = global_names
+
+
+class CompilationScope:
+    def __init__(self) -> None:
+        self.instructions = bytearray()
+
+
+INFIX_OPCODES = {
+    '+': Opcode.ADD,
+    '-': Opcode.SUB,
+    '*': Opcode.MUL,
+    '/': Opcode.DIV,
+    '==': Opcode.EQUAL,
+    '!=': Opcode.NOT_EQUAL,
+    '>': Opcode.GREATER_THAN,
+    '<': Opcode.LESS_THAN,
+}
+
+PREFIX_OPCODES = {
+    '-': Opcode.MINUS,
+    '!': Opcode.BANG,
+}
+
+LOAD_OPCODES = {
+    GLOBAL_SCOPE: Opcode.GET_GLOBAL,
+    LOCAL_SCOPE: Opcode.GET_LOCAL,
+    CELL_SCOPE: Opcode.GET_CELL,
+    FREE_SCOPE: Opcode.GET_FREE,
+    BUILTIN_SCOPE: Opcode.GET_BUILTIN,
+}
+
+STORE_OPCODES = {
+    GLOBAL_SCOPE: Opcode.SET_GLOBAL,
+    LOCAL_SCOPE: Opcode.SET_LOCAL,
+    CELL_SCOPE: Opcode.SET_CELL,
+}
+
+
+class Compiler:
+    def __init__(self, symbol_table: SymbolTable = None, constants: "list[objects.Object]" = None,
+                 constant_indices: "dict[tuple, int]" = None) -> None:
+        self.symbol_table = symbol_table or new_symbol_table()
+        self.constants = constants if constants is not None else []
+        # Index of each integer and string constant by hash_key(), so a value
+        # is stored once however often it occurs, or is compiled again.
+        self.constant_indices = constant_indices if constant_indices is not None else {}
+        self.scopes = [CompilationScope()]
+
+    def compile(self, program: ast.Program) -> Bytecode:
+        statements = program.statements
+        for statement in statements[:-1]:
+            self.compile_statement(statement)
+
+        # The program evaluates to its last expression statement, like Evaluator.eval_program.
+        if statements and isinstance(statements[-1], ast.ExpressionStatement):
+            self.compile_expression(statements[-1].expression)
+            self.emit(Opcode.RETURN_VALUE)
+        else:
+            if statements:
+                self.compile_statement(statements[-1])
+            self.emit(Opcode.RETURN)
+
+        return self.bytecode()
+
+    def bytecode(self) -> Bytecode:
+        return Bytecode(
+            bytes(self.current_instructions()),
+            self.constants,
+            self.symbol_table.root().names,
+        )
+
+    def compile_statement(self, node: ast.Statement) -> None:
+        if isinstance(node, ast.ExpressionStatement):
+            self.compile_expression(node.expression)
+            self.emit(Opcode.POP)
+        elif isinstance(node, ast.LetStatement):
+            # Binding the name first lets a function literal refer to itself.
+            if isinstance(node.value, ast.FunctionLiteral):
+                symbol = self.symbol_table.define(node.name.value)
+                self.compile_expression(node.value)
+            else:
+                self.compile_expression(node.value)
+                symbol = self.symbol_table.define(node.name.value)
+            self.emit(STORE_OPCODES[symbol.scope], symbol.index)
+        elif isinstance(node, ast.ReturnStatement):
+            self.compile_expression(node.return_value)
+            self.emit(Opcode.RETURN_VALUE)
+        else:
+            raise CompileError(f"cannot compile statement: {type(node).__name__}")
+
+    def compile_block(self, block: ast.BlockStatement) -> None:
+        # Leaves the value of the block on the stack.
+        statements = block.statements if block else []
+        for statement in statements[:-1]:
+            self.compile_statement(statement)
+
+        if statements and isinstance(statements[-1], ast.ExpressionStatement):
+            self.compile_expression(statements[-1].expression)
+        else:
+            if statements:
+                self.compile_statement(statements[-1])
+            self.emit(Opcode.NULL)
+
+    def compile_expression(self, node: ast.Expression) -> None:
+        if isinstance(node, ast.InfixExpression):
+            self.compile_expression(node.left)
+            self.compile_expression(node.right)
+            op = INFIX_OPCODES.get(node.operator)
+            if op is None:
+                raise ValueError(f"unknown operator {node.operator}")
+            self.emit(op)
+        elif isinstance(node, ast.IntegerLiteral):
+            self.emit(Opcode.CONSTANT, self.add_literal(objects.Integer(node.value)))
+        elif isinstance(node, ast.Identifier):
+            self.load_symbol(node.value)
+        elif isinstance(node, ast.CallExpression):
+            self.compile_expression(node.function)
+            for arg in node.arguments:
+                self.compile_expression(arg)
+            self.emit(Opcode.CALL, len(node.arguments))
+        elif isinstance(node, ast.IfExpression):
+            self.compile_expression(node.condition)
+            jump_not_truthy = self.emit(Opcode.JUMP_NOT_TRUTHY, 0xFFFF)
+            self.compile_block(node.consequence)
+            jump = self.emit(Opcode.JUMP, 0xFFFF)
+            self.change_operand(jump_not_truthy, len(self.current_instructions()))
+            if node.alternative:
+                self.compile_block(node.alternative)
+            else:
+                self.emit(Opcode.NULL)
+            self.change_operand(jump, len(self.current_instructions()))
+        elif isinstance(node, ast.PrefixExpression):
+            self.compile_expression(node.right)
+            op = PREFIX_OPCODES.get(node.operator)
+            if op is None:
+                raise ValueError(f"unknown operator {node.operator}")
+            self.emit(op)
+        elif isinstance(node, ast.Boolean):
+            self.emit(Opcode.TRUE if node.value else Opcode.FALSE)
+        elif isinstance(node, ast.StringLiteral):
+            self.emit(Opcode.STRING, self.add_literal(objects.String(node.value)))
+        elif isinstance(node, ast.FunctionLiteral):
+            self.compile_function_literal(node)
+        elif isinstance(node, ast.ArrayLiteral):
+            for element in node.elements:
+                self.compile_expression(element)
+            self.emit(Opcode.ARRAY, len(node.elements))
+        elif isinstance(node, ast.HashLiteral):
+            for key, value in node.pairs:
+                self.compile_expression(key)
+                self.compile_expression(value)
+            self.emit(Opcode.HASH, 2 * len(node.pairs))
+        elif isinstance(node, ast.IndexExpression):
+            self.compile_expression(node.left)
+            self.compile_expression(node.index)
+            self.emit(Opcode.INDEX)
+        else:
+            raise CompileError(f"cannot compile expression: {type(node).__name__}")
+
+    def compile_function_literal(self, node: ast.FunctionLiteral) -> None:
+        captured = nested_identifiers(node.body)
+        self.enter_scope(captured)
+
+        for param in node.parameters:
+            self.symbol_table.define(param.value)
+        # Captured names are allocated up front so that closures created before
+        # a `let` still share its cell.
+        for name in let_names(node.body):
+            if name in captured:
+                self.symbol_table.define(name)
+        for symbol in list(self.symbol_table.store.values()):
+            if symbol.scope == CELL_SCOPE:
+                self.emit(Opcode.MAKE_CELL, symbol.index)
+
+        self.compile_block(node.body)
+        self.emit(Opcode.RETURN_VALUE)
+
+        table = self.symbol_table
+        instructions = self.leave_scope()
+
+        for symbol in table.free_symbols:
+            if symbol.scope == CELL_SCOPE:
+                self.emit(Opcode.LOAD_CELL, symbol.index)
+            else:
+                self.emit(Opcode.LOAD_FREE, symbol.index)
+
+        fn = objects.CompiledFunction(
+            bytes(instructions),
+            num_locals=table.num_definitions,
+            num_parameters=len(node.parameters),
+            local_names=table.names,
+        )
+        self.emit(Opcode.CLOSURE, self.add_constant(fn), len(table.free_symbols))
+
+    def load_symbol(self, name: str) -> None:
+        symbol = self.symbol_table.resolve(name)
+        if symbol is None:
+            # Unknown names become global slots that are checked at runtime, so a
+            # function may refer to a global defined after it.
+            symbol = self.symbol_table.root().define(name)
+        self.emit(LOAD_OPCODES[symbol.scope], symbol.index)
+
+    def add_constant(self, obj: objects.Object) -> int:
+        self.constants.append(obj)
+        return len(self.constants) - 1
+
+    def add_literal(self, obj: objects.Object) -> int:
+        key = obj.hash_key()
+        index = self.constant_indices.get(key)
+        if index is None:
+            index = self.constant_indices[key] = self.add_constant(obj)
+        return index
+
+    def current_instructions(self) -> bytearray:
+        return self.scopes[-1].instructions
+
+    def emit(self, op: Opcode, *operands: int) -> int:
+        ins = self.current_instructions()
+        position = len(ins)
+        ins += make_checked(op, *operands)
+        return position
+
+    def change_operand(self, position: int, operand: int) -> None:
+        ins = self.current_instructions()
+        op = ins[position]
+        ins[position:position + 1 + sum(lookup(op).operand_widths)] = make_checked(op, operand)
+
+    def enter_scope(self, captured: "set[str]" = frozenset()) -> None:
+        self.scopes.append(CompilationScope())
+        self.symbol_table = SymbolTable(self.symbol_table, captured)
+
+    def leave_scope(self) -> bytearray:
+        instructions = self.scopes.pop().instructions
+        self.symbol_table = self.symbol_table.outer
+        return instructions
+
+
+def make_checked(op: Opcode, *operands: int) -> bytes:
+    definition = lookup(op)
+    for operand, width in zip(operands, definition.operand_widths):
+        if not 0 <= operand < 1 << 8 * width:
+            raise CompileError(f"program too large: {definition.name} operand {operand} does not fit in {width} byte(s)")
+    return make(op, *operands)
+
+
+def nested_identifiers(block: ast.BlockStatement) -> "set[str]":
+    # Every identifier mentioned inside a nested function literal. This is a
+    # conservative approximation of the locals that closures may capture.
+    names = set()
+
+    def visit(node, nested):
+        if node is None:
+            return
+        if isinstance(node, ast.Identifier):
+            if nested:
+                names.add(node.value)
+        elif isinstance(node, (ast.Program, ast.BlockStatement)):
+            for statement in node.statements:
+                visit(statement, nested)
+        elif isinstance(node, ast.ExpressionStatement):
+            visit(node.expression, nested)
+        elif isinstance(node, ast.LetStatement):
+            visit(node.value, nested)
+        elif isinstance(node, ast.ReturnStatement):
+            visit(node.return_value, nested)
+        elif isinstance(node, ast.PrefixExpression):
+            visit(node.right, nested)
+        elif isinstance(node, ast.InfixExpression):
+            visit(node.left, nested)
+            visit(node.right, nested)
+        elif isinstance(node, ast.IfExpression):
+            visit(node.condition, nested)
+            visit(node.consequence, nested)
+            visit(node.alternative, nested)
+        elif isinstance(node, ast.FunctionLiteral):
+            visit(node.body, True)
+        elif isinstance(node, ast.CallExpression):
+            visit(node.function, nested)
+            for arg in node.arguments:
+                visit(arg, nested)
+        elif isinstance(node, ast.ArrayLiteral):
+            for element in node.elements:
+                visit(element, nested)
+        elif isinstance(node, ast.IndexExpression):
+            visit(node.left, nested)
+            visit(node.index, nested)
+        elif isinstance(node, ast.HashLiteral):
+            for key, value in node.pairs:
+                visit(key, nested)
+                visit(value, nested)
+
+    visit(block, False)
+    return names
+
+
+def let_names(block: ast.BlockStatement) -> "list[str]":
+    # Names bound by `let` in a function body, including inside `if` blocks,
+    # which share the function's environment.
+    names = []
+
+    def visit(node):
+        if isinstance(node, ast.BlockStatement):
+            for statement in node.statements:
+                visit(statement)
+        elif isinstance(node, ast.LetStatement):
+            names.append(node.name.value)
+            visit(node.value)
+        elif isinstance(node, ast.ExpressionStatement):
+            visit(node.expression)
+        elif isinstance(node, ast.ReturnStatement):
+            visit(node.return_value)
+        elif isinstance(node, ast.IfExpression):
+            visit(node.condition)
+            visit(node.consequence)
+            visit(node.alternative)
+        elif isinstance(node, ast.PrefixExpression):
+            visit(node.right)
+        elif isinstance(node, ast.InfixExpression):
+            visit(node.left)
+            visit(node.right)
+        elif isinstance(node, ast.CallExpression):
+            visit(node.function)
+            for arg in node.arguments:
+                visit(arg)
+        elif isinstance(node, ast.ArrayLiteral):
+            for element in node.elements:
+                visit(element)
+        elif isinstance(node, ast.IndexExpression):
+            visit(node.left)
+            visit(node.index)
+        elif isinstance(node, ast.HashLiteral):
+            for key, value in node.pairs:
+                visit(key)
+                visit(value)
+
+    visit(block)
+    return names
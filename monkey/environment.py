@@ -8,7 +8,7 @@ class Environment:
 
     def get(self, name: str) -> "Object":
         obj = self.store.get(name)
-        if not obj and self.outer:
+        if obj is None and self.outer:
             obj = self.outer.get(name)
 
         return obj
@@ -16,3 +16,61 @@ class Environment:
     def set(self, name: str, val: "Object") -> None:
         self.store[name] = val
         return val
+
+
+class Frame:
+    # Array-backed counterpart of Environment for resolved programs: variables
+    # are read by (depth, slot) instead of by name.
+    __slots__ = ("slots", "outer", "scope")
+
+    def __init__(self, scope: "Scope", slots: "list[Object]" = None, outer: "Frame" = None) -> None:
+        self.scope = scope
+        self.slots = slots if slots is not None else [None] * len(scope.names)
+        self.outer = outer
+
+    def get(self, depth: int, slot: int) -> "Object":
+        frame = self
+        while depth:
+            frame = frame.outer
+            depth -= 1
+        return frame.slots[slot]
+
+    def lookup(self, name: str) -> "Object":
+        # Name-based lookup, used only when a resolved slot is still unset.
+        frame = self
+        while frame:
+            slot = frame.scope.slots.get(name)
+            if slot is not None and slot < len(frame.slots) and frame.slots[slot] is not None:
+                return frame.slots[slot]
+            frame = frame.outer
+        return None
+
+
+class Cell:
+    # A binding shared between the scope that owns it and the closures that
+    # captured it, so a later `let` is seen by all of them.
+    __slots__ = ("value",)
+
+    def __init__(self, value: "Object" = None) -> None:
+        self.value = value
+
+
+class CellEnvironment(Environment):
+    # Environment whose store may hold Cells in place of values. An unset Cell
+    # reads like a missing name, so lookup carries on outwards.
+    def get(self, name: str) -> "Object":
+        obj = self.store.get(name)
+        if type(obj) is Cell:
+            obj = obj.value
+        if obj is None and self.outer:
+            obj = self.outer.get(name)
+
+        return obj
+
+    def set(self, name: str, val: "Object") -> None:
+        cell = self.store.get(name)
+        if type(cell) is Cell:
+            cell.value = val
+        else:
+            self.store[name] = val
+        return val
@@ -1,4 +1,6 @@
+import weakref
 from inspect import unwrap
+from typing import Iterable, Iterator
 from . import ast
 from . import objects
 from .objects import Object
@@ -13,74 +15,223 @@ NULL = objects.Null()
 def new_error(message: str) -> objects.Error:
     return objects.Error(message=message)
 
+
+def division_by_zero() -> objects.Error:
+    return new_error("Division by zero")
+
+
+def recursion_error() -> objects.Error:
+    # Monkey recursion deep enough to exhaust Python's stack ends the
+    # program with this Error, as StackEvaluator's max_depth does.
+    return new_error("Maximum call depth exceeded")
+
+
+def arity_error(want: int, got: int) -> objects.Error:
+    return new_error(f"wrong number of arguments: want={want}, got={got}")
+
+
+class CallSiteCache:
+    # What a CallExpression learned about the callee it saw last: whether it
+    # is a function or a builtin, and for functions how to bind arguments.
+    # Calls that can only fail keep their error instead. `memo` is the
+    # Memoizer's guard when calls of the function are memoized. The callee is
+    # only weakly referenced, so a cache left on the AST does not keep it and
+    # its environment alive; error caches refer to no callee and are rebuilt.
+    __slots__ = ("fn", "kind", "plan", "error", "memo")
+
+    def __init__(self, fn: Object, kind: str, plan = None, error: objects.Error = None, memo: tuple = None) -> None:
+        self.fn = no_callee if kind == objects.ERROR_OBJ else weakref.ref(fn)
+        self.kind = kind
+        self.plan = plan
+        self.error = error
+        self.memo = memo
+
+
+def no_callee() -> None:
+    return None
+
+
+def no_handler(node: ast.Node, env: Environment) -> None:
+    return None
+
+
+class HandlerTable(dict):
+    """Node class -> handler. A class without a handler of its own, such as a
+    quickened infix node in an AST another engine has run, gets the handler
+    of its nearest handled base class, which is then cached under it."""
+
+    def __missing__(self, cls: type):
+        for base in cls.__mro__[1:]:
+            if base in self:
+                handler = self[cls] = self[base]
+                return handler
+        return no_handler
+
+
 class Evaluator:
+    def __init__(self, memoize: bool = False, memo_size: int = None) -> None:
+        # Imported here because monkey.builtins and monkey.memo depend on this
+        # module.
+        from .builtins import builtins
+        from .memo import DEFAULT_MEMO_SIZE, Memoizer
+        self.builtins = builtins
+        # memo() functions are always memoized; memoize=True adds every
+        # function the purity analysis accepts.
+        self.memoizer = Memoizer(memoize, memo_size if memo_size is not None else DEFAULT_MEMO_SIZE)
+
+        # Dispatch on the exact node class: one dict lookup per node instead of
+        # walking an isinstance chain. Handlers look up the handlers of their
+        # children themselves rather than going through eval(), which would
+        # put another Python frame on each level of Monkey recursion.
+        self.handlers = HandlerTable({
+            ast.Program: self.eval_program,
+            ast.ExpressionStatement: self.eval_expression_statement,
+            ast.IntegerLiteral: self.eval_integer_literal,
+            ast.Boolean: self.eval_boolean_literal,
+            ast.PrefixExpression: self.eval_prefix_node,
+            ast.InfixExpression: self.eval_infix_node,
+            ast.IfExpression: self.eval_if_expression,
+            ast.BlockStatement: self.eval_block_statements,
+            ast.ReturnStatement: self.eval_return_statement,
+            ast.LetStatement: self.eval_let_statement,
+            ast.Identifier: self.eval_identifier,
+            ast.FunctionLiteral: self.eval_function_literal,
+            ast.StringLiteral: self.eval_string_literal,
+            ast.CallExpression: self.eval_call_expression,
+            ast.ArrayLiteral: self.eval_array_literal,
+            ast.IndexExpression: self.eval_index_node,
+            ast.HashLiteral: self.eval_hash_literal,
+        })
+
     def eval(self, node: ast.Node, env: Environment) -> Object:
-        if isinstance(node, ast.Program):
-            return self.eval_program(node, env)
-        elif isinstance(node, ast.ExpressionStatement):
-            return self.eval(node.expression, env)
-        elif isinstance(node, ast.IntegerLiteral):
-            return objects.Integer(node.value)
-        elif isinstance(node, ast.Boolean):
-            return self.native_bool_to_boolean_object(node.value)
-        elif isinstance(node, ast.PrefixExpression):
-            right = self.eval(node.right, env)
-            if self.is_error(right):
-                return right
-            return self.eval_prefix_expression(node.operator, right)
-        elif isinstance(node, ast.InfixExpression):
-            left = self.eval(node.left, env)
-            if self.is_error(left):
-                return left
-
-            right = self.eval(node.right, env)
-            if self.is_error(right):
-                return right
-
-            return self.eval_infix_expression(node.operator, left, right)
-        elif isinstance(node, ast.IfExpression):
-            condition = self.eval(node.condition, env)
-            if self.is_error(condition):
-                return condition
-
-            if condition not in [FALSE, NULL]:
-                return self.eval(node.consequence, env)
-            else:
-                return self.eval(node.alternative, env)
-        elif isinstance(node, ast.BlockStatement):
-            return self.eval_block_statements(node, env)
-        elif isinstance(node, ast.ReturnStatement):
-            val = self.eval(node.return_value, env)
-            if self.is_error(val):
-                return val
-            return objects.ReturnValue(val)
-        elif isinstance(node, ast.LetStatement):
-            val = self.eval(node.value, env)
-            if self.is_error(val):
-                return val
-            else:
-                env.set(node.name.value, val)
-        elif isinstance(node, ast.Identifier):
-            return self.eval_identifier(node, env)
-        elif isinstance(node, ast.FunctionLiteral):
-            params = node.parameters
-            body = node.body
-            return objects.Function(params, body, env)
-        elif isinstance(node, ast.StringLiteral):
-            return objects.String(node.value)
-        elif isinstance(node, ast.CallExpression):
-            function = self.eval(node.function, env)
-            if self.is_error(function):
-                return function
-            args = self.eval_expressions(node.arguments, env)
-            if len(args) == 1 and self.is_error(args[0]):
-                return args[0]
-            return self.apply_function(function, args)
+        return self.handlers[type(node)](node, env)
+
+    def eval_expression_statement(self, node: ast.ExpressionStatement, env: Environment) -> Object:
+        return self.handlers[type(node.expression)](node.expression, env)
+
+    def eval_integer_literal(self, node: ast.IntegerLiteral, env: Environment) -> Object:
+        return node.obj or objects.Integer(node.value)
+
+    def eval_boolean_literal(self, node: ast.Boolean, env: Environment) -> Object:
+        return self.native_bool_to_boolean_object(node.value)
+
+    def eval_string_literal(self, node: ast.StringLiteral, env: Environment) -> Object:
+        return objects.String(node.value)
+
+    def eval_prefix_node(self, node: ast.PrefixExpression, env: Environment) -> Object:
+        right = self.handlers[type(node.right)](node.right, env)
+        if self.is_error(right):
+            return right
+        return self.eval_prefix_expression(node.operator, right)
+
+    def eval_infix_node(self, node: ast.InfixExpression, env: Environment) -> Object:
+        left = self.handlers[type(node.left)](node.left, env)
+        if self.is_error(left):
+            return left
+
+        right = self.handlers[type(node.right)](node.right, env)
+        if self.is_error(right):
+            return right
+
+        return self.eval_infix_expression(node.operator, left, right)
+
+    def eval_if_expression(self, node: ast.IfExpression, env: Environment) -> Object:
+        condition = self.handlers[type(node.condition)](node.condition, env)
+        if self.is_error(condition):
+            return condition
+
+        # Both branches are blocks, so they skip the dispatch in eval().
+        if condition not in [FALSE, NULL]:
+            return self.eval_block_statements(node.consequence, env)
+        elif node.alternative:
+            return self.eval_block_statements(node.alternative, env)
+        else:
+            return NULL
+
+    def eval_return_statement(self, node: ast.ReturnStatement, env: Environment) -> Object:
+        val = self.handlers[type(node.return_value)](node.return_value, env)
+        if self.is_error(val):
+            return val
+        return objects.ReturnValue(val)
+
+    def eval_let_statement(self, node: ast.LetStatement, env: Environment) -> Object:
+        val = self.handlers[type(node.value)](node.value, env)
+        if self.is_error(val):
+            return val
+        else:
+            env.set(node.name.value, val)
+
+    def eval_function_literal(self, node: ast.FunctionLiteral, env: Environment) -> Object:
+        params = node.parameters
+        body = node.body
+        return objects.Function(params, body, env)
+
+    def eval_call_expression(self, node: ast.CallExpression, env: Environment) -> Object:
+        function = self.handlers[type(node.function)](node.function, env)
+        if self.is_error(function):
+            return function
+        args = self.eval_expressions(node.arguments, env)
+        if len(args) == 1 and self.is_error(args[0]):
+            return args[0]
+        if node.tail:
+            return objects.TailCall(function, args, node)
+        return self.apply_function(function, args, node)
+
+    def eval_array_literal(self, node: ast.ArrayLiteral, env: Environment) -> Object:
+        elements = self.eval_expressions(node.elements, env)
+        if len(elements) == 1 and self.is_error(elements[0]):
+            return elements[0]
+        return objects.Array.of(elements)
+
+    def eval_index_node(self, node: ast.IndexExpression, env: Environment) -> Object:
+        left = self.handlers[type(node.left)](node.left, env)
+        if self.is_error(left):
+            return left
+
+        index = self.handlers[type(node.index)](node.index, env)
+        if self.is_error(index):
+            return index
+
+        return self.eval_index_expression(left, index)
+
+    def eval_index_expression(self, left: Object, index: Object) -> Object:
+        if left.type() == objects.ARRAY_OBJ and index.type() == objects.INTEGER_OBJ:
+            i = index.value
+            if i < 0 or i >= len(left):
+                return NULL
+            return left.get(i)
+        elif left.type() == objects.HASH_OBJ:
+            if not hasattr(index, "hash_key"):
+                return new_error(f"unusable as hash key: {index.type()}")
+            value = left.get(index)
+            if value is None:
+                return NULL
+            return value
+        return new_error(f"index operator not supported: {left.type()}")
+
+    def eval_hash_literal(self, node: ast.HashLiteral, env: Environment) -> Object:
+        pairs = []
+        for key_node, value_node in node.pairs:
+            key = self.handlers[type(key_node)](key_node, env)
+            if self.is_error(key):
+                return key
+            if not hasattr(key, "hash_key"):
+                return new_error(f"unusable as hash key: {key.type()}")
+
+            value = self.handlers[type(value_node)](value_node, env)
+            if self.is_error(value):
+                return value
+            pairs.append((key, value))
+
+        return objects.Hash.of(pairs)
 
     def eval_program(self, program: ast.Program, env: Environment) -> Object:
         result = None
         for statement in program.statements:
-            result = self.eval(statement, env)
+            try:
+                result = self.eval(statement, env)
+            except RecursionError:
+                return recursion_error()
 
             if isinstance(result, objects.ReturnValue):
                 return result.value
@@ -89,10 +240,43 @@ class Evaluator:
 
         return result
 
+    def eval_statements(self, statements: "Iterable[ast.Statement]", env: Environment) -> "Iterator[Object]":
+        """eval_program over statements arriving one at a time: yields the
+        result of each as soon as it has run, and stops after a top-level
+        return or an error as eval_program would. Nothing holds on to a
+        statement once it has run, so its AST is freed unless a function
+        created by it still refers to its body."""
+        for statement in statements:
+            try:
+                result = self.eval(statement, env)
+            except RecursionError:
+                result = recursion_error()
+
+            if isinstance(result, objects.ReturnValue):
+                yield result.value
+                return
+            yield result
+            if isinstance(result, objects.Error):
+                return
+
     def eval_block_statements(self, block: ast.BlockStatement, env: Environment) -> Object:
+        # Expression and return statements are evaluated in place, rather
+        # than through eval_expression_statement and eval_return_statement:
+        # every Monkey call runs a block, so this saves Python frames on
+        # each level of Monkey recursion.
+        handlers = self.handlers
         result = None
         for statement in block.statements:
-            result = self.eval(statement, env)
+            statement_type = type(statement)
+            if statement_type is ast.ExpressionStatement:
+                statement = statement.expression
+            elif statement_type is ast.ReturnStatement:
+                value = statement.return_value
+                result = handlers[type(value)](value, env)
+                if self.is_error(result):
+                    return result
+                return objects.ReturnValue(result)
+            result = handlers[type(statement)](statement, env)
 
             if result:
                 rt = result.type()
@@ -129,7 +313,7 @@ class Evaluator:
         if right.type() != objects.INTEGER_OBJ:
             return new_error(f"Unknown operator: -{right.type()}")
 
-        return objects.Integer(right.value)
+        return objects.Integer(-right.value)
 
     def eval_infix_expression(self, operator: str, left: objects.Object, right: objects.Object) -> objects.Object:
         if left.type() == objects.INTEGER_OBJ and right.type() == objects.INTEGER_OBJ:
@@ -156,7 +340,9 @@ class Evaluator:
         elif operator == '*':
             return objects.Integer(left_val * right_val)
         elif operator == '/':
-            return objects.Integer(left_val / right_val)
+            if right_val == 0:
+                return division_by_zero()
+            return objects.Integer(left_val // right_val)
         elif operator == '<':
             return self.native_bool_to_boolean_object(left_val < right_val)
         elif operator == '>':
@@ -170,10 +356,8 @@ class Evaluator:
 
     def eval_string_infix_expression(self, operator: str, left: objects.Object, right: objects.Object):
         if operator != '+':
-            return new_error("Unknow operator: %s %s %s", left.type(), operator, right.type())
-        left_val = left.value
-        right_val = right.value
-        return objects.String(left_val + right_val)
+            return new_error(f"Unknown operator: {left.type()} {operator} {right.type()}")
+        return objects.String.concat(left, right)
 
     def is_error(self, obj: objects.Object) -> bool:
         if obj:
@@ -181,12 +365,11 @@ class Evaluator:
         return False
 
     def eval_identifier(self, node: ast.Identifier, env: Environment) -> objects.Object:
-        from . import builtins
         val = env.get(node.value)
         if val:
             return val
 
-        builtin = builtins.builtins.get(node.value)
+        builtin = self.builtins.get(node.value)
         if builtin:
             return builtin
 
@@ -196,31 +379,66 @@ class Evaluator:
         result: list[objects.Object] = []
 
         for e in exps:
-            evaluated = self.eval(e, env)
+            evaluated = self.handlers[type(e)](e, env)
             if self.is_error(evaluated):
                 return [evaluated]
             result.append(evaluated)
         
         return result
 
-    def apply_function(self, fn: objects.Object, args: "list[objects.Object]") -> objects.Object:
-        if fn.type() == objects.FUNCTION_OBJ:
-            extended_env = self.extend_function_env(fn, args)
-            evaluated = self.eval(fn.body, extended_env)
-            return self.unwrap_return_value(evaluated)
-        elif fn.type() == objects.BUILTIN_OBJ:
-            return fn._fn(*args)
-        else:
-            return new_error(f"not a function: {fn.type()}")
-
-    def extend_function_env(self, fn: objects.Function, args: "list[objects.Object]") -> Environment:
+    def apply_function(self, fn: objects.Object, args: "list[objects.Object]", site: ast.CallExpression = None) -> objects.Object:
+        # Calls in tail position come back as TailCall and are run by this
+        # loop, so tail recursion uses constant Python stack. A call site
+        # whose callee is the one it saw last reuses its cache and skips the
+        # type and arity checks.
+        while True:
+            cache = site.cache if site is not None else None
+            if cache is None or cache.fn() is not fn:
+                cache = self.new_call_site_cache(fn, len(args))
+                if site is not None:
+                    site.cache = cache
+
+            if cache.kind == objects.FUNCTION_OBJ:
+                if cache.memo is not None:
+                    evaluated = self.memoizer.call(self, fn, cache, args)
+                else:
+                    evaluated = self.call_function(fn, cache.plan, args)
+                if type(evaluated) is objects.TailCall:
+                    fn, args, site = evaluated.fn, evaluated.args, evaluated.site
+                    continue
+                return evaluated
+            elif cache.kind == objects.BUILTIN_OBJ:
+                if fn.higher_order:
+                    return fn._fn(*args, apply=self.apply_function)
+                return fn._fn(*args)
+            else:
+                return cache.error
+
+    def call_function(self, fn: objects.Function, plan, args: "list[objects.Object]") -> objects.Object:
+        extended_env = self.bind_arguments(fn, plan, args)
+        return self.unwrap_return_value(self.eval_block_statements(fn.body, extended_env))
+
+    def new_call_site_cache(self, fn: objects.Object, num_args: int) -> CallSiteCache:
+        fn_type = fn.type()
+        if fn_type == objects.FUNCTION_OBJ:
+            if len(fn.parameters) != num_args:
+                return CallSiteCache(fn, objects.ERROR_OBJ, error=arity_error(len(fn.parameters), num_args))
+            return CallSiteCache(fn, fn_type, self.binding_plan(fn), memo=self.memoizer.guard_for(fn, self.builtins))
+        elif fn_type == objects.BUILTIN_OBJ:
+            return CallSiteCache(fn, fn_type)
+        return CallSiteCache(fn, objects.ERROR_OBJ, error=new_error(f"not a function: {fn_type}"))
+
+    def binding_plan(self, fn: objects.Function) -> "tuple[str]":
+        return tuple(param.value for param in fn.parameters)
+
+    def bind_arguments(self, fn: objects.Function, plan: "tuple[str]", args: "list[objects.Object]") -> Environment:
         env = Environment(fn.env)
-
-        for index, param in enumerate(fn.parameters):
-            env.set(param.value, args[index])
-
+        env.store = dict(zip(plan, args))
         return env
 
+    def extend_function_env(self, fn: objects.Function, args: "list[objects.Object]") -> Environment:
+        return self.bind_arguments(fn, self.binding_plan(fn), args)
+
     def unwrap_return_value(self, obj: objects.Object) -> objects.Object:
         if isinstance(obj, objects.ReturnValue):
             return obj.value
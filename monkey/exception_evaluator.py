@@ -0,0 +1,131 @@
+from . import ast
+from . import objects
+from .environment import Environment
+from .evaluator import Evaluator, FALSE, NULL, new_error, recursion_error
+
+Error = objects.Error
+Integer = objects.Integer
+
+
+class MonkeyError(Exception):
+    # Carries a runtime error out to the Program boundary.
+    def __init__(self, error: objects.Error) -> None:
+        super().__init__(error.message)
+        self.error = error
+
+
+class ReturnSignal(Exception):
+    # Carries a `return` value out to the enclosing function or Program.
+    def __init__(self, value: objects.Object) -> None:
+        self.value = value
+
+
+class ExceptionEvaluator(Evaluator):
+    """Evaluator that unwinds `return` and runtime errors with exceptions.
+
+    Sub-evaluations are never checked for Error or ReturnValue: an error is
+    raised as MonkeyError where it is created (operators, lookups, calls) and
+    `return` raises ReturnSignal. Functions catch ReturnSignal, and the
+    Program turns either back into the value Evaluator would have produced.
+    """
+
+    def eval_program(self, program: ast.Program, env: Environment) -> objects.Object:
+        result = None
+        try:
+            for statement in program.statements:
+                result = self.eval(statement, env)
+        except ReturnSignal as signal:
+            return signal.value
+        except MonkeyError as error:
+            return error.error
+        except RecursionError:
+            return recursion_error()
+        return result
+
+    def eval_block_statements(self, block: ast.BlockStatement, env: Environment) -> objects.Object:
+        # Dispatched in place, as in Evaluator.eval_block_statements.
+        handlers = self.handlers
+        result = None
+        for statement in block.statements:
+            statement_type = type(statement)
+            if statement_type is ast.ExpressionStatement:
+                statement = statement.expression
+            elif statement_type is ast.ReturnStatement:
+                value = statement.return_value
+                raise ReturnSignal(handlers[type(value)](value, env))
+            result = handlers[type(statement)](statement, env)
+        return result
+
+    def eval_return_statement(self, node: ast.ReturnStatement, env: Environment) -> objects.Object:
+        raise ReturnSignal(self.handlers[type(node.return_value)](node.return_value, env))
+
+    def eval_let_statement(self, node: ast.LetStatement, env: Environment) -> objects.Object:
+        env.set(node.name.value, self.handlers[type(node.value)](node.value, env))
+
+    def eval_prefix_node(self, node: ast.PrefixExpression, env: Environment) -> objects.Object:
+        right = self.handlers[type(node.right)](node.right, env)
+        if node.operator == '-' and type(right) is Integer:
+            return Integer(-right.value)
+        return raise_error(self.eval_prefix_expression(node.operator, right))
+
+    def eval_infix_node(self, node: ast.InfixExpression, env: Environment) -> objects.Object:
+        left = self.handlers[type(node.left)](node.left, env)
+        right = self.handlers[type(node.right)](node.right, env)
+        if type(left) is Integer and type(right) is Integer and (right.value or node.operator != '/'):
+            # Every operator but division by zero is defined on two integers,
+            # so nothing can fail.
+            return self.eval_integer_infix_expression(node.operator, left, right)
+        return raise_error(self.eval_infix_expression(node.operator, left, right))
+
+    def eval_if_expression(self, node: ast.IfExpression, env: Environment) -> objects.Object:
+        condition = self.handlers[type(node.condition)](node.condition, env)
+
+        if condition is not FALSE and condition is not NULL:
+            return self.eval_block_statements(node.consequence, env)
+        elif node.alternative:
+            return self.eval_block_statements(node.alternative, env)
+        else:
+            return NULL
+
+    def eval_identifier(self, node: ast.Identifier, env: Environment) -> objects.Object:
+        val = env.get(node.value)
+        if val is not None:
+            return val
+
+        builtin = self.builtins.get(node.value)
+        if builtin:
+            return builtin
+
+        raise MonkeyError(new_error(f"Identifier not found: {node.value}"))
+
+    def eval_call_expression(self, node: ast.CallExpression, env: Environment) -> objects.Object:
+        function = self.handlers[type(node.function)](node.function, env)
+        args = [self.handlers[type(argument)](argument, env) for argument in node.arguments]
+        if node.tail:
+            return objects.TailCall(function, args, node)
+        # Evaluator's apply_function directly, saving the frame of the
+        # override below on each level of Monkey recursion.
+        return raise_error(Evaluator.apply_function(self, function, args, node))
+
+    def eval_index_expression(self, left: objects.Object, index: objects.Object) -> objects.Object:
+        return raise_error(super().eval_index_expression(left, index))
+
+    def eval_hash_literal(self, node: ast.HashLiteral, env: Environment) -> objects.Object:
+        # Only an unusable key comes back as a value; the rest was raised.
+        return raise_error(super().eval_hash_literal(node, env))
+
+    def apply_function(self, fn: objects.Object, args: "list[objects.Object]", site: ast.CallExpression = None) -> objects.Object:
+        # Arity, not-a-function and builtin errors come back as values.
+        return raise_error(super().apply_function(fn, args, site))
+
+    def call_function(self, fn: objects.Function, plan, args: "list[objects.Object]") -> objects.Object:
+        try:
+            return self.eval_block_statements(fn.body, self.bind_arguments(fn, plan, args))
+        except ReturnSignal as signal:
+            return signal.value
+
+
+def raise_error(obj: objects.Object) -> objects.Object:
+    if type(obj) is Error:
+        raise MonkeyError(obj)
+    return obj
@@ -0,0 +1,110 @@
+from . import ast
+from . import objects
+from .codegen import children
+from .compiler import let_names
+from .environment import Cell, CellEnvironment, Environment
+from .evaluator import Evaluator
+
+
+def analyze_program(program: ast.Program) -> None:
+    """Sets `free` and `cells` on every FunctionLiteral in program."""
+    for child in children(program):
+        analyze(child, frozenset())
+
+
+def analyze(node: ast.Node, enclosing: "frozenset[str]") -> "set[str]":
+    # The names read in node, counting those read by nested literals, which
+    # are analyzed on the way: `enclosing` holds the names bound by the
+    # functions around node, so only those can be free in a literal.
+    if isinstance(node, ast.Identifier):
+        return {node.value}
+    if isinstance(node, ast.FunctionLiteral):
+        return analyze_function(node, enclosing)
+
+    names = set()
+    for child in children(node):
+        names |= analyze(child, enclosing)
+    return names
+
+
+def analyze_function(literal: ast.FunctionLiteral, enclosing: "frozenset[str]") -> "set[str]":
+    bound = {param.value for param in literal.parameters} | set(let_names(literal.body))
+    inner = enclosing | bound
+
+    used = analyze(literal.body, inner)
+    captured = set()
+    for nested in nested_literals(literal.body):
+        captured.update(nested.free)
+
+    literal.cells = tuple(sorted(bound & captured))
+    literal.free = tuple(sorted((used - bound) & enclosing))
+    return set(literal.free)
+
+
+def nested_literals(node: ast.Node) -> "list[ast.FunctionLiteral]":
+    # The function literals directly inside node, not those nested in them.
+    literals = []
+    for child in children(node):
+        if isinstance(child, ast.FunctionLiteral):
+            literals.append(child)
+        else:
+            literals += nested_literals(child)
+    return literals
+
+
+class Closure(objects.Function):
+    # env holds only the captured Cells, in front of the global Environment.
+    def __init__(self, parameters: "list[ast.Identifier]", body: ast.BlockStatement, env: Environment, cells: "tuple[str]") -> None:
+        super().__init__(parameters, body, env)
+        self.cells = cells
+
+
+class FlatClosureEvaluator(Evaluator):
+    """Evaluator whose closures capture only the bindings they read.
+
+    Before a program runs, every function literal is given its free names
+    (those it or its nested literals read from enclosing functions) and its
+    cells (its own parameters and lets that nested literals capture). Calls
+    hold cells as Cells in their Environment and a closure copies the Cells
+    of its free names, so it keeps nothing else of the defining call alive
+    and still sees lets made after it was created. Globals are read from the
+    global Environment, as in Evaluator.
+    """
+
+    def eval_program(self, program: ast.Program, env: Environment) -> objects.Object:
+        analyze_program(program)
+        self.globals = env
+        return super().eval_program(program, env)
+
+    def eval_function_literal(self, node: ast.FunctionLiteral, env: Environment) -> objects.Object:
+        if not node.free:
+            return Closure(node.parameters, node.body, self.globals, node.cells)
+
+        captured = CellEnvironment(self.globals)
+        for name in node.free:
+            captured.store[name] = find_cell(env, name)
+        return Closure(node.parameters, node.body, captured, node.cells)
+
+    def binding_plan(self, fn: Closure) -> "tuple[tuple[str], tuple[str]]":
+        return tuple(param.value for param in fn.parameters), fn.cells
+
+    def bind_arguments(self, fn: Closure, plan: "tuple[tuple[str], tuple[str]]", args: "list[objects.Object]") -> Environment:
+        names, cells = plan
+        env = CellEnvironment(fn.env)
+        store = env.store = dict(zip(names, args))
+        for name in cells:
+            # Lets get their Cell up front, so closures made before the let
+            # see its value.
+            store[name] = Cell(store.get(name))
+        return env
+
+
+def find_cell(env: Environment, name: str) -> Cell:
+    # The analysis guarantees a free name is a cell of the calling function
+    # or one of the Cells its closure captured.
+    while type(env) is CellEnvironment:
+        cell = env.store.get(name)
+        if type(cell) is Cell:
+            return cell
+        env = env.outer
+    raise LookupError(f"no cell for free variable {name}")
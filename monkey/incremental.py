@@ -0,0 +1,165 @@
+from array import array
+from bisect import bisect_right
+
+from . import ast
+from .lexer import EOF_TOKEN, WORD_PATTERN, TokenCache
+from .parser import Parser
+from .token import Token, TokenType
+
+
+class RegionLexer:
+    """Lexes source from offset `start` on, recording every token it hands
+    out and where it starts, so the caller can tell which tokens each
+    statement took."""
+
+    def __init__(self, source: str, start: int, cache: TokenCache) -> None:
+        self._matches = WORD_PATTERN.finditer(source, start)
+        self._cache = cache
+        self._end = len(source)
+        self.tokens: "list[Token]" = []
+        self.starts: "list[int]" = []
+
+    def next_token(self) -> Token:
+        match = next(self._matches, None)
+        if match is None:
+            # EOF is recorded once, however often the parser asks past it.
+            if not self.tokens or self.tokens[-1] is not EOF_TOKEN:
+                self.tokens.append(EOF_TOKEN)
+                self.starts.append(self._end)
+            return EOF_TOKEN
+        token = self._cache[match.group()]
+        self.tokens.append(token)
+        self.starts.append(match.start())
+        return token
+
+
+class Document:
+    """A source kept lexed and parsed across edits.
+
+    The source is split into units, one per top-level statement: the
+    statement, the tokens it was parsed from and the parse errors it
+    raised. A unit runs from its first token to the next unit's, and the
+    first one from offset 0.
+
+    edit() re-lexes and re-parses from the unit before the edited one, as
+    that unit's last token, or its parse's one token of lookahead, may reach
+    into the edit. It stops at the first statement boundary after the edit
+    that falls on a boundary of the old text. Tokenizing from a token start
+    depends only on the text that follows, and so does parsing from a
+    statement start, so every unit from there on is kept as it was,
+    statement objects included. Parse errors are kept without line:column,
+    which would go stale as lines are added above them.
+
+    Unit starts are kept in a gap buffer: those before `gap` are offsets
+    from the start of the source, those after it offsets from its end (zero
+    or negative). An edit then shifts no stored offset; only moving the gap
+    converts the units it passes over, which for edits near the last one is
+    a handful.
+    """
+
+    def __init__(self, source: str = "") -> None:
+        self.source = ""
+        self.starts = array('q')
+        self.statements: "list[ast.Statement]" = []
+        self.tokens: "list[tuple[Token, ...]]" = []
+        self.unit_errors: "list[tuple[str, ...]]" = []
+        self.gap = 0
+        self._cache = TokenCache()
+        # Tokens lexed and statements parsed by the last edit.
+        self.relexed = 0
+        self.reparsed = 0
+        self.edit(0, 0, source)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def start(self, i: int) -> int:
+        # Offset in the source where unit i starts.
+        return self.starts[i] if i < self.gap else self.starts[i] + len(self.source)
+
+    def unit_at(self, offset: int) -> int:
+        """Index of the unit whose text contains offset."""
+        gap_start = self.start(self.gap) if self.gap < len(self.starts) else len(self.source) + 1
+        if offset < gap_start:
+            return bisect_right(self.starts, offset, 0, self.gap) - 1
+        return bisect_right(self.starts, offset - len(self.source), self.gap) - 1
+
+    def move_gap(self, i: int) -> None:
+        length = len(self.source)
+        if i < self.gap:
+            self.starts[i:self.gap] = array('q', map((-length).__add__, self.starts[i:self.gap]))
+        elif i > self.gap:
+            self.starts[self.gap:i] = array('q', map(length.__add__, self.starts[self.gap:i]))
+        self.gap = i
+
+    def edit(self, offset: int, removed: int, inserted: str) -> None:
+        """Replaces the `removed` characters at offset with `inserted`."""
+        old_length = len(self.source)
+        if not 0 <= offset <= offset + removed <= old_length:
+            raise ValueError(f"edit of {removed} characters at {offset} is outside a source of {old_length}")
+
+        # Unit first - 1 must not see the edit: neither its tokens nor the
+        # token after them, its parse's lookahead, may end at offset or
+        # later, since the lexer reads one character past a token to end it.
+        first = max(self.unit_at(offset - 1) - 1, 0) if self.starts and offset else 0
+        self.move_gap(first)
+        restart = self.start(first) if first < len(self.starts) else 0
+        source = self.source[:offset] + inserted + self.source[offset + removed:]
+        # Old units from `first` on keep their offsets from the end, which the
+        # edit has not changed; an old unit start lies after the edit when it
+        # is at least this far from the end.
+        old_edit_end = offset + removed - old_length
+        new_length = len(source)
+
+        lexer = RegionLexer(source, restart, self._cache)
+        parser = Parser(lexer)
+        starts, statements, tokens, unit_errors = array('q'), [], [], []
+        resume = len(self.starts)
+        old = first + 1
+        token_index = 0
+        while parser.cur_token.token_type != TokenType.EOF:
+            errors = len(parser.errors)
+            statement = parser.parse_statement()
+            parser.next_token()
+
+            # The parser has read one token past its current one, unless both
+            # are the one EOF.
+            next_index = len(lexer.tokens) - (1 if parser.cur_token is EOF_TOKEN else 2)
+            starts.append(lexer.starts[token_index] if statements or first else 0)
+            statements.append(statement)
+            tokens.append(tuple(lexer.tokens[token_index:next_index]))
+            unit_errors.append(tuple(parser.errors[errors:]))
+            token_index = next_index
+
+            if parser.cur_token.token_type == TokenType.EOF:
+                break
+            boundary = lexer.starts[next_index] - new_length
+            while old < len(self.starts) and self.starts[old] < boundary:
+                old += 1
+            if old < len(self.starts) and self.starts[old] == boundary and boundary >= old_edit_end:
+                resume = old
+                break
+
+        self.source = source
+        self.starts[first:resume] = starts
+        self.statements[first:resume] = statements
+        self.tokens[first:resume] = tokens
+        self.unit_errors[first:resume] = unit_errors
+        self.gap = first + len(statements)
+        self.relexed = len(lexer.tokens)
+        self.reparsed = len(statements)
+
+    @property
+    def program(self) -> ast.Program:
+        program = ast.Program()
+        program.statements.extend(filter(None, self.statements))
+        return program
+
+    @property
+    def errors(self) -> "list[str]":
+        return [error for errors in self.unit_errors for error in errors]
+
+    def all_tokens(self) -> "list[Token]":
+        """The tokens of the whole source, ending with EOF, as tokenize()
+        returns them."""
+        return [token for tokens in self.tokens for token in tokens] + [EOF_TOKEN]
@@ -0,0 +1,231 @@
+from typing import Iterable, Iterator
+
+from . import ast
+from .closure_compiler import compile_program
+from .compiler import CompileError, Compiler, new_symbol_table
+from .environment import Environment
+from .evaluator import Evaluator, new_error
+from .exception_evaluator import ExceptionEvaluator
+from .frame_pool import PooledEvaluator
+from .lexer import Lexer
+from .free_variables import FlatClosureEvaluator
+from .native_evaluator import NativeEvaluator
+from .optimizer import Optimizer
+from .objects import Object
+from .parser import Parser
+from .quickening import QuickeningEvaluator
+from .resolver import ResolvedEvaluator, new_global_frame
+from .stack_evaluator import DEFAULT_MAX_DEPTH, StackEvaluator
+from .stream_lexer import StreamLexer
+from .tiered import DEFAULT_THRESHOLD, TieredEvaluator
+from .token_stream import TokenStream
+from .values import box
+from .vm import VM
+
+
+class EvaluatorEngine:
+    def __init__(self, memoize: bool = False, memo_size: int = None) -> None:
+        self.env = Environment()
+        self.evaluator = Evaluator(memoize, memo_size)
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+    def stream(self, statements: "Iterable[ast.Statement]") -> "Iterator[Object]":
+        return self.evaluator.eval_statements(statements, self.env)
+
+
+class VMEngine:
+    def __init__(self) -> None:
+        self.symbol_table = new_symbol_table()
+        self.constants = []
+        self.constant_indices = {}
+        self.globals = []
+
+    def execute(self, program: ast.Program) -> Object:
+        try:
+            bytecode = Compiler(self.symbol_table, self.constants, self.constant_indices).compile(program)
+        except CompileError as error:
+            return new_error(str(error))
+        return VM(bytecode, self.globals).run()
+
+
+class ClosureEngine:
+    def __init__(self) -> None:
+        self.env = Environment()
+
+    def execute(self, program: ast.Program) -> Object:
+        try:
+            code = compile_program(program)
+        except CompileError as error:
+            return new_error(str(error))
+        return code(self.env)
+
+
+class ResolvedEngine:
+    def __init__(self) -> None:
+        self.frame = new_global_frame()
+        self.evaluator = ResolvedEvaluator()
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.frame)
+
+
+class StackEngine:
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.env = Environment()
+        self.evaluator = StackEvaluator(max_depth)
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+    def stream(self, statements: "Iterable[ast.Statement]") -> "Iterator[Object]":
+        return self.evaluator.eval_statements(statements, self.env)
+
+
+class NativeEngine:
+    def __init__(self) -> None:
+        self.env = Environment()
+        self.evaluator = NativeEvaluator()
+
+    def execute(self, program: ast.Program) -> Object:
+        return box(self.evaluator.eval(program, self.env))
+
+
+class QuickeningEngine:
+    def __init__(self) -> None:
+        self.env = Environment()
+        self.evaluator = QuickeningEvaluator()
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+    def stream(self, statements: "Iterable[ast.Statement]") -> "Iterator[Object]":
+        return self.evaluator.eval_statements(statements, self.env)
+
+
+class TieredEngine:
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, tiering: bool = True, profile: bool = False) -> None:
+        self.env = Environment()
+        self.evaluator = TieredEvaluator(threshold, tiering, profile)
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+    def stream(self, statements: "Iterable[ast.Statement]") -> "Iterator[Object]":
+        return self.evaluator.eval_statements(statements, self.env)
+
+
+class ExceptionEngine:
+    def __init__(self) -> None:
+        self.env = Environment()
+        self.evaluator = ExceptionEvaluator()
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+
+class FlatClosureEngine:
+    def __init__(self) -> None:
+        self.env = Environment()
+        self.evaluator = FlatClosureEvaluator()
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+
+class PooledEngine:
+    def __init__(self) -> None:
+        self.env = Environment()
+        self.evaluator = PooledEvaluator()
+
+    def execute(self, program: ast.Program) -> Object:
+        return self.evaluator.eval(program, self.env)
+
+    def stream(self, statements: "Iterable[ast.Statement]") -> "Iterator[Object]":
+        return self.evaluator.eval_statements(statements, self.env)
+
+
+ENGINES = {
+    "eval": EvaluatorEngine,
+    "vm": VMEngine,
+    "closure": ClosureEngine,
+    "resolved": ResolvedEngine,
+    "stack": StackEngine,
+    "native": NativeEngine,
+    "quick": QuickeningEngine,
+    "tiered": TieredEngine,
+    "exceptions": ExceptionEngine,
+    "flat": FlatClosureEngine,
+    "pooled": PooledEngine,
+}
+
+
+class Interpreter:
+    """Runs Monkey source with one of the ENGINES, keeping bindings between runs.
+
+    With optimize=True every program goes through monkey.optimizer first;
+    `optimizer.removed` then counts the nodes it has eliminated.
+    """
+
+    def __init__(self, engine: str = "eval", optimize: bool = False, **options) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        self.engine_name = engine
+        self.engine = ENGINES[engine](**options)
+        self.optimizer = Optimizer() if optimize else None
+
+    def parse(self, source: str) -> ast.Program:
+        parser = Parser(Lexer(source))
+        program = parser.parse_program()
+        if parser.errors:
+            # Only a source that fails to parse pays for a TokenStream, whose
+            # positions prefix each message with line:column.
+            located = Parser(TokenStream(source))
+            located.parse_program()
+            raise SyntaxError("\n".join(located.errors))
+        if self.optimizer:
+            program = self.optimizer.optimize_program(program)
+        return program
+
+    def run(self, source: str) -> Object:
+        return self.engine.execute(self.parse(source))
+
+    def stream(self, source) -> "Iterator[Object]":
+        """Parses and runs source one top-level statement at a time, yielding
+        each statement's result as soon as it has run.
+
+        source is anything StreamLexer reads: a str, a UTF-8 buffer or mmap,
+        or a file object. Neither the tokens nor the AST of the whole program
+        are ever held. Statements before a syntax error have already run
+        when SyntaxError is raised; its messages carry no line:column, as
+        StreamLexer does not track positions. Only engines with a stream()
+        method (those running on Evaluator.eval_statements) can do this.
+        """
+        if not hasattr(self.engine, "stream"):
+            raise ValueError(f"engine {self.engine_name!r} cannot stream statements")
+        parser = Parser(StreamLexer(source))
+        return self.engine.stream(self.checked(parser, parser.parse_statements()))
+
+    def checked(self, parser: Parser, statements: "Iterator[ast.Statement]") -> "Iterator[ast.Statement]":
+        for statement in statements:
+            if parser.errors:
+                break
+            if self.optimizer:
+                program = ast.Program()
+                program.statements.append(statement)
+                statement = self.optimizer.optimize_program(program).statements[0]
+            yield statement
+        if parser.errors:
+            raise SyntaxError("\n".join(parser.errors))
+
+    def run_stream(self, source) -> Object:
+        """What run(source) returns, computed through stream()."""
+        result = None
+        for result in self.stream(source):
+            pass
+        return result
+
+
+def run(source: str, engine: str = "eval", optimize: bool = False, **options) -> Object:
+    return Interpreter(engine, optimize, **options).run(source)
@@ -1,8 +1,96 @@
+import re
 import string
 
 from .token import TokenType, Token, lookup_ident
 
+
+# One token, after any whitespace: an identifier or keyword, an integer, a
+# string (running to the end of the input if unterminated), a two-character
+# operator, or any other single character.
+WORD = r'[A-Za-z_]+|[0-9]+|"[^"]*"?|==|!=|[^ \t\n\r\x0b\x0c]'
+WORD_PATTERN = re.compile(WORD)
+
+LETTERS = frozenset(string.ascii_letters + "_")
+DIGITS = frozenset(string.digits)
+
+PUNCTUATION_TYPES = {
+    "==": TokenType.EQ,
+    "!=": TokenType.NOT_EQ,
+    "=": TokenType.ASSIGN,
+    ";": TokenType.SEMICOLON,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    "{": TokenType.LBRACE,
+    "}": TokenType.RBRACE,
+    "[": TokenType.LBRACKET,
+    "]": TokenType.RBRACKET,
+    ",": TokenType.COMMA,
+    ":": TokenType.COLON,
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "!": TokenType.BANG,
+    "/": TokenType.SLASH,
+    "*": TokenType.ASTERISK,
+    "<": TokenType.LT,
+    ">": TokenType.GT,
+}
+
+EOF_TOKEN = Token(TokenType.EOF, None)
+
+
+def classify(word: str) -> Token:
+    # The token for a WORD match, told apart by its first character.
+    first = word[0]
+    if first in LETTERS:
+        return Token(lookup_ident(word), word)
+    elif first in DIGITS:
+        return Token(TokenType.INT, word)
+    elif first == '"':
+        closed = len(word) > 1 and word[-1] == '"'
+        return Token(TokenType.STRING, word[1:-1] if closed else word[1:])
+    return Token(PUNCTUATION_TYPES.get(word, TokenType.ILLEGAL), word)
+
+
+class TokenCache(dict):
+    """Maps the text of a WORD match to its Token. Tokens are immutable, so
+    every occurrence of an identifier, number or operator shares one, and
+    only the first is classified."""
+
+    def __missing__(self, word: str) -> Token:
+        token = self[word] = classify(word)
+        return token
+
+
+def tokenize(source: str) -> "list[Token]":
+    """All the tokens of source, ending with EOF: what repeated
+    Lexer.next_token calls return, found by one findall over source."""
+    tokens = list(map(TokenCache().__getitem__, WORD_PATTERN.findall(source)))
+    tokens.append(EOF_TOKEN)
+    return tokens
+
+
 class Lexer:
+    """Reads source one token per next_token call. Tokens come from a lazy
+    WORD_PATTERN.finditer, so whitespace is skipped and whole identifiers,
+    numbers and strings are taken in C, with no Python code per character.
+    Unlike CharLexer it moves past an ILLEGAL character rather than
+    returning it forever."""
+
+    def __init__(self, input: str = ""):
+        self._input = input
+        words = map(re.Match.group, WORD_PATTERN.finditer(input))
+        self._tokens = map(TokenCache().__getitem__, words)
+
+    def __str__(self) -> str:
+        return f"Lexer('{self._input}')"
+
+    def next_token(self) -> Token:
+        return next(self._tokens, EOF_TOKEN)
+
+
+class CharLexer:
+    # The original lexer, reading one character at a time; kept as the
+    # reference the benchmarks and tests compare Lexer against.
     def __init__(self, input: str = ""):
         self._input = input
         self._position = 0
@@ -21,7 +109,7 @@ class Lexer:
         self._read_position += 1
 
     def __str__(self) -> str:
-        return f"Lexer('{self._input}' : {self._ch})@({self._position}, {self._read_position})"
+        return f"CharLexer('{self._input}' : {self._ch})@({self._position}, {self._read_position})"
 
     def next_token(self) -> Token:
         token = None
@@ -44,8 +132,14 @@ class Lexer:
             token = Token(TokenType.LBRACE, self._ch)
         elif self._ch == '}':
             token = Token(TokenType.RBRACE, self._ch)
+        elif self._ch == '[':
+            token = Token(TokenType.LBRACKET, self._ch)
+        elif self._ch == ']':
+            token = Token(TokenType.RBRACKET, self._ch)
         elif self._ch == ',':
             token = Token(TokenType.COMMA, self._ch)
+        elif self._ch == ':':
+            token = Token(TokenType.COLON, self._ch)
         elif self._ch == '+':
             token = Token(TokenType.PLUS, self._ch)
         elif self._ch == '-':
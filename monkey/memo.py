@@ -0,0 +1,181 @@
+import weakref
+from collections import OrderedDict
+
+from . import ast
+from . import objects
+from .codegen import children
+from .compiler import let_names
+
+
+DEFAULT_MEMO_SIZE = 4096
+
+
+class MemoCache:
+    """Bounded LRU map from (function, argument values) to results."""
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE) -> None:
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[tuple, objects.Object]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: tuple) -> objects.Object:
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: tuple, result: objects.Object) -> None:
+        self.entries[key] = result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+class Memoizer:
+    """Memoization layer used by Evaluator.apply_function.
+
+    Functions marked by the memo() builtin are always memoized; with
+    auto=True so is every function purity_guard() accepts. A memoized call
+    first rechecks the free bindings its purity depended on, then looks its
+    arguments up in one LRU cache shared by all functions.
+    """
+
+    def __init__(self, auto: bool = False, maxsize: int = DEFAULT_MEMO_SIZE) -> None:
+        self.auto = auto
+        self.cache = MemoCache(maxsize)
+        self.guards: "weakref.WeakKeyDictionary[objects.Function, tuple]" = weakref.WeakKeyDictionary()
+
+    def guard_for(self, fn: objects.Function, builtins: dict) -> "tuple[tuple[str, objects.Object]]":
+        # What a call site keeps in its cache: None when calls of fn are not
+        # memoized.
+        if fn.memo:
+            return ()
+        if not self.auto:
+            return None
+        if fn not in self.guards:
+            self.guards[fn] = purity_guard(fn, builtins)
+        return self.guards[fn]
+
+    def call(self, evaluator, fn: objects.Function, site_cache, args: "list[objects.Object]") -> objects.Object:
+        guard = site_cache.memo
+        env = fn.env
+        for name, value in guard:
+            if env.get(name) is not value:
+                # A binding the function relied on changed; stop memoizing it.
+                site_cache.memo = None
+                self.guards.pop(fn, None)
+                return evaluator.call_function(fn, site_cache.plan, args)
+
+        key = memo_key(fn, args)
+        if key is None:
+            return evaluator.call_function(fn, site_cache.plan, args)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        result = evaluator.call_function(fn, site_cache.plan, args)
+        if type(result) is objects.TailCall:
+            # The value is needed here, so the tail call is run now rather than
+            # by the caller's trampoline.
+            result = evaluator.apply_function(result.fn, result.args, result.site)
+        if cacheable(result):
+            self.cache.put(key, result)
+        return result
+
+    def stats(self) -> "dict[str, int]":
+        return {
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "evictions": self.cache.evictions,
+            "size": len(self.cache),
+        }
+
+
+def memo_key(fn: objects.Function, args: "list[objects.Object]") -> tuple:
+    # Integers by value; booleans and null are singletons. Strings and
+    # functions are compared by identity in Monkey, so a call taking one is
+    # never looked up (None).
+    key = [fn]
+    for arg in args:
+        if type(arg) is objects.Integer:
+            key.append(arg.value)
+        elif type(arg) is objects.Boolean or type(arg) is objects.Null:
+            key.append(arg)
+        else:
+            return None
+    return tuple(key)
+
+
+def cacheable(result: objects.Object) -> bool:
+    # Only results whose identity Monkey cannot observe are shared between
+    # calls.
+    return type(result) is objects.Integer or type(result) is objects.Boolean or type(result) is objects.Null
+
+
+def purity_guard(fn: objects.Function, builtins: dict, visiting: set = None) -> "tuple[tuple[str, objects.Object]]":
+    """The free bindings fn's result depends on, as (name, value) pairs to
+    recheck in fn.env before a cached result is used, or None when fn is not
+    pure.
+
+    A function is pure when its body creates no closures, only calls
+    functions named by free identifiers, and each free identifier is bound to a
+    pure builtin or to a pure function (one that calls itself counts as
+    pure). Free names bound to anything else make it impure.
+    """
+    visiting = visiting if visiting is not None else set()
+    if fn in visiting:
+        return ()
+    visiting.add(fn)
+
+    local = {param.value for param in fn.parameters}
+    for name in let_names(fn.body):
+        # A let that shadows an outer binding may be read before it runs.
+        if name not in local and fn.env.get(name) is not None:
+            return None
+        local.add(name)
+
+    reads, callees = [], []
+    if not collect_reads(fn.body, reads, callees) or local.intersection(callees):
+        return None
+
+    guard = {}
+    for name in reads:
+        if name in local or name in guard:
+            continue
+        value = fn.env.get(name)
+        if value is None:
+            builtin = builtins.get(name)
+            if builtin is None or not builtin.pure:
+                return None
+        elif isinstance(value, objects.Function):
+            inner = purity_guard(value, builtins, visiting)
+            if inner is None:
+                return None
+            guard.update(inner)
+        else:
+            return None
+        guard[name] = value
+    return tuple(guard.items())
+
+
+def collect_reads(node: ast.Node, reads: "list[str]", callees: "list[str]") -> bool:
+    # Appends the identifiers node reads, and those it calls; False if it
+    # creates a closure or calls something other than a named function.
+    if isinstance(node, ast.Identifier):
+        reads.append(node.value)
+        return True
+    elif isinstance(node, ast.FunctionLiteral):
+        return False
+    elif isinstance(node, ast.CallExpression):
+        if not isinstance(node.function, ast.Identifier):
+            return False
+        callees.append(node.function.value)
+    return all(collect_reads(child, reads, callees) for child in children(node))
@@ -0,0 +1,302 @@
+from . import ast
+from . import objects
+from . import values
+from .builtins import builtins
+from .environment import Environment
+from .evaluator import HandlerTable
+from .values import NULL, Error, Function, Builtin, ReturnValue, TailCall, box, type_of, unbox
+
+
+# Native types whose boxed objects have a hash_key().
+HASHABLE = (int, bool, objects.String)
+
+
+def new_error(message: str) -> Error:
+    return Error(message)
+
+
+class NativeEvaluator:
+    """Tree-walking evaluator over unboxed values.
+
+    Monkey integers and booleans are plain Python int and bool, so arithmetic
+    and comparisons allocate no wrapper objects and type checks are identity
+    tests on type(). The other values are the __slots__ classes in
+    monkey.values; values.box converts results back to monkey.objects.
+    Strings, arrays, hashes and iterators stay monkey.objects values, so the
+    builtins work on them directly and == compares strings by identity, as
+    in Evaluator.
+    """
+
+    def __init__(self) -> None:
+        self.builtins = {name: self.native_builtin(builtin) for name, builtin in builtins.items()}
+
+        # As in Evaluator, handlers dispatch their children directly.
+        self.handlers = HandlerTable({
+            ast.Program: self.eval_program,
+            ast.ExpressionStatement: self.eval_expression_statement,
+            ast.IntegerLiteral: self.eval_integer_literal,
+            ast.Boolean: self.eval_boolean_literal,
+            ast.PrefixExpression: self.eval_prefix_node,
+            ast.InfixExpression: self.eval_infix_node,
+            ast.IfExpression: self.eval_if_expression,
+            ast.BlockStatement: self.eval_block_statements,
+            ast.ReturnStatement: self.eval_return_statement,
+            ast.LetStatement: self.eval_let_statement,
+            ast.Identifier: self.eval_identifier,
+            ast.FunctionLiteral: self.eval_function_literal,
+            ast.StringLiteral: self.eval_string_literal,
+            ast.CallExpression: self.eval_call_expression,
+            ast.ArrayLiteral: self.eval_array_literal,
+            ast.IndexExpression: self.eval_index_node,
+            ast.HashLiteral: self.eval_hash_literal,
+        })
+
+    def native_builtin(self, builtin: objects.Builtin) -> Builtin:
+        if not builtin.higher_order:
+            return unbox(builtin)
+
+        # map and filter get the Monkey functions they call boxed, so they
+        # are unboxed again to run here.
+        def apply(fn, args):
+            return box(self.apply_function(unbox(fn), [unbox(arg) for arg in args]))
+
+        return Builtin(lambda *args: unbox(builtin._fn(*[box(arg) for arg in args], apply=apply)))
+
+    def eval(self, node: ast.Node, env: Environment):
+        return self.handlers[type(node)](node, env)
+
+    def eval_expression_statement(self, node: ast.ExpressionStatement, env: Environment):
+        return self.handlers[type(node.expression)](node.expression, env)
+
+    def eval_integer_literal(self, node: ast.IntegerLiteral, env: Environment):
+        return node.value
+
+    def eval_boolean_literal(self, node: ast.Boolean, env: Environment):
+        return node.value
+
+    def eval_string_literal(self, node: ast.StringLiteral, env: Environment):
+        return objects.String(node.value)
+
+    def eval_prefix_node(self, node: ast.PrefixExpression, env: Environment):
+        right = self.handlers[type(node.right)](node.right, env)
+        if type(right) is Error:
+            return right
+        return self.eval_prefix_expression(node.operator, right)
+
+    def eval_infix_node(self, node: ast.InfixExpression, env: Environment):
+        left = self.handlers[type(node.left)](node.left, env)
+        if type(left) is Error:
+            return left
+
+        right = self.handlers[type(node.right)](node.right, env)
+        if type(right) is Error:
+            return right
+
+        return self.eval_infix_expression(node.operator, left, right)
+
+    def eval_if_expression(self, node: ast.IfExpression, env: Environment):
+        condition = self.handlers[type(node.condition)](node.condition, env)
+        if type(condition) is Error:
+            return condition
+
+        if condition is not False and condition is not NULL:
+            return self.eval_block_statements(node.consequence, env)
+        elif node.alternative:
+            return self.eval_block_statements(node.alternative, env)
+        else:
+            return NULL
+
+    def eval_return_statement(self, node: ast.ReturnStatement, env: Environment):
+        val = self.handlers[type(node.return_value)](node.return_value, env)
+        if type(val) is Error:
+            return val
+        return ReturnValue(val)
+
+    def eval_let_statement(self, node: ast.LetStatement, env: Environment):
+        val = self.handlers[type(node.value)](node.value, env)
+        if type(val) is Error:
+            return val
+        env.set(node.name.value, val)
+
+    def eval_function_literal(self, node: ast.FunctionLiteral, env: Environment):
+        return Function(node.parameters, node.body, env)
+
+    def eval_call_expression(self, node: ast.CallExpression, env: Environment):
+        function = self.handlers[type(node.function)](node.function, env)
+        if type(function) is Error:
+            return function
+
+        args = []
+        for argument in node.arguments:
+            evaluated = self.handlers[type(argument)](argument, env)
+            if type(evaluated) is Error:
+                return evaluated
+            args.append(evaluated)
+
+        if node.tail:
+            return TailCall(function, args)
+        return self.apply_function(function, args)
+
+    def eval_array_literal(self, node: ast.ArrayLiteral, env: Environment):
+        elements = []
+        for element in node.elements:
+            evaluated = self.handlers[type(element)](element, env)
+            if type(evaluated) is Error:
+                return evaluated
+            elements.append(box(evaluated))
+        return objects.Array.of(elements)
+
+    def eval_index_node(self, node: ast.IndexExpression, env: Environment):
+        left = self.handlers[type(node.left)](node.left, env)
+        if type(left) is Error:
+            return left
+
+        index = self.handlers[type(node.index)](node.index, env)
+        if type(index) is Error:
+            return index
+
+        if type(left) is objects.Array and type(index) is int:
+            if index < 0 or index >= len(left):
+                return NULL
+            return unbox(left.get(index))
+        elif type(left) is objects.Hash:
+            if type(index) not in HASHABLE:
+                return new_error(f"unusable as hash key: {type_of(index)}")
+            value = left.get(box(index))
+            return NULL if value is None else unbox(value)
+        return new_error(f"index operator not supported: {type_of(left)}")
+
+    def eval_hash_literal(self, node: ast.HashLiteral, env: Environment):
+        pairs = []
+        for key_node, value_node in node.pairs:
+            key = self.handlers[type(key_node)](key_node, env)
+            if type(key) is Error:
+                return key
+            if type(key) not in HASHABLE:
+                return new_error(f"unusable as hash key: {type_of(key)}")
+
+            value = self.handlers[type(value_node)](value_node, env)
+            if type(value) is Error:
+                return value
+            pairs.append((box(key), box(value)))
+
+        return objects.Hash.of(pairs)
+
+    def eval_program(self, program: ast.Program, env: Environment):
+        result = None
+        for statement in program.statements:
+            try:
+                result = self.eval(statement, env)
+            except RecursionError:
+                return new_error("Maximum call depth exceeded")
+
+            if type(result) is ReturnValue:
+                return result.value
+            elif type(result) is Error:
+                return result
+
+        return result
+
+    def eval_block_statements(self, block: ast.BlockStatement, env: Environment):
+        handlers = self.handlers
+        result = None
+        for statement in block.statements:
+            statement_type = type(statement)
+            if statement_type is ast.ExpressionStatement:
+                statement = statement.expression
+            elif statement_type is ast.ReturnStatement:
+                # As in Evaluator.eval_block_statements.
+                value = statement.return_value
+                result = handlers[type(value)](value, env)
+                return result if type(result) is Error else ReturnValue(result)
+            result = handlers[type(statement)](statement, env)
+
+            if type(result) is ReturnValue or type(result) is Error:
+                return result
+
+        return result
+
+    def eval_prefix_expression(self, operator: str, right):
+        if operator == '!':
+            return right is False or right is NULL
+        elif operator == '-':
+            if type(right) is not int:
+                return new_error(f"Unknown operator: -{type_of(right)}")
+            return -right
+        else:
+            return new_error(f"Unknown operator: {operator}{type_of(right)}")
+
+    def eval_infix_expression(self, operator: str, left, right):
+        if type(left) is int and type(right) is int:
+            if operator == '+':
+                return left + right
+            elif operator == '-':
+                return left - right
+            elif operator == '*':
+                return left * right
+            elif operator == '/':
+                if right == 0:
+                    return new_error("Division by zero")
+                return left // right
+            elif operator == '<':
+                return left < right
+            elif operator == '>':
+                return left > right
+            elif operator == '==':
+                return left == right
+            elif operator == '!=':
+                return left != right
+            return new_error(f"Unknown operator: INTEGER {operator} INTEGER")
+        elif operator == '==':
+            return self.equals(left, right)
+        elif operator == '!=':
+            return not self.equals(left, right)
+        elif type(left) is not type(right):
+            return new_error(f"Type mismatch: {type_of(left)} {operator} {type_of(right)}")
+        elif type(left) is objects.String and operator == '+':
+            return objects.String.concat(left, right)
+        else:
+            return new_error(f"Unknown operator: {type_of(left)} {operator} {type_of(right)}")
+
+    def equals(self, left, right) -> bool:
+        # True == 1 in Python, so values of different types never compare equal.
+        if type(left) is not type(right):
+            return False
+        return left is right
+
+    def eval_identifier(self, node: ast.Identifier, env: Environment):
+        val = env.get(node.value)
+        if val is not None:
+            return val
+
+        builtin = self.builtins.get(node.value)
+        if builtin:
+            return builtin
+
+        return new_error(f"Identifier not found: {node.value}")
+
+    def apply_function(self, fn, args: list):
+        while True:
+            if type(fn) is Function:
+                if len(fn.parameters) != len(args):
+                    return new_error(f"wrong number of arguments: want={len(fn.parameters)}, got={len(args)}")
+                evaluated = self.eval(fn.body, self.extend_function_env(fn, args))
+                if type(evaluated) is ReturnValue:
+                    evaluated = evaluated.value
+                if type(evaluated) is TailCall:
+                    fn, args = evaluated.fn, evaluated.args
+                    continue
+                return evaluated
+            elif type(fn) is Builtin:
+                return fn.fn(*args)
+            else:
+                return new_error(f"not a function: {type_of(fn)}")
+
+    def extend_function_env(self, fn: Function, args: list) -> Environment:
+        env = Environment(fn.env)
+        store = env.store
+
+        for index, param in enumerate(fn.parameters):
+            store[param.value] = args[index]
+
+        return env
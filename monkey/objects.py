@@ -1,16 +1,26 @@
+from array import array
 from logging import ERROR
 from monkey import ast
 from monkey.environment import Environment
+from monkey.persistent import EMPTY_MAP, PersistentMap, PersistentVector
 
 
 INTEGER_OBJ = "INTEGER"
 BOOLEAN_OBJ = "BOOLEAN"
 NULL_OBJ = "NULL"
 RETURN_VALUE_OBJ = "RETURN_VALUE"
+TAIL_CALL_OBJ = "TAIL_CALL"
 ERROR_OBJ = "ERROR"
 FUNCTION_OBJ = "FUNCTION"
 STRING_OBJ = "STRING"
 BUILTIN_OBJ = "BUILTIN"
+COMPILED_FUNCTION_OBJ = "COMPILED_FUNCTION"
+ARRAY_OBJ = "ARRAY"
+HASH_OBJ = "HASH"
+ITERATOR_OBJ = "ITERATOR"
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
 
 
 class Object:
@@ -31,6 +41,9 @@ class Integer:
     def type(self) -> str:
         return INTEGER_OBJ
 
+    def hash_key(self) -> tuple:
+        return (INTEGER_OBJ, self.value)
+
 
 class Boolean:
     def __init__(self, value: bool) -> None:
@@ -42,6 +55,9 @@ class Boolean:
     def type(self) -> str:
         return BOOLEAN_OBJ
 
+    def hash_key(self) -> tuple:
+        return (BOOLEAN_OBJ, self.value)
+
 
 class Null:
     def type(self) -> str:
@@ -61,6 +77,20 @@ class ReturnValue:
     def inspect(self) -> str:
         return self.value.inspect()
 
+class TailCall:
+    # Returned from a call in tail position so apply_function can loop instead
+    # of recursing. `site` is the CallExpression, for its inline cache.
+    def __init__(self, fn: Object, args: "list[Object]", site: "ast.CallExpression" = None) -> None:
+        self.fn = fn
+        self.args = args
+        self.site = site
+
+    def type(self) -> str:
+        return TAIL_CALL_OBJ
+
+    def inspect(self) -> str:
+        return "tail call"
+
 class Error:
     def __init__(self, message: str) -> None:
         self.message = message
@@ -72,6 +102,9 @@ class Error:
         return "ERROR: " + self.message
 
 class Function:
+    # Set on the copies made by the memo() builtin.
+    memo = False
+
     def __init__(self, parameters: "list[ast.Identifier]" = [], body: ast.BlockStatement = None, env: Environment = None) -> None:
         self.parameters = parameters
         self.body = body
@@ -88,9 +121,69 @@ class Function:
         return f"fn({', '.join(parameters)} {{\n{self.body}\n}}"
 
 
+# Concatenations shorter than this are joined right away; longer ones build
+# a rope node.
+ROPE_THRESHOLD = 64
+# A short string appended to a rope is joined to the rope's last leaf while
+# that leaf stays under this length, so a rope grown by small appends has a
+# node per chunk rather than per append.
+ROPE_CHUNK = 1024
+
+
 class String:
+    """A Monkey string, possibly held as a rope.
+
+    concat() of long strings makes a node that only keeps its two operands
+    and the total length, so repeated `+` costs O(1) each. The text is
+    joined the first time `value` is read, and the operands are then
+    dropped. Until then a rope costs an object per node on top of its
+    text; short appends are gathered into leaves of up to ROPE_CHUNK
+    characters so that overhead stays small (benchmarks/strings.py: peak
+    about 1.1x that of flat strings, against 3.4x with a node per append).
+    """
+    __slots__ = ("_value", "left", "right", "length")
+
     def __init__(self, value: str) -> None:
-        self.value = value
+        self._value = value
+        self.left = self.right = None
+        self.length = len(value)
+
+    @classmethod
+    def concat(cls, left: "String", right: "String") -> "String":
+        length = left.length + right.length
+        if length < ROPE_THRESHOLD:
+            return cls(left.value + right.value)
+        if left._value is None and right._value is not None and left.right._value is not None \
+                and left.right.length + right.length < ROPE_CHUNK:
+            # The new node shares left's left subtree; left itself is unchanged.
+            left, right = left.left, cls(left.right._value + right._value)
+
+        string = cls.__new__(cls)
+        string._value = None
+        string.left = left
+        string.right = right
+        string.length = length
+        return string
+
+    @property
+    def value(self) -> str:
+        if self._value is None:
+            self._value = self.flatten()
+            self.left = self.right = None
+        return self._value
+
+    def flatten(self) -> str:
+        # Iterative, since ropes built by a loop are as deep as it ran.
+        chunks = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._value is not None:
+                chunks.append(node._value)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+        return "".join(chunks)
 
     def type(self) -> str:
         return STRING_OBJ
@@ -98,13 +191,193 @@ class String:
     def inspect(self) -> str:
         return self.value
 
+    def hash_key(self) -> tuple:
+        return (STRING_OBJ, self.value)
+
+
+class Array:
+    """A Monkey array.
+
+    When every element is an Integer that fits in 64 bits the values are kept
+    unboxed in `ints`, an array('q') (or, for range(), a Python range, which
+    takes constant memory, and for rest(), a memoryview sharing the buffer
+    of the array it came from), which the batched builtins work on without
+    creating Integer objects; otherwise `elements` holds the objects
+    in a PersistentVector. Arrays are never changed after they are made:
+    push and set return a new array sharing the vector of the old one, and
+    move a compact array to a vector the first time.
+    """
+
+    def __init__(self, elements: PersistentVector = None, ints: array = None) -> None:
+        self.elements = elements
+        self.ints = ints
+
+    @classmethod
+    def of(cls, elements: "list[Object]") -> "Array":
+        if all(type(e) is Integer for e in elements):
+            try:
+                return cls(ints=array('q', [e.value for e in elements]))
+            except OverflowError:
+                pass
+        return cls(PersistentVector.from_iterable(elements))
+
+    @classmethod
+    def of_ints(cls, values) -> "Array":
+        # values is a sequence of Python ints (a list, range or array).
+        if type(values) is range and INT64_MIN <= min(values.start, values.stop) and max(values.start, values.stop) <= INT64_MAX:
+            return cls(ints=values)
+        try:
+            return cls(ints=array('q', values))
+        except OverflowError:
+            return cls(PersistentVector.from_iterable(Integer(v) for v in values))
+
+    def __len__(self) -> int:
+        return len(self.ints) if self.ints is not None else len(self.elements)
+
+    def __bool__(self) -> bool:
+        # Engines test results with `if result:`; an empty array is a value.
+        return True
+
+    def __iter__(self):
+        if self.ints is not None:
+            return (Integer(v) for v in self.ints)
+        return iter(self.elements)
+
+    def get(self, index: int) -> Object:
+        if self.ints is not None:
+            return Integer(self.ints[index])
+        return self.elements[index]
+
+    def objects(self) -> "list[Object]":
+        return list(self)
+
+    def vector(self) -> PersistentVector:
+        if self.ints is not None:
+            return PersistentVector.from_iterable(self)
+        return self.elements
+
+    def push(self, element: Object) -> "Array":
+        return Array(self.vector().append(element))
+
+    def set(self, index: int, element: Object) -> "Array":
+        return Array(self.vector().set(index, element))
+
+    def type(self) -> str:
+        return ARRAY_OBJ
+
+    def inspect(self) -> str:
+        if self.ints is not None:
+            return f"[{', '.join(map(str, self.ints))}]"
+        return f"[{', '.join(e.inspect() for e in self.elements)}]"
+
+
+class Iterator:
+    """A lazy, single-pass sequence of Monkey objects.
+
+    Wraps a Python iterator, so the builtins that take and return iterators
+    (map, filter, take, lines) compose into pipelines that hold one element
+    at a time. An Error among the elements stops whatever consumes it.
+    """
+
+    def __init__(self, source) -> None:
+        self.source = source
+
+    def __iter__(self):
+        return self.source
+
+    def __bool__(self) -> bool:
+        return True
+
+    def type(self) -> str:
+        return ITERATOR_OBJ
+
+    def inspect(self) -> str:
+        return "iterator"
+
+
+class Hash:
+    """A Monkey hash, over a PersistentMap from each key's hash_key() to
+    (key, value, position). Keys are listed in the order they were first
+    added, which `position` records; set returns a new Hash sharing the trie
+    of the old one.
+    """
+
+    def __init__(self, pairs: PersistentMap = EMPTY_MAP) -> None:
+        self.pairs = pairs
+
+    @classmethod
+    def of(cls, pairs) -> "Hash":
+        # pairs is an iterable of (key, value); later keys win.
+        result = cls()
+        for key, value in pairs:
+            result = result.set(key, value)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def get(self, key: Object) -> Object:
+        entry = self.pairs.get(key.hash_key())
+        return entry[1] if entry is not None else None
+
+    def set(self, key: Object, value: Object) -> "Hash":
+        hash_key = key.hash_key()
+        entry = self.pairs.get(hash_key)
+        position = entry[2] if entry is not None else len(self.pairs)
+        return Hash(self.pairs.set(hash_key, (key, value, position)))
+
+    def items(self) -> "list[tuple[Object, Object]]":
+        entries = sorted(self.pairs.items(), key=lambda item: item[1][2])
+        return [(key, value) for _, (key, value, _) in entries]
+
+    def type(self) -> str:
+        return HASH_OBJ
+
+    def inspect(self) -> str:
+        return "{" + ", ".join(f"{key.inspect()}: {value.inspect()}" for key, value in self.items()) + "}"
+
 
 class Builtin:
-    def __init__(self, fn = None):
+    def __init__(self, fn = None, pure: bool = True, higher_order: bool = False):
         self._fn = fn
+        # False for builtins with side effects, which make callers impure.
+        self.pure = pure
+        # Higher-order builtins call Monkey functions through the `apply`
+        # keyword argument, which the evaluator passes.
+        self.higher_order = higher_order
 
     def type(self) -> str:
         return BUILTIN_OBJ
 
     def inspect(self) -> str:
         return "builtin function"
+
+
+class CompiledFunction:
+    def __init__(self, instructions: bytes, num_locals: int = 0, num_parameters: int = 0, local_names: "list[str]" = None) -> None:
+        self.instructions = instructions
+        self.num_locals = num_locals
+        self.num_parameters = num_parameters
+        self.local_names = local_names or []
+
+    def type(self) -> str:
+        return COMPILED_FUNCTION_OBJ
+
+    def inspect(self) -> str:
+        return f"CompiledFunction[{id(self):#x}]"
+
+
+class Closure:
+    def __init__(self, fn: CompiledFunction, free: "tuple" = ()) -> None:
+        self.fn = fn
+        self.free = free
+
+    def type(self) -> str:
+        # To Monkey programs, and in error messages, a function like any other.
+        return FUNCTION_OBJ
+
+    def inspect(self) -> str:
+        return f"Closure[{id(self):#x}]"
@@ -0,0 +1,171 @@
+from . import ast
+from . import objects
+from .token import Token, TokenType
+
+
+class Optimizer:
+    """AST-to-AST pass run between parsing and evaluation.
+
+    Folds prefix and infix expressions over literals, drops the branch of an
+    if whose condition is a literal that can never select it, and caches the
+    runtime Integer on every IntegerLiteral. Anything that would produce an
+    error (type mismatches, unknown operators, division by zero) is left in
+    place so it still surfaces at runtime. `removed` counts the nodes taken
+    out of the tree across every program optimized.
+    """
+
+    def __init__(self) -> None:
+        self.removed = 0
+
+    def optimize_program(self, program: ast.Program) -> ast.Program:
+        before = count_nodes(program)
+        program.statements = [self.optimize(s) for s in program.statements]
+        self.removed += before - count_nodes(program)
+        return program
+
+    def optimize(self, node: ast.Node) -> ast.Node:
+        if isinstance(node, ast.ExpressionStatement):
+            node.expression = self.optimize(node.expression)
+        elif isinstance(node, ast.LetStatement):
+            node.value = self.optimize(node.value)
+        elif isinstance(node, ast.ReturnStatement):
+            node.return_value = self.optimize(node.return_value)
+        elif isinstance(node, ast.BlockStatement):
+            node.statements = [self.optimize(s) for s in node.statements]
+        elif isinstance(node, ast.PrefixExpression):
+            node.right = self.optimize(node.right)
+            return self.fold_prefix(node)
+        elif isinstance(node, ast.InfixExpression):
+            node.left = self.optimize(node.left)
+            node.right = self.optimize(node.right)
+            return self.fold_infix(node)
+        elif isinstance(node, ast.IfExpression):
+            node.condition = self.optimize(node.condition)
+            node.consequence = self.optimize(node.consequence)
+            if node.alternative:
+                node.alternative = self.optimize(node.alternative)
+            return self.prune_if(node)
+        elif isinstance(node, ast.FunctionLiteral):
+            node.body = self.optimize(node.body)
+        elif isinstance(node, ast.CallExpression):
+            node.function = self.optimize(node.function)
+            node.arguments = [self.optimize(a) for a in node.arguments]
+        elif isinstance(node, ast.ArrayLiteral):
+            node.elements = [self.optimize(e) for e in node.elements]
+        elif isinstance(node, ast.IndexExpression):
+            node.left = self.optimize(node.left)
+            node.index = self.optimize(node.index)
+        elif isinstance(node, ast.HashLiteral):
+            node.pairs = [(self.optimize(k), self.optimize(v)) for k, v in node.pairs]
+        elif isinstance(node, ast.IntegerLiteral):
+            node.obj = objects.Integer(node.value)
+        return node
+
+    def fold_prefix(self, node: ast.PrefixExpression) -> ast.Expression:
+        right = node.right
+        if node.operator == '-' and isinstance(right, ast.IntegerLiteral):
+            return integer_literal(-right.value)
+        elif node.operator == '!' and is_constant(right):
+            return boolean_literal(not truthy(right))
+        return node
+
+    def fold_infix(self, node: ast.InfixExpression) -> ast.Expression:
+        left, operator, right = node.left, node.operator, node.right
+
+        if isinstance(left, ast.IntegerLiteral) and isinstance(right, ast.IntegerLiteral):
+            if operator == '+':
+                return integer_literal(left.value + right.value)
+            elif operator == '-':
+                return integer_literal(left.value - right.value)
+            elif operator == '*':
+                return integer_literal(left.value * right.value)
+            elif operator == '/' and right.value != 0:
+                return integer_literal(left.value // right.value)
+            elif operator == '<':
+                return boolean_literal(left.value < right.value)
+            elif operator == '>':
+                return boolean_literal(left.value > right.value)
+            elif operator == '==':
+                return boolean_literal(left.value == right.value)
+            elif operator == '!=':
+                return boolean_literal(left.value != right.value)
+        elif isinstance(left, ast.Boolean) and isinstance(right, ast.Boolean):
+            if operator == '==':
+                return boolean_literal(left.value == right.value)
+            elif operator == '!=':
+                return boolean_literal(left.value != right.value)
+        elif isinstance(left, ast.StringLiteral) and isinstance(right, ast.StringLiteral):
+            # Strings compare by identity, so only concatenation folds.
+            if operator == '+':
+                value = left.value + right.value
+                return ast.StringLiteral(Token(TokenType.STRING, value), value)
+        return node
+
+    def prune_if(self, node: ast.IfExpression) -> ast.Expression:
+        if not is_constant(node.condition):
+            return node
+
+        if truthy(node.condition):
+            node.alternative = None
+        elif node.alternative:
+            # Keep the else branch as the only one, under a condition that
+            # always selects it.
+            node.condition = boolean_literal(True)
+            node.consequence = node.alternative
+            node.alternative = None
+        else:
+            # Still evaluates to NULL, without carrying the dead block.
+            node.consequence = ast.BlockStatement(node.consequence.token, [])
+        return node
+
+
+def is_constant(node: ast.Expression) -> bool:
+    return isinstance(node, (ast.IntegerLiteral, ast.Boolean, ast.StringLiteral))
+
+
+def truthy(node: ast.Expression) -> bool:
+    # Only false (and null, which has no literal) is falsy in Monkey.
+    return not (isinstance(node, ast.Boolean) and not node.value)
+
+
+def integer_literal(value: int) -> ast.IntegerLiteral:
+    node = ast.IntegerLiteral(Token(TokenType.INT, str(value)), value)
+    node.obj = objects.Integer(value)
+    return node
+
+
+def boolean_literal(value: bool) -> ast.Boolean:
+    if value:
+        return ast.Boolean(Token(TokenType.TRUE, "true"), True)
+    return ast.Boolean(Token(TokenType.FALSE, "false"), False)
+
+
+def count_nodes(node: ast.Node) -> int:
+    if node is None:
+        return 0
+    elif isinstance(node, (ast.Program, ast.BlockStatement)):
+        return 1 + sum(count_nodes(s) for s in node.statements)
+    elif isinstance(node, ast.ExpressionStatement):
+        return 1 + count_nodes(node.expression)
+    elif isinstance(node, ast.LetStatement):
+        return 2 + count_nodes(node.value)
+    elif isinstance(node, ast.ReturnStatement):
+        return 1 + count_nodes(node.return_value)
+    elif isinstance(node, ast.PrefixExpression):
+        return 1 + count_nodes(node.right)
+    elif isinstance(node, ast.InfixExpression):
+        return 1 + count_nodes(node.left) + count_nodes(node.right)
+    elif isinstance(node, ast.IfExpression):
+        return (1 + count_nodes(node.condition) + count_nodes(node.consequence)
+                + count_nodes(node.alternative))
+    elif isinstance(node, ast.FunctionLiteral):
+        return 1 + len(node.parameters) + count_nodes(node.body)
+    elif isinstance(node, ast.CallExpression):
+        return 1 + count_nodes(node.function) + sum(count_nodes(a) for a in node.arguments)
+    elif isinstance(node, ast.ArrayLiteral):
+        return 1 + sum(count_nodes(e) for e in node.elements)
+    elif isinstance(node, ast.IndexExpression):
+        return 1 + count_nodes(node.left) + count_nodes(node.index)
+    elif isinstance(node, ast.HashLiteral):
+        return 1 + sum(count_nodes(k) + count_nodes(v) for k, v in node.pairs)
+    return 1
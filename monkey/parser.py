@@ -1,5 +1,5 @@
 from enum import IntEnum, auto
-from typing import Callable
+from typing import Callable, Iterator
 
 from . import ast
 from .ast import PrefixExpression, Program, ReturnStatement, Statement, LetStatement, Identifier
@@ -14,6 +14,7 @@ class Precedence(IntEnum):
     PRODUCT=auto()
     PREFIX=auto()
     CALL=auto()
+    INDEX=auto()
 
 PRECEDENCES = {
     TokenType.EQ: Precedence.EQUALS,
@@ -25,6 +26,7 @@ PRECEDENCES = {
     TokenType.SLASH: Precedence.PRODUCT,
     TokenType.ASTERISK: Precedence.PRODUCT,
     TokenType.LPAREN: Precedence.CALL,
+    TokenType.LBRACKET: Precedence.INDEX,
 }
 
 class Parser:
@@ -32,6 +34,7 @@ class Parser:
         self.lexer = lexer
         self.cur_token: Token = None
         self.peek_token: Token = None
+        self.errors: "list[str]" = []
         self.prefix_parse_fns = {}
         self.infix_parse_fns = {}
 
@@ -45,6 +48,8 @@ class Parser:
         self.register_prefix(TokenType.IF, self.parse_if_expression)
         self.register_prefix(TokenType.FUNCTION, self.parse_function_literal)
         self.register_prefix(TokenType.STRING, self.parse_string_literal)
+        self.register_prefix(TokenType.LBRACKET, self.parse_array_literal)
+        self.register_prefix(TokenType.LBRACE, self.parse_hash_literal)
 
         self.register_infix(TokenType.PLUS, self.parse_infix_expression)
         self.register_infix(TokenType.MINUS, self.parse_infix_expression)
@@ -55,6 +60,7 @@ class Parser:
         self.register_infix(TokenType.LT, self.parse_infix_expression)
         self.register_infix(TokenType.GT, self.parse_infix_expression)
         self.register_infix(TokenType.LPAREN, self.parse_call_expression)
+        self.register_infix(TokenType.LBRACKET, self.parse_index_expression)
 
         self.next_token()
         self.next_token()
@@ -65,13 +71,17 @@ class Parser:
     
     def parse_program(self) -> Program:
         program = Program()
-        
+        program.statements.extend(self.parse_statements())
+        return program
+
+    def parse_statements(self) -> "Iterator[Statement]":
+        # Top-level statements, each yielded as soon as it is parsed, so a
+        # caller can run it before the lexer has read any further.
         while self.cur_token.token_type != TokenType.EOF:
             stmt = self.parse_statement()
             if stmt is not None:
-                program.statements.append(stmt)
+                yield stmt
             self.next_token()
-        return program
     
     def parse_statement(self) -> Statement:
         if self.cur_token.token_type == TokenType.LET:
@@ -121,8 +131,9 @@ class Parser:
         return stmt
 
     def parse_expression(self, precedence: int) -> ast.Expression:
-        prefix = self.prefix_parse_fns[self.cur_token.token_type]
+        prefix = self.prefix_parse_fns.get(self.cur_token.token_type)
         if not prefix:
+            self.error(f"no prefix parse function for {self.cur_token.token_type.name} found", back=1)
             return None
         left_exp = prefix()
 
@@ -177,8 +188,6 @@ class Parser:
 
         if not self.cur_token_is(TokenType.RBRACE):
             return None
-        else:
-            self.next_token()
 
         return ast.IfExpression(
             if_token, condition, consequence, alternative
@@ -247,6 +256,7 @@ class Parser:
         if not self.expect_peek(TokenType.LBRACE):
             return None
         literal.body = self.parse_block_statement()
+        ast.mark_tail_calls(literal.body)
 
         return literal
 
@@ -277,9 +287,12 @@ class Parser:
         return ast.CallExpression(self.cur_token, function, self.parse_call_arguments())
 
     def parse_call_arguments(self) -> ast.Expression:
+        return self.parse_expression_list(TokenType.RPAREN)
+
+    def parse_expression_list(self, end: TokenType) -> "list[ast.Expression]":
         args = []
 
-        if self.peek_token_is(TokenType.RPAREN):
+        if self.peek_token_is(end):
             self.next_token()
             return args
         
@@ -291,17 +304,61 @@ class Parser:
             self.next_token()
             args.append(self.parse_expression(Precedence.LOWEST))
 
-        if not self.expect_peek(TokenType.RPAREN):
+        if not self.expect_peek(end):
             return None
 
         return args
 
+    def parse_array_literal(self) -> ast.Expression:
+        return ast.ArrayLiteral(self.cur_token, self.parse_expression_list(TokenType.RBRACKET))
+
+    def parse_index_expression(self, left: ast.Expression) -> ast.Expression:
+        exp = ast.IndexExpression(self.cur_token, left)
+        self.next_token()
+        exp.index = self.parse_expression(Precedence.LOWEST)
+
+        if not self.expect_peek(TokenType.RBRACKET):
+            return None
+
+        return exp
+
+    def parse_hash_literal(self) -> ast.Expression:
+        hash_literal = ast.HashLiteral(self.cur_token)
+
+        while not self.peek_token_is(TokenType.RBRACE):
+            self.next_token()
+            key = self.parse_expression(Precedence.LOWEST)
+            if not self.expect_peek(TokenType.COLON):
+                return None
+
+            self.next_token()
+            value = self.parse_expression(Precedence.LOWEST)
+            hash_literal.pairs.append((key, value))
+
+            if not self.peek_token_is(TokenType.RBRACE) and not self.expect_peek(TokenType.COMMA):
+                return None
+
+        if not self.expect_peek(TokenType.RBRACE):
+            return None
+
+        return hash_literal
+
     def expect_peek(self, t: TokenType) -> bool:
         if self.peek_token_is(t):
             self.next_token()
             return True
         else:
+            self.error(f"expected next token to be {t.name}, got {self.peek_token.token_type.name} instead")
             return False
+
+    def error(self, message: str, back: int = 0) -> None:
+        # back=0 blames the peek token, back=1 the current one. Token sources
+        # that know positions (TokenStream) prefix the message with them.
+        location = getattr(self.lexer, "location", None)
+        if location:
+            line, column = location(back)
+            message = f"{line}:{column}: {message}"
+        self.errors.append(message)
     
     def register_prefix(self, token_type: TokenType, prefix_parse_fn: Callable):
         self.prefix_parse_fns[token_type] = prefix_parse_fn
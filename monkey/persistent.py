@@ -0,0 +1,298 @@
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+# Hashes are cut to 32 bits, so a trie is at most seven levels deep; keys
+# whose cut hashes are equal share a collision node below that.
+HASH_BITS = 32
+HASH_MASK = (1 << HASH_BITS) - 1
+
+
+class PersistentVector:
+    """Immutable sequence as a 32-way trie plus a tail, as in Clojure.
+
+    The trie holds the first len - len(tail) items in full leaves of 32; the
+    last 1 to 32 items sit in `tail`. append and set copy only the path from
+    the root to the leaf they change (at most log32(n) lists of 32), so the
+    old and new vectors share everything else. Nodes are Python lists that
+    are never changed once a vector refers to them.
+
+    The first `start` items are dropped: rest() shares the whole trie and
+    only moves start, so `count` counts the items the trie and tail hold,
+    dropped ones included.
+    """
+
+    __slots__ = ("count", "shift", "root", "tail", "start")
+
+    def __init__(self, count: int = 0, shift: int = BITS, root: list = None, tail: list = None, start: int = 0) -> None:
+        self.count = count
+        self.shift = shift
+        self.root = root if root is not None else []
+        self.tail = tail if tail is not None else []
+        self.start = start
+
+    @classmethod
+    def from_iterable(cls, items) -> "PersistentVector":
+        # Builds the trie bottom-up instead of appending one item at a time.
+        items = list(items)
+        count = len(items)
+        if count == 0:
+            return EMPTY_VECTOR
+        tail_offset = ((count - 1) >> BITS) << BITS
+        nodes = [items[i:i + WIDTH] for i in range(0, tail_offset, WIDTH)]
+        shift = BITS
+        if nodes:
+            nodes = [nodes[i:i + WIDTH] for i in range(0, len(nodes), WIDTH)]
+            while len(nodes) > 1:
+                nodes = [nodes[i:i + WIDTH] for i in range(0, len(nodes), WIDTH)]
+                shift += BITS
+        return cls(count, shift, nodes[0] if nodes else [], items[tail_offset:])
+
+    def __len__(self) -> int:
+        return self.count - self.start
+
+    def __getitem__(self, index: int):
+        if index < 0 or index >= self.count - self.start:
+            raise IndexError(index)
+        index += self.start
+        offset = self.count - len(self.tail)
+        if index >= offset:
+            return self.tail[index - offset]
+        node = self.root
+        for level in range(self.shift, 0, -BITS):
+            node = node[(index >> level) & MASK]
+        return node[index & MASK]
+
+    def __iter__(self):
+        offset = self.count - len(self.tail)
+        if self.start < offset:
+            yield from leaves_from(self.root, self.shift, self.start)
+        yield from self.tail[max(self.start - offset, 0):]
+
+    def append(self, item) -> "PersistentVector":
+        count = self.count
+        if len(self.tail) < WIDTH:
+            return PersistentVector(count + 1, self.shift, self.root, self.tail + [item], self.start)
+
+        # The tail is full: it becomes a leaf of the trie and item starts a
+        # new tail.
+        shift = self.shift
+        if (count >> BITS) > (1 << shift):
+            root = [self.root, new_path(shift, self.tail)]
+            shift += BITS
+        else:
+            root = push_tail(count, shift, self.root, self.tail)
+        return PersistentVector(count + 1, shift, root, [item], self.start)
+
+    def set(self, index: int, item) -> "PersistentVector":
+        if index < 0 or index >= self.count - self.start:
+            raise IndexError(index)
+        index += self.start
+        offset = self.count - len(self.tail)
+        if index >= offset:
+            tail = self.tail[:]
+            tail[index - offset] = item
+            return PersistentVector(self.count, self.shift, self.root, tail, self.start)
+        return PersistentVector(self.count, self.shift, assoc(self.root, self.shift, index, item), self.tail, self.start)
+
+    def rest(self) -> "PersistentVector":
+        # All items but the first, in constant time. Once only tail items
+        # are left they are copied out, so the trie can be collected.
+        start = self.start + 1
+        offset = self.count - len(self.tail)
+        if start < offset:
+            return PersistentVector(self.count, self.shift, self.root, self.tail, start)
+        return PersistentVector.from_iterable(self.tail[start - offset:])
+
+
+EMPTY_VECTOR = PersistentVector()
+
+
+def leaves(node: list, level: int):
+    if level == 0:
+        yield from node
+    else:
+        for child in node:
+            yield from leaves(child, level - BITS)
+
+
+def leaves_from(node: list, level: int, index: int):
+    # The items under node from trie index `index` on, skipping whole
+    # subtrees before it.
+    if level == 0:
+        yield from node[index & MASK:]
+        return
+    slot = (index >> level) & MASK
+    yield from leaves_from(node[slot], level - BITS, index)
+    for child in node[slot + 1:]:
+        yield from leaves(child, level - BITS)
+
+
+def new_path(level: int, node: list) -> list:
+    while level > 0:
+        node = [node]
+        level -= BITS
+    return node
+
+
+def push_tail(count: int, level: int, parent: list, tail: list) -> list:
+    # A copy of parent with tail added as the leaf after the last one.
+    index = ((count - 1) >> level) & MASK
+    node = parent[:]
+    if level == BITS:
+        child = tail
+    elif index < len(parent):
+        child = push_tail(count, level - BITS, parent[index], tail)
+    else:
+        child = new_path(level - BITS, tail)
+    if index == len(node):
+        node.append(child)
+    else:
+        node[index] = child
+    return node
+
+
+def assoc(node: list, level: int, index: int, item) -> list:
+    node = node[:]
+    if level == 0:
+        node[index & MASK] = item
+    else:
+        slot = (index >> level) & MASK
+        node[slot] = assoc(node[slot], level - BITS, index, item)
+    return node
+
+
+class BitmapNode:
+    # Bit i of bitmap is set when the slot for hash fragment i is used; the
+    # used slots are packed in order into `entries`, each a (key, value) pair
+    # or, with key UNSET, a child node.
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: "list[tuple]") -> None:
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class CollisionNode:
+    # Keys whose 32-bit hashes are all equal.
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, hash: int, entries: "list[tuple]") -> None:
+        self.hash = hash
+        self.entries = entries
+
+
+UNSET = object()
+
+
+class PersistentMap:
+    """Immutable mapping as a hash array mapped trie (HAMT).
+
+    Each level consumes five bits of the key's hash and stores only the slots
+    in use, so a node is as small as its entries. set copies the nodes on
+    the path to the key, at most seven, and shares the rest with the map it
+    was made from. Iteration follows hash order.
+    """
+
+    __slots__ = ("count", "root")
+
+    def __init__(self, count: int = 0, root: BitmapNode = None) -> None:
+        self.count = count
+        self.root = root if root is not None else BitmapNode(0, [])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, key, default=None):
+        h = hash(key) & HASH_MASK
+        node = self.root
+        shift = 0
+        while True:
+            if type(node) is CollisionNode:
+                for entry_key, value in node.entries:
+                    if entry_key == key:
+                        return value
+                return default
+            bit = 1 << ((h >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            entry_key, value = node.entries[(node.bitmap & (bit - 1)).bit_count()]
+            if entry_key is UNSET:
+                node = value
+                shift += BITS
+            elif entry_key == key:
+                return value
+            else:
+                return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, UNSET) is not UNSET
+
+    def set(self, key, value) -> "PersistentMap":
+        added = [False]
+        root = insert(self.root, 0, hash(key) & HASH_MASK, key, value, added)
+        return PersistentMap(self.count + added[0], root)
+
+    def items(self):
+        return node_items(self.root)
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+
+EMPTY_MAP = PersistentMap()
+
+
+def insert(node, shift: int, h: int, key, value, added: list):
+    # A copy of node with key set to value; added[0] becomes True if key was
+    # not there before.
+    if type(node) is CollisionNode:
+        entries = node.entries[:]
+        for i, (entry_key, _) in enumerate(entries):
+            if entry_key == key:
+                entries[i] = (key, value)
+                return CollisionNode(node.hash, entries)
+        added[0] = True
+        entries.append((key, value))
+        return CollisionNode(node.hash, entries)
+
+    bit = 1 << ((h >> shift) & MASK)
+    position = (node.bitmap & (bit - 1)).bit_count()
+    entries = node.entries[:]
+    if not node.bitmap & bit:
+        added[0] = True
+        entries.insert(position, (key, value))
+        return BitmapNode(node.bitmap | bit, entries)
+
+    entry_key, entry_value = entries[position]
+    if entry_key is UNSET:
+        entries[position] = (UNSET, insert(entry_value, shift + BITS, h, key, value, added))
+    elif entry_key == key:
+        entries[position] = (key, value)
+    else:
+        added[0] = True
+        entries[position] = (UNSET, split(shift + BITS, entry_key, entry_value, key, value, h))
+    return BitmapNode(node.bitmap, entries)
+
+
+def split(shift: int, key1, value1, key2, value2, h2: int):
+    # The node holding two keys that shared a slot one level up.
+    h1 = hash(key1) & HASH_MASK
+    if h1 == h2 or shift >= HASH_BITS:
+        return CollisionNode(h1, [(key1, value1), (key2, value2)])
+    node = BitmapNode(0, [])
+    added = [False]
+    node = insert(node, shift, h1, key1, value1, added)
+    return insert(node, shift, h2, key2, value2, added)
+
+
+def node_items(node):
+    if type(node) is CollisionNode:
+        yield from node.entries
+        return
+    for key, value in node.entries:
+        if key is UNSET:
+            yield from node_items(value)
+        else:
+            yield key, value
@@ -0,0 +1,142 @@
+import operator
+
+from . import ast
+from . import objects
+from .environment import Environment
+from .evaluator import Evaluator, TRUE, FALSE
+
+Integer = objects.Integer
+Error = objects.Error
+
+
+class IntArithmetic(ast.InfixExpression):
+    # Specialized in place for two Integer operands; `op` is set per subclass.
+    op = None
+
+
+class IntAdd(IntArithmetic):
+    op = operator.add
+
+
+class IntSub(IntArithmetic):
+    op = operator.sub
+
+
+class IntMul(IntArithmetic):
+    op = operator.mul
+
+
+class IntDiv(IntArithmetic):
+    op = operator.floordiv
+
+
+class IntComparison(ast.InfixExpression):
+    op = None
+
+
+class IntLessThan(IntComparison):
+    op = operator.lt
+
+
+class IntGreaterThan(IntComparison):
+    op = operator.gt
+
+
+class IntEqual(IntComparison):
+    op = operator.eq
+
+
+class IntNotEqual(IntComparison):
+    op = operator.ne
+
+
+class GenericInfixExpression(ast.InfixExpression):
+    # Final state of a site whose operand types varied: never specialized again.
+    pass
+
+
+INTEGER_SPECIALIZATIONS = {
+    '+': IntAdd,
+    '-': IntSub,
+    '*': IntMul,
+    '/': IntDiv,
+    '<': IntLessThan,
+    '>': IntGreaterThan,
+    '==': IntEqual,
+    '!=': IntNotEqual,
+}
+
+
+class QuickeningEvaluator(Evaluator):
+    """Evaluator whose infix nodes rewrite their own class from type feedback.
+
+    An InfixExpression starts uninitialized. The first time it sees two
+    Integers it becomes the matching Int* node, whose handler skips the type()
+    checks and operator comparison behind a guard. If the guard fails the
+    node deoptimizes to GenericInfixExpression and stays there. `specialized`
+    and `deoptimized` count those rewrites.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.specialized = 0
+        self.deoptimized = 0
+
+        self.handlers[ast.InfixExpression] = self.eval_uninitialized_infix
+        self.handlers[GenericInfixExpression] = self.eval_infix_node
+        for cls in INTEGER_SPECIALIZATIONS.values():
+            if issubclass(cls, IntArithmetic):
+                self.handlers[cls] = self.eval_int_arithmetic
+            else:
+                self.handlers[cls] = self.eval_int_comparison
+
+    def eval_uninitialized_infix(self, node: ast.InfixExpression, env: Environment) -> objects.Object:
+        left = self.handlers[type(node.left)](node.left, env)
+        if self.is_error(left):
+            return left
+
+        right = self.handlers[type(node.right)](node.right, env)
+        if self.is_error(right):
+            return right
+
+        if type(left) is Integer and type(right) is Integer and node.operator in INTEGER_SPECIALIZATIONS:
+            node.__class__ = INTEGER_SPECIALIZATIONS[node.operator]
+            self.specialized += 1
+        else:
+            node.__class__ = GenericInfixExpression
+        return self.eval_infix_expression(node.operator, left, right)
+
+    def eval_int_arithmetic(self, node: IntArithmetic, env: Environment) -> objects.Object:
+        left = self.handlers[type(node.left)](node.left, env)
+        if type(left) is Integer:
+            right = self.handlers[type(node.right)](node.right, env)
+            if type(right) is Integer:
+                try:
+                    return Integer(node.op(left.value, right.value))
+                except ZeroDivisionError:
+                    # An error, which leaves the node specialized.
+                    return self.eval_infix_expression(node.operator, left, right)
+            return self.deoptimize(node, env, left, right)
+        return self.deoptimize(node, env, left)
+
+    def eval_int_comparison(self, node: IntComparison, env: Environment) -> objects.Object:
+        left = self.handlers[type(node.left)](node.left, env)
+        if type(left) is Integer:
+            right = self.handlers[type(node.right)](node.right, env)
+            if type(right) is Integer:
+                return TRUE if node.op(left.value, right.value) else FALSE
+            return self.deoptimize(node, env, left, right)
+        return self.deoptimize(node, env, left)
+
+    def deoptimize(self, node: ast.InfixExpression, env: Environment, left: objects.Object, right: objects.Object = None) -> objects.Object:
+        # Errors abort the program anyway, so they leave the node specialized.
+        if self.is_error(left):
+            return left
+        if right is None:
+            right = self.handlers[type(node.right)](node.right, env)
+        if self.is_error(right):
+            return right
+
+        node.__class__ = GenericInfixExpression
+        self.deoptimized += 1
+        return self.eval_infix_expression(node.operator, left, right)
@@ -0,0 +1,171 @@
+from . import ast
+from . import objects
+from .builtins import builtins
+from .compiler import let_names
+from .environment import Frame
+from .evaluator import Evaluator, new_error
+
+
+class Scope:
+    def __init__(self, outer: "Scope" = None) -> None:
+        self.outer = outer
+        self.slots: dict[str, int] = {}
+        self.names: list[str] = []
+
+    def define(self, name: str) -> int:
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.slots[name] = slot
+            self.names.append(name)
+        return slot
+
+
+class Resolver:
+    """Assigns every Identifier a (depth, slot) address before evaluation.
+
+    Each function gets one frame holding its parameters and every name it
+    binds with `let` (blocks share the function's frame, as they share its
+    Environment). Names bound nowhere resolve to a global slot that is checked
+    when read, so functions may refer to globals defined after them; builtins
+    are only used while that slot is empty, so a later global shadows them.
+    """
+
+    def __init__(self, global_scope: Scope) -> None:
+        self.global_scope = global_scope
+        self.scope = global_scope
+
+    def resolve_program(self, program: ast.Program) -> None:
+        for statement in program.statements:
+            for name in let_names(statement):
+                self.global_scope.define(name)
+
+        for statement in program.statements:
+            self.resolve(statement)
+
+    def resolve(self, node: ast.Node) -> None:
+        if isinstance(node, ast.Identifier):
+            self.resolve_identifier(node)
+        elif isinstance(node, ast.ExpressionStatement):
+            self.resolve(node.expression)
+        elif isinstance(node, ast.InfixExpression):
+            self.resolve(node.left)
+            self.resolve(node.right)
+        elif isinstance(node, ast.CallExpression):
+            self.resolve(node.function)
+            for arg in node.arguments:
+                self.resolve(arg)
+        elif isinstance(node, ast.IfExpression):
+            self.resolve(node.condition)
+            self.resolve(node.consequence)
+            if node.alternative:
+                self.resolve(node.alternative)
+        elif isinstance(node, ast.BlockStatement):
+            for statement in node.statements:
+                self.resolve(statement)
+        elif isinstance(node, ast.LetStatement):
+            self.resolve(node.value)
+            node.name.depth = 0
+            node.name.slot = self.scope.define(node.name.value)
+        elif isinstance(node, ast.ReturnStatement):
+            self.resolve(node.return_value)
+        elif isinstance(node, ast.PrefixExpression):
+            self.resolve(node.right)
+        elif isinstance(node, ast.FunctionLiteral):
+            self.resolve_function_literal(node)
+        elif isinstance(node, ast.ArrayLiteral):
+            for element in node.elements:
+                self.resolve(element)
+        elif isinstance(node, ast.IndexExpression):
+            self.resolve(node.left)
+            self.resolve(node.index)
+        elif isinstance(node, ast.HashLiteral):
+            for key, value in node.pairs:
+                self.resolve(key)
+                self.resolve(value)
+
+    def resolve_function_literal(self, node: ast.FunctionLiteral) -> None:
+        scope = Scope(self.scope)
+        for param in node.parameters:
+            param.depth = 0
+            param.slot = scope.define(param.value)
+        for name in let_names(node.body):
+            scope.define(name)
+        node.scope = scope
+
+        self.scope = scope
+        try:
+            self.resolve(node.body)
+        finally:
+            self.scope = scope.outer
+
+    def resolve_identifier(self, node: ast.Identifier) -> None:
+        name = node.value
+        depth = 0
+        scope = self.scope
+        while scope is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                node.depth, node.slot, node.builtin = depth, slot, None
+                return
+            scope = scope.outer
+            depth += 1
+
+        node.depth, node.slot, node.builtin = depth - 1, self.global_scope.define(name), builtins.get(name)
+
+
+class ResolvedFunction(objects.Function):
+    def __init__(self, parameters: "list[ast.Identifier]", body: ast.BlockStatement, env: Frame, scope: Scope) -> None:
+        super().__init__(parameters, body, env)
+        self.scope = scope
+
+
+class ResolvedEvaluator(Evaluator):
+    """Evaluator over Frames: identifiers are read by lexical address."""
+
+    def eval_program(self, program: ast.Program, frame: Frame) -> objects.Object:
+        Resolver(frame.scope).resolve_program(program)
+        if len(frame.slots) < len(frame.scope.names):
+            frame.slots.extend([None] * (len(frame.scope.names) - len(frame.slots)))
+        return super().eval_program(program, frame)
+
+    def eval_let_statement(self, node: ast.LetStatement, frame: Frame) -> objects.Object:
+        val = self.handlers[type(node.value)](node.value, frame)
+        if self.is_error(val):
+            return val
+        frame.slots[node.name.slot] = val
+
+    def eval_identifier(self, node: ast.Identifier, frame: Frame) -> objects.Object:
+        depth = node.depth
+        while depth:
+            frame = frame.outer
+            depth -= 1
+        val = frame.slots[node.slot]
+        if val is not None:
+            return val
+        if node.builtin:
+            return node.builtin
+
+        # Not bound yet in the frame it resolved to; fall back to the dynamic
+        # Environment semantics and keep searching outwards by name.
+        val = frame.outer.lookup(node.value) if frame.outer else None
+        if val is not None:
+            return val
+        builtin = builtins.get(node.value)
+        if builtin:
+            return builtin
+        return new_error(f"Identifier not found: {node.value}")
+
+    def eval_function_literal(self, node: ast.FunctionLiteral, frame: Frame) -> objects.Object:
+        return ResolvedFunction(node.parameters, node.body, frame, node.scope)
+
+    def binding_plan(self, fn: ResolvedFunction) -> int:
+        # Parameters take the first slots; the rest hold the body's lets.
+        return len(fn.scope.names) - len(fn.parameters)
+
+    def bind_arguments(self, fn: ResolvedFunction, plan: int, args: "list[objects.Object]") -> Frame:
+        return Frame(fn.scope, args + [None] * plan, fn.env)
+
+
+def new_global_frame() -> Frame:
+    return Frame(Scope())
@@ -0,0 +1,327 @@
+from . import ast
+from . import objects
+from .environment import Environment
+from .evaluator import Evaluator, TRUE, FALSE, NULL, arity_error, new_error, recursion_error
+
+
+DEFAULT_MAX_DEPTH = 10000
+
+# Continuations kept on the explicit stack.
+EVAL = 0
+PROGRAM = 1
+BLOCK = 2
+PREFIX = 3
+INFIX_LEFT = 4
+INFIX_RIGHT = 5
+IF = 6
+RETURN = 7
+LET = 8
+CALL_FUNCTION = 9
+CALL_ARGUMENT = 10
+CALL_RETURN = 11
+ARRAY = 12
+INDEX_LEFT = 13
+INDEX = 14
+HASH = 15
+
+Error = objects.Error
+ReturnValue = objects.ReturnValue
+
+
+class StackEvaluator(Evaluator):
+    """Evaluator that keeps its continuations and values in lists on the heap.
+
+    Evaluation never recurses in Python, so deep Monkey recursion is bounded
+    only by max_depth, which yields a Monkey error rather than RecursionError.
+    A call whose continuation is the return of the enclosing call reuses that
+    return, so tail calls do not count towards max_depth. Functions that map
+    and filter call back run on a stack of their own, counting on from the
+    depth of the call to the builtin.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        super().__init__()
+        self.max_depth = max_depth
+        self.depth = 0
+
+    def eval(self, node: ast.Node, env: Environment) -> objects.Object:
+        todo = [(EVAL, node, env)]
+        values = []
+        push = values.append
+        schedule = todo.append
+        depth = self.depth
+
+        while todo:
+            task = todo.pop()
+            kind = task[0]
+
+            if kind == EVAL:
+                node = task[1]
+                env = task[2]
+                node_type = type(node)
+
+                if node_type is ast.Identifier:
+                    push(self.eval_identifier(node, env))
+                elif node_type is ast.InfixExpression:
+                    schedule((INFIX_LEFT, node, env))
+                    schedule((EVAL, node.left, env))
+                elif node_type is ast.IntegerLiteral:
+                    push(node.obj or objects.Integer(node.value))
+                elif node_type is ast.CallExpression:
+                    schedule((CALL_FUNCTION, node, env))
+                    schedule((EVAL, node.function, env))
+                elif node_type is ast.ExpressionStatement:
+                    schedule((EVAL, node.expression, env))
+                elif node_type is ast.IfExpression:
+                    schedule((IF, node, env))
+                    schedule((EVAL, node.condition, env))
+                elif node_type is ast.BlockStatement:
+                    statements = node.statements
+                    if not statements:
+                        push(None)
+                        continue
+                    if len(statements) > 1:
+                        schedule((BLOCK, node, env, 0))
+                    schedule((EVAL, statements[0], env))
+                elif node_type is ast.ReturnStatement:
+                    # Directly before a call's return the ReturnValue would only
+                    # be unwrapped again, so it is skipped.
+                    if not todo or todo[-1][0] != CALL_RETURN:
+                        schedule((RETURN,))
+                    schedule((EVAL, node.return_value, env))
+                elif node_type is ast.LetStatement:
+                    schedule((LET, node, env))
+                    schedule((EVAL, node.value, env))
+                elif node_type is ast.PrefixExpression:
+                    schedule((PREFIX, node))
+                    schedule((EVAL, node.right, env))
+                elif node_type is ast.Boolean:
+                    push(TRUE if node.value else FALSE)
+                elif node_type is ast.StringLiteral:
+                    push(objects.String(node.value))
+                elif node_type is ast.FunctionLiteral:
+                    push(objects.Function(node.parameters, node.body, env))
+                elif node_type is ast.ArrayLiteral:
+                    if not node.elements:
+                        push(objects.Array.of([]))
+                        continue
+                    schedule((ARRAY, node, env, 0))
+                    schedule((EVAL, node.elements[0], env))
+                elif node_type is ast.IndexExpression:
+                    schedule((INDEX_LEFT, node, env))
+                    schedule((EVAL, node.left, env))
+                elif node_type is ast.HashLiteral:
+                    if not node.pairs:
+                        push(objects.Hash())
+                        continue
+                    # Keys and values are evaluated in turn, as positions
+                    # 0, 1, 2, ... of the flattened pairs.
+                    schedule((HASH, node, env, 0))
+                    schedule((EVAL, node.pairs[0][0], env))
+                elif node_type is ast.Program:
+                    if not node.statements:
+                        push(None)
+                        continue
+                    schedule((PROGRAM, node, env, 0))
+                    schedule((EVAL, node.statements[0], env))
+                elif isinstance(node, ast.InfixExpression):
+                    # A quickened infix node, in an AST the quickening
+                    # engine has run.
+                    schedule((INFIX_LEFT, node, env))
+                    schedule((EVAL, node.left, env))
+                else:
+                    push(None)
+
+            elif kind == INFIX_LEFT:
+                if type(values[-1]) is Error:
+                    continue
+                schedule((INFIX_RIGHT, task[1]))
+                schedule((EVAL, task[1].right, task[2]))
+
+            elif kind == INFIX_RIGHT:
+                right = values.pop()
+                left = values.pop()
+                if type(right) is Error:
+                    push(right)
+                else:
+                    push(self.eval_infix_expression(task[1].operator, left, right))
+
+            elif kind == CALL_RETURN:
+                depth -= 1
+                if type(values[-1]) is ReturnValue:
+                    values[-1] = values[-1].value
+
+            elif kind == IF:
+                condition = values.pop()
+                node = task[1]
+                if type(condition) is Error:
+                    push(condition)
+                elif condition is not FALSE and condition is not NULL:
+                    schedule((EVAL, node.consequence, task[2]))
+                elif node.alternative:
+                    schedule((EVAL, node.alternative, task[2]))
+                else:
+                    push(NULL)
+
+            elif kind == BLOCK:
+                result = values[-1]
+                if type(result) is ReturnValue or type(result) is Error:
+                    continue
+                statements = task[1].statements
+                index = task[3] + 1
+                values.pop()
+                if index + 1 < len(statements):
+                    schedule((BLOCK, task[1], task[2], index))
+                schedule((EVAL, statements[index], task[2]))
+
+            elif kind == CALL_FUNCTION or kind == CALL_ARGUMENT:
+                node = task[1]
+                arguments = node.arguments
+                if kind == CALL_FUNCTION:
+                    if type(values[-1]) is Error:
+                        continue
+                    index = 0
+                else:
+                    index = task[3] + 1
+                    if type(values[-1]) is Error:
+                        error = values.pop()
+                        del values[len(values) - index:]
+                        push(error)
+                        continue
+
+                if index < len(arguments):
+                    schedule((CALL_ARGUMENT, node, task[2], index))
+                    schedule((EVAL, arguments[index], task[2]))
+                    continue
+
+                num_args = len(arguments)
+                args = values[len(values) - num_args:]
+                fn = values[-1 - num_args]
+                del values[len(values) - num_args - 1:]
+
+                if type(fn) is objects.Function:
+                    if len(fn.parameters) != num_args:
+                        push(arity_error(len(fn.parameters), num_args))
+                        continue
+                    tail = todo and todo[-1][0] == CALL_RETURN
+                    if not tail:
+                        if depth >= self.max_depth:
+                            push(recursion_error())
+                            continue
+                        depth += 1
+                        schedule((CALL_RETURN,))
+                    schedule((EVAL, fn.body, self.extend_function_env(fn, args)))
+                elif type(fn) is objects.Builtin:
+                    push(self.call_builtin(fn, args, depth))
+                else:
+                    push(new_error(f"not a function: {fn.type()}"))
+
+            elif kind == PROGRAM:
+                result = values[-1]
+                if type(result) is ReturnValue:
+                    values[-1] = result.value
+                    continue
+                elif type(result) is Error:
+                    continue
+                statements = task[1].statements
+                index = task[3] + 1
+                if index < len(statements):
+                    values.pop()
+                    schedule((PROGRAM, task[1], task[2], index))
+                    schedule((EVAL, statements[index], task[2]))
+
+            elif kind == RETURN:
+                if type(values[-1]) is not Error:
+                    values[-1] = ReturnValue(values[-1])
+
+            elif kind == LET:
+                value = values.pop()
+                if type(value) is Error:
+                    push(value)
+                else:
+                    task[2].set(task[1].name.value, value)
+                    push(None)
+
+            elif kind == ARRAY:
+                elements = task[1].elements
+                index = task[3]
+                if type(values[-1]) is Error:
+                    error = values.pop()
+                    del values[len(values) - index:]
+                    push(error)
+                elif index + 1 < len(elements):
+                    schedule((ARRAY, task[1], task[2], index + 1))
+                    schedule((EVAL, elements[index + 1], task[2]))
+                else:
+                    evaluated = values[len(values) - len(elements):]
+                    del values[len(values) - len(elements):]
+                    push(objects.Array.of(evaluated))
+
+            elif kind == INDEX_LEFT:
+                if type(values[-1]) is Error:
+                    continue
+                schedule((INDEX,))
+                schedule((EVAL, task[1].index, task[2]))
+
+            elif kind == INDEX:
+                index = values.pop()
+                left = values.pop()
+                if type(index) is Error:
+                    push(index)
+                else:
+                    push(self.eval_index_expression(left, index))
+
+            elif kind == HASH:
+                pairs = task[1].pairs
+                position = task[3]
+                value = values[-1]
+                if type(value) is Error or (position % 2 == 0 and not hasattr(value, "hash_key")):
+                    values.pop()
+                    del values[len(values) - position:]
+                    push(value if type(value) is Error else new_error(f"unusable as hash key: {value.type()}"))
+                elif position + 1 < 2 * len(pairs):
+                    position += 1
+                    schedule((HASH, task[1], task[2], position))
+                    schedule((EVAL, pairs[position // 2][position % 2], task[2]))
+                else:
+                    evaluated = values[len(values) - position - 1:]
+                    del values[len(values) - position - 1:]
+                    push(objects.Hash.of(zip(evaluated[::2], evaluated[1::2])))
+
+            elif kind == PREFIX:
+                right = values.pop()
+                if type(right) is Error:
+                    push(right)
+                else:
+                    push(self.eval_prefix_expression(task[1].operator, right))
+
+        return values.pop()
+
+    def call_builtin(self, fn: objects.Builtin, args: "list[objects.Object]", depth: int) -> objects.Object:
+        outer_depth, self.depth = self.depth, depth
+        try:
+            if fn.higher_order:
+                return fn._fn(*args, apply=self.apply)
+            return fn._fn(*args)
+        except RecursionError:
+            # Builtins nested in the functions they call back still recurse
+            # in Python.
+            return recursion_error()
+        finally:
+            self.depth = outer_depth
+
+    def apply(self, fn: objects.Object, args: "list[objects.Object]") -> objects.Object:
+        if type(fn) is objects.Function:
+            if len(fn.parameters) != len(args):
+                return arity_error(len(fn.parameters), len(args))
+            if self.depth >= self.max_depth:
+                return recursion_error()
+            self.depth += 1
+            try:
+                evaluated = self.eval(fn.body, self.extend_function_env(fn, args))
+            finally:
+                self.depth -= 1
+            return evaluated.value if type(evaluated) is ReturnValue else evaluated
+        elif type(fn) is objects.Builtin:
+            return self.call_builtin(fn, args, self.depth)
+        return new_error(f"not a function: {fn.type()}")
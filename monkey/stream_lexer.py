@@ -0,0 +1,79 @@
+import mmap
+import re
+
+from .lexer import EOF_TOKEN, WORD_PATTERN, classify
+from .token import Token
+
+
+# Bytes read from a file object at a time.
+CHUNK_SIZE = 1 << 16
+
+# WORD_PATTERN over UTF-8: a multi-byte character is one (illegal) word,
+# and '"' never occurs inside one, so strings are found as in text.
+WORD_BYTES = re.compile(rb'[A-Za-z_]+|[0-9]+|"[^"]*"?|==|!=|[\xc0-\xff][\x80-\xbf]*|[^ \t\n\r\x0b\x0c]')
+
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+# Distinct words a stream keeps Tokens for before starting over, which
+# bounds the cache however large the input is.
+CACHE_LIMIT = 4096
+
+
+class WordCache(dict):
+    """Maps the text of a word, str or UTF-8 bytes, to its Token; like
+    lexer.TokenCache, but emptied whenever it reaches CACHE_LIMIT."""
+
+    def __missing__(self, word) -> Token:
+        if len(self) >= CACHE_LIMIT:
+            self.clear()
+        token = self[word] = classify(word if type(word) is str else str(word, "utf-8", "replace"))
+        return token
+
+
+def stream_tokens(source, chunk_size: int = CHUNK_SIZE):
+    """Yields the tokens of source, ending with EOF, as Lexer would.
+
+    source is a str, a UTF-8 buffer (bytes, bytearray, memoryview or mmap)
+    or a file object opened in text or binary mode. Buffers are scanned in
+    place by the regex, so the input is never copied; only each word is, to
+    be decoded. Files are read chunk_size at a time. The last word of a
+    chunk may continue in the next one, so it is held back and scanned
+    again with the following chunk. Memory stays bounded by the chunk size
+    plus the longest token.
+    """
+    cache = WordCache()
+    if isinstance(source, (str,) + BUFFER_TYPES):
+        yield from map(cache.__getitem__, words_in(source))
+    else:
+        pending = source.read(chunk_size)
+        while pending:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                yield from map(cache.__getitem__, words_in(pending))
+                break
+            matches = list(pattern_for(pending).finditer(pending))
+            held = len(pending)
+            if matches and matches[-1].end() == held:
+                held = matches.pop().start()
+            yield from map(cache.__getitem__, map(re.Match.group, matches))
+            pending = pending[held:] + chunk
+    yield EOF_TOKEN
+
+
+def pattern_for(text) -> re.Pattern:
+    return WORD_PATTERN if isinstance(text, str) else WORD_BYTES
+
+
+def words_in(text):
+    return map(re.Match.group, pattern_for(text).finditer(text))
+
+
+class StreamLexer:
+    """The Lexer interface over stream_tokens, for a Parser reading a file,
+    mmap or buffer."""
+
+    def __init__(self, source, chunk_size: int = CHUNK_SIZE):
+        self._tokens = stream_tokens(source, chunk_size)
+
+    def next_token(self) -> Token:
+        return next(self._tokens, EOF_TOKEN)
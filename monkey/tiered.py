@@ -0,0 +1,128 @@
+import time
+
+from . import ast
+from . import objects
+from .codegen import GenerateError, PythonGenerator, runtime_namespace
+from .environment import Environment
+from .evaluator import Evaluator
+
+
+DEFAULT_THRESHOLD = 50
+
+
+class TierStats:
+    """Calls and self time of one function literal in each tier."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.promoted_after = None
+        self.interpreted_calls = 0
+        self.compiled_calls = 0
+        self.interpreted_time = 0.0
+        self.compiled_time = 0.0
+
+    @property
+    def speedup(self) -> float:
+        # Mean self time per call interpreted over compiled; None until both
+        # tiers have been timed.
+        if not (self.interpreted_time and self.compiled_time):
+            return None
+        return (self.interpreted_time / self.interpreted_calls) / (self.compiled_time / self.compiled_calls)
+
+
+class TieredEvaluator(Evaluator):
+    """Evaluator that moves hot functions to generated Python code.
+
+    Calls are counted per function literal, so closures made by the same
+    literal share a count and its code. Once a literal has been called
+    `threshold` times its body is translated by monkey.codegen, compiled, and
+    used for every later call; cold code stays in the tree walker. With
+    profile=True each call's self time is recorded for report().
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, tiering: bool = True, profile: bool = False) -> None:
+        super().__init__()
+        self.threshold = threshold
+        self.tiering = tiering
+        self.profile = profile
+        self.calls: "dict[ast.BlockStatement, int]" = {}
+        self.compiled: "dict[ast.BlockStatement, object]" = {}
+        self.stats: "dict[ast.BlockStatement, TierStats]" = {}
+        self.child_time = 0.0
+
+    def call_function(self, fn: objects.Function, plan, args: "list[objects.Object]") -> objects.Object:
+        if not self.profile:
+            code = self.code_for(fn)
+            if code is None:
+                return super().call_function(fn, plan, args)
+            return code(fn.env, *args)
+
+        start = time.perf_counter()
+        outer_child_time, self.child_time = self.child_time, 0.0
+        code = self.code_for(fn)
+        if code is None:
+            result = super().call_function(fn, plan, args)
+        else:
+            result = code(fn.env, *args)
+        elapsed = time.perf_counter() - start
+
+        stats = self.stats_for(fn)
+        if code is None:
+            stats.interpreted_calls += 1
+            stats.interpreted_time += elapsed - self.child_time
+        else:
+            stats.compiled_calls += 1
+            stats.compiled_time += elapsed - self.child_time
+        self.child_time = outer_child_time + elapsed
+        return result
+
+    def code_for(self, fn: objects.Function):
+        body = fn.body
+        code = self.compiled.get(body)
+        if code is not None or not self.tiering or body in self.compiled:
+            return code
+
+        calls = self.calls[body] = self.calls.get(body, 0) + 1
+        if calls < self.threshold:
+            return None
+        code = self.compiled[body] = self.promote(fn)
+        return code
+
+    def promote(self, fn: objects.Function):
+        literal = ast.FunctionLiteral(None, fn.parameters, fn.body)
+        generator = PythonGenerator()
+        try:
+            generator.function(literal, "promoted")
+        except GenerateError:
+            return None
+
+        namespace = runtime_namespace(generator, self.apply_function, make_function)
+        exec(compile(generator.source(), f"<monkey {self.stats_for(fn).name}>", "exec"), namespace)
+        self.stats_for(fn).promoted_after = self.calls[fn.body]
+        return namespace["promoted"]
+
+    def stats_for(self, fn: objects.Function) -> TierStats:
+        stats = self.stats.get(fn.body)
+        if stats is None:
+            stats = self.stats[fn.body] = TierStats(function_name(fn))
+        return stats
+
+    def report(self) -> "list[TierStats]":
+        """Stats of the promoted functions, in promotion order."""
+        return [self.stats[body] for body, code in self.compiled.items() if code is not None]
+
+
+def make_function(literal: ast.FunctionLiteral, env: Environment) -> objects.Function:
+    # Closures created by promoted code start out in the tree walker.
+    return objects.Function(literal.parameters, literal.body, env)
+
+
+def function_name(fn: objects.Function) -> str:
+    # The name a `let` bound the function to, if one is in scope.
+    env = fn.env
+    while env:
+        for name, value in env.store.items():
+            if value is fn:
+                return name
+        env = env.outer
+    return f"fn({', '.join(p.value for p in fn.parameters)})"
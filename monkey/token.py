@@ -20,7 +20,10 @@ class TokenType(IntEnum):
     RPAREN=auto()
     LBRACE=auto()
     RBRACE=auto()
+    LBRACKET=auto()
+    RBRACKET=auto()
     COMMA=auto()
+    COLON=auto()
     SEMICOLON=auto()
     EOF=auto()
 
@@ -51,6 +54,8 @@ def lookup_ident(ident: str) -> TokenType:
         return TokenType.IDENT
     
 class Token:
+    __slots__ = ("_token_type", "_literal")
+
     def __init__(self, token_type: TokenType, literal: str):
         self._token_type = token_type
         self._literal = literal
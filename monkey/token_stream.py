@@ -0,0 +1,95 @@
+import itertools
+import operator
+import re
+from array import array
+from bisect import bisect_right
+
+from .lexer import EOF_TOKEN, WORD_PATTERN, TokenCache
+from .token import Token, TokenType
+
+# Matches are turned into columns this many at a time, so only one chunk of
+# Match objects is alive while a stream is built.
+CHUNK_SIZE = 4096
+
+token_type_of = operator.attrgetter("token_type")
+
+
+class TokenStream:
+    """The tokens of a source as parallel arrays: `types` (one byte per
+    token), and `starts` and `lengths`, the span of each token in `source`.
+    The last token is EOF, an empty span at the end of the source.
+
+    A token takes 9 bytes here, against a Token object and a literal
+    string per token from CharLexer. Literals are sliced from the source
+    when asked for, and a token's line and column come from a table of line
+    starts built on first use. next_token() reads the stream as a Lexer
+    would, so a Parser can be given one directly; Token objects are made
+    only then, one per distinct word.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        offset_code = 'I' if len(source) < 1 << 32 else 'q'
+        self.types = array('B')
+        self.starts = array(offset_code)
+        self.lengths = array(offset_code)
+        self._tokens = TokenCache()
+        self._line_starts = None
+        self.index = -1
+
+        matches = WORD_PATTERN.finditer(source)
+        while True:
+            chunk = list(itertools.islice(matches, CHUNK_SIZE))
+            if not chunk:
+                break
+            words = list(map(re.Match.group, chunk))
+            self.types.extend(map(token_type_of, map(self._tokens.__getitem__, words)))
+            self.starts.extend(map(re.Match.start, chunk))
+            self.lengths.extend(map(len, words))
+
+        self.types.append(TokenType.EOF)
+        self.starts.append(len(source))
+        self.lengths.append(0)
+
+        # What next_token() reads: the tokens are sliced and looked up in C
+        # through a chain of maps, and EOF is left to next()'s default.
+        ends = map(operator.add, self.starts, self.lengths)
+        texts = map(source.__getitem__, map(slice, self.starts, ends))
+        self._reader = map(self._tokens.__getitem__, itertools.islice(texts, len(self.types) - 1))
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def token_type(self, i: int) -> TokenType:
+        return TokenType(self.types[i])
+
+    def text(self, i: int) -> str:
+        # The source text of token i, quotes included for strings.
+        start = self.starts[i]
+        return self.source[start:start + self.lengths[i]]
+
+    def literal(self, i: int) -> str:
+        return self.token(i).literal
+
+    def token(self, i: int) -> Token:
+        if self.types[i] == TokenType.EOF:
+            return EOF_TOKEN
+        return self._tokens[self.text(i)]
+
+    def next_token(self) -> Token:
+        self.index += 1
+        return next(self._reader, EOF_TOKEN)
+
+    def line_column(self, i: int) -> "tuple[int, int]":
+        """1-based line and column where token i starts."""
+        if self._line_starts is None:
+            self._line_starts = array('q', [0])
+            self._line_starts.extend(match.end() for match in re.finditer("\n", self.source))
+        offset = self.starts[i]
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def location(self, back: int = 0) -> "tuple[int, int]":
+        # Line and column of the token `back` tokens before the one
+        # next_token() returned last.
+        return self.line_column(min(max(self.index - back, 0), len(self.types) - 1))
@@ -0,0 +1,147 @@
+import hashlib
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+from . import ast
+from . import objects
+from .codegen import PythonGenerator, lookup
+from .environment import Environment
+from .evaluator import Evaluator, TRUE, FALSE, NULL, arity_error, new_error, recursion_error
+from .lexer import Lexer
+from .parser import Parser
+
+
+# Part of the cache key, so modules written by an older generator are rebuilt.
+GENERATOR_VERSION = 3
+HASH_PREFIX = "# source-sha256: "
+
+Integer = objects.Integer
+String = objects.String
+Error = objects.Error
+TailCall = objects.TailCall
+infix = Evaluator().eval_infix_expression
+prefix = Evaluator().eval_prefix_expression
+
+
+class GeneratedFunction(objects.Function):
+    """A Monkey function value whose body is a def in a transpiled module."""
+
+    def __init__(self, code, names: "tuple[str]", env: Environment) -> None:
+        super().__init__([], None, env)
+        self.code = code
+        self.names = names
+
+    def inspect(self) -> str:
+        return f"fn({', '.join(self.names)}) {{ {self.code.__name__} }}"
+
+
+def make_function(code, names: "tuple[str]", env: Environment) -> GeneratedFunction:
+    return GeneratedFunction(code, names, env)
+
+
+def call(fn: objects.Object, args: "list[objects.Object]") -> objects.Object:
+    # Trampoline shared by every transpiled call: tail calls come back as
+    # TailCall and loop here.
+    while True:
+        if type(fn) is GeneratedFunction:
+            if len(args) != len(fn.names):
+                return arity_error(len(fn.names), len(args))
+            result = fn.code(fn.env, *args)
+            if type(result) is TailCall:
+                fn, args = result.fn, result.args
+                continue
+            return result
+        elif type(fn) is objects.Builtin:
+            if fn.higher_order:
+                # map and filter call back into transpiled functions.
+                return fn._fn(*args, apply=call)
+            return fn._fn(*args)
+        return new_error(f"not a function: {fn.type()}")
+
+
+class ModuleGenerator(PythonGenerator):
+    """PythonGenerator for whole programs: nested function literals become
+    module-level defs too, so the module needs no AST at run time."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.function_count = 0
+
+    def function_value(self, node: ast.FunctionLiteral) -> str:
+        self.function_count += 1
+        name = self.function(node, f"fn{self.function_count}")
+        names = tuple(p.value for p in node.parameters)
+        return f"make_function({name}, {names!r}, env)"
+
+    def module(self, program: ast.Program, origin: str, digest: str) -> str:
+        self.program(program, "main")
+        header = [
+            f"# Generated from {origin} by monkey.transpiler; do not edit.",
+            HASH_PREFIX + digest,
+            "from monkey.environment import Environment",
+            "from monkey.transpiler import (",
+            "    Integer, String, Error, TailCall, TRUE, FALSE, NULL,",
+            "    call, infix, lookup, make_function, prefix, recursion_error,",
+            ")",
+            "",
+        ]
+        header += [f"k{index} = Integer({value})" for index, value in enumerate(self.constants)]
+        # Non-tail recursion uses the Python stack, as in Evaluator, and is
+        # reported the same way when it runs out.
+        footer = [
+            "def run(env=None):",
+            "    try:",
+            "        return main(env if env is not None else Environment())",
+            "    except RecursionError:",
+            "        return recursion_error()",
+        ]
+        return "\n".join(header) + "\n\n\n" + "\n\n\n".join(self.definitions + ["\n".join(footer)]) + "\n"
+
+
+def source_digest(source: str) -> str:
+    return hashlib.sha256(f"{GENERATOR_VERSION}\n{source}".encode()).hexdigest()
+
+
+def transpile(source: str, origin: str = "<string>") -> str:
+    """Python module source implementing the Monkey program in source.
+
+    Raises SyntaxError if source does not parse, and GenerateError if it uses
+    something the generator cannot translate.
+    """
+    parser = Parser(Lexer(source))
+    program = parser.parse_program()
+    if parser.errors:
+        raise SyntaxError("\n".join(parser.errors))
+    return ModuleGenerator().module(program, origin, source_digest(source))
+
+
+def module_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}_monkey.py")
+
+
+def transpile_file(path: "str | Path") -> Path:
+    """Writes the module for a .monkey file next to it, unless the one already
+    there was generated from the same source, and returns its path."""
+    path = Path(path)
+    source = path.read_text()
+    target = module_path(path)
+
+    digest = source_digest(source)
+    if target.exists():
+        with target.open() as generated:
+            generated.readline()
+            if generated.readline().rstrip("\n") == HASH_PREFIX + digest:
+                return target
+
+    target.write_text(transpile(source, path.name))
+    return target
+
+
+def load(path: "str | Path") -> ModuleType:
+    """Transpiles a .monkey file if needed and imports the result."""
+    target = transpile_file(path)
+    spec = importlib.util.spec_from_file_location(target.stem, target)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,174 @@
+from . import ast
+from . import objects
+from .environment import Environment
+
+
+# Integer type tags, indexing TYPE_NAMES.
+INTEGER = 0
+BOOLEAN = 1
+STRING = 2
+NULL_TAG = 3
+ERROR = 4
+FUNCTION = 5
+BUILTIN = 6
+RETURN_VALUE = 7
+TAIL_CALL = 8
+ARRAY = 9
+HASH = 10
+ITERATOR = 11
+
+TYPE_NAMES = [
+    objects.INTEGER_OBJ,
+    objects.BOOLEAN_OBJ,
+    objects.STRING_OBJ,
+    objects.NULL_OBJ,
+    objects.ERROR_OBJ,
+    objects.FUNCTION_OBJ,
+    objects.BUILTIN_OBJ,
+    objects.RETURN_VALUE_OBJ,
+    objects.TAIL_CALL_OBJ,
+    objects.ARRAY_OBJ,
+    objects.HASH_OBJ,
+    objects.ITERATOR_OBJ,
+]
+
+# Strings and collections have no native form: their objects are native
+# values as they are, with boxed elements, so builtins can take and return
+# them unchanged, and strings keep the identity == compares.
+OBJECT_TAGS = {
+    objects.String: STRING,
+    objects.Array: ARRAY,
+    objects.Hash: HASH,
+    objects.Iterator: ITERATOR,
+}
+
+
+class Null:
+    __slots__ = ()
+    tag = NULL_TAG
+
+
+NULL = Null()
+
+
+class Error:
+    __slots__ = ("message",)
+    tag = ERROR
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+class Function:
+    __slots__ = ("parameters", "body", "env")
+    tag = FUNCTION
+
+    def __init__(self, parameters: "list[ast.Identifier]", body: ast.BlockStatement, env: Environment) -> None:
+        self.parameters = parameters
+        self.body = body
+        self.env = env
+
+
+class Builtin:
+    __slots__ = ("fn",)
+    tag = BUILTIN
+
+    def __init__(self, fn) -> None:
+        self.fn = fn
+
+
+class ReturnValue:
+    __slots__ = ("value",)
+    tag = RETURN_VALUE
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+
+class TailCall:
+    __slots__ = ("fn", "args")
+    tag = TAIL_CALL
+
+    def __init__(self, fn, args: list) -> None:
+        self.fn = fn
+        self.args = args
+
+
+def tag_of(value) -> int:
+    # bool is a subclass of int, so compare exact types.
+    value_type = type(value)
+    if value_type is int:
+        return INTEGER
+    elif value_type is bool:
+        return BOOLEAN
+    tag = OBJECT_TAGS.get(value_type)
+    if tag is not None:
+        return tag
+    return value.tag
+
+
+def type_of(value) -> str:
+    """Monkey type name of a native value, as objects.Object.type() returns it."""
+    return TYPE_NAMES[tag_of(value)]
+
+
+def inspect(value) -> str:
+    tag = tag_of(value)
+    if tag == INTEGER or tag == BOOLEAN:
+        return f"{value}"
+    elif tag == NULL_TAG:
+        return "null"
+    elif tag == ERROR:
+        return "ERROR: " + value.message
+    elif tag == RETURN_VALUE:
+        return inspect(value.value)
+    return box(value).inspect()
+
+
+def box(value) -> objects.Object:
+    """Wraps a native value in the objects class the other engines return."""
+    # Imported here because monkey.evaluator imports monkey.objects.
+    from .evaluator import TRUE, FALSE, NULL as NULL_OBJECT
+
+    if value is None:
+        return None
+    tag = tag_of(value)
+    if tag == INTEGER:
+        return objects.Integer(value)
+    elif tag == BOOLEAN:
+        return TRUE if value else FALSE
+    elif tag == NULL_TAG:
+        return NULL_OBJECT
+    elif tag == ERROR:
+        return objects.Error(value.message)
+    elif tag == FUNCTION:
+        return objects.Function(value.parameters, value.body, value.env)
+    elif tag == BUILTIN:
+        return objects.Builtin(lambda *args: box(value.fn(*[unbox(a) for a in args])))
+    elif tag == RETURN_VALUE:
+        return objects.ReturnValue(box(value.value))
+    elif tag == STRING or tag == ARRAY or tag == HASH or tag == ITERATOR:
+        return value
+    raise TypeError(f"cannot box {type(value).__name__}")
+
+
+def unbox(obj: objects.Object):
+    """Inverse of box: the native value for an objects.Object."""
+    if obj is None:
+        return None
+    obj_type = obj.type()
+    if obj_type == objects.INTEGER_OBJ or obj_type == objects.BOOLEAN_OBJ:
+        return obj.value
+    elif obj_type == objects.NULL_OBJ:
+        return NULL
+    elif obj_type == objects.ERROR_OBJ:
+        return Error(obj.message)
+    elif obj_type == objects.FUNCTION_OBJ:
+        return Function(obj.parameters, obj.body, obj.env)
+    elif obj_type == objects.BUILTIN_OBJ:
+        return Builtin(lambda *args: unbox(obj._fn(*[box(a) for a in args])))
+    elif obj_type == objects.RETURN_VALUE_OBJ:
+        return ReturnValue(unbox(obj.value))
+    elif obj_type == objects.STRING_OBJ or obj_type == objects.ARRAY_OBJ or obj_type == objects.HASH_OBJ or obj_type == objects.ITERATOR_OBJ:
+        return obj
+    raise TypeError(f"cannot unbox {obj_type}")
@@ -0,0 +1,309 @@
+from . import objects
+from .builtins import builtins
+from .code import Opcode, make
+from .compiler import Bytecode, BUILTIN_NAMES
+from .evaluator import Evaluator, TRUE, FALSE, NULL, division_by_zero, new_error
+
+
+CONSTANT = int(Opcode.CONSTANT)
+POP = int(Opcode.POP)
+ADD = int(Opcode.ADD)
+SUB = int(Opcode.SUB)
+MUL = int(Opcode.MUL)
+DIV = int(Opcode.DIV)
+EQUAL = int(Opcode.EQUAL)
+NOT_EQUAL = int(Opcode.NOT_EQUAL)
+GREATER_THAN = int(Opcode.GREATER_THAN)
+LESS_THAN = int(Opcode.LESS_THAN)
+MINUS = int(Opcode.MINUS)
+BANG = int(Opcode.BANG)
+OP_TRUE = int(Opcode.TRUE)
+OP_FALSE = int(Opcode.FALSE)
+OP_NULL = int(Opcode.NULL)
+JUMP_NOT_TRUTHY = int(Opcode.JUMP_NOT_TRUTHY)
+JUMP = int(Opcode.JUMP)
+GET_GLOBAL = int(Opcode.GET_GLOBAL)
+SET_GLOBAL = int(Opcode.SET_GLOBAL)
+GET_LOCAL = int(Opcode.GET_LOCAL)
+SET_LOCAL = int(Opcode.SET_LOCAL)
+GET_BUILTIN = int(Opcode.GET_BUILTIN)
+MAKE_CELL = int(Opcode.MAKE_CELL)
+GET_CELL = int(Opcode.GET_CELL)
+SET_CELL = int(Opcode.SET_CELL)
+LOAD_CELL = int(Opcode.LOAD_CELL)
+GET_FREE = int(Opcode.GET_FREE)
+LOAD_FREE = int(Opcode.LOAD_FREE)
+CLOSURE = int(Opcode.CLOSURE)
+CALL = int(Opcode.CALL)
+RETURN_VALUE = int(Opcode.RETURN_VALUE)
+RETURN = int(Opcode.RETURN)
+ARRAY = int(Opcode.ARRAY)
+HASH = int(Opcode.HASH)
+INDEX = int(Opcode.INDEX)
+STRING = int(Opcode.STRING)
+
+INFIX_OPERATORS = {
+    ADD: '+',
+    SUB: '-',
+    MUL: '*',
+    DIV: '/',
+    EQUAL: '==',
+    NOT_EQUAL: '!=',
+    GREATER_THAN: '>',
+    LESS_THAN: '<',
+}
+
+RETURN_INSTRUCTION = make(Opcode.RETURN_VALUE)
+
+BUILTINS = [builtins[name] for name in BUILTIN_NAMES]
+
+Integer = objects.Integer
+
+
+class Cell:
+    __slots__ = ('value', 'name')
+
+    def __init__(self, value: objects.Object, name: str) -> None:
+        self.value = value
+        self.name = name
+
+
+class VMError(Exception):
+    def __init__(self, error: objects.Error) -> None:
+        super().__init__(error.message)
+        self.error = error
+
+
+class VM:
+    def __init__(self, bytecode: Bytecode, globals: "list[objects.Object]" = None) -> None:
+        self.instructions = bytecode.instructions
+        self.constants = bytecode.constants
+        self.global_names = bytecode.global_names
+        self.globals = globals if globals is not None else []
+        # Operators outside the integer fast paths share Evaluator's semantics.
+        self.evaluator = Evaluator()
+
+    def run(self) -> objects.Object:
+        try:
+            return self.execute()
+        except VMError as e:
+            return e.error
+
+    def execute(self, instructions: bytes = None, stack: "list[objects.Object]" = None) -> objects.Object:
+        constants = self.constants
+        globals_ = self.globals
+        if len(globals_) < len(self.global_names):
+            globals_.extend([None] * (len(self.global_names) - len(globals_)))
+
+        stack = stack if stack is not None else []
+        push = stack.append
+        pop = stack.pop
+        frames = []
+
+        ins = instructions if instructions is not None else self.instructions
+        ip = 0
+        locals_ = []
+        free = ()
+        base = 0
+        names = self.global_names
+
+        while True:
+            op = ins[ip]
+
+            if op == GET_LOCAL:
+                value = locals_[ins[ip + 1]]
+                if value is None:
+                    raise VMError(new_error(f"Identifier not found: {names[ins[ip + 1]]}"))
+                push(value)
+                ip += 2
+            elif op == CONSTANT:
+                push(constants[(ins[ip + 1] << 8) | ins[ip + 2]])
+                ip += 3
+            elif op == GET_GLOBAL:
+                index = (ins[ip + 1] << 8) | ins[ip + 2]
+                value = globals_[index]
+                if value is None:
+                    raise VMError(new_error(f"Identifier not found: {self.global_names[index]}"))
+                push(value)
+                ip += 3
+            elif op == ADD or op == SUB or op == LESS_THAN or op == GREATER_THAN or op == EQUAL \
+                    or op == MUL or op == NOT_EQUAL or op == DIV:
+                right = pop()
+                left = pop()
+                if type(left) is Integer and type(right) is Integer:
+                    if op == ADD:
+                        push(Integer(left.value + right.value))
+                    elif op == SUB:
+                        push(Integer(left.value - right.value))
+                    elif op == LESS_THAN:
+                        push(TRUE if left.value < right.value else FALSE)
+                    elif op == GREATER_THAN:
+                        push(TRUE if left.value > right.value else FALSE)
+                    elif op == EQUAL:
+                        push(TRUE if left.value == right.value else FALSE)
+                    elif op == MUL:
+                        push(Integer(left.value * right.value))
+                    elif op == NOT_EQUAL:
+                        push(TRUE if left.value != right.value else FALSE)
+                    elif right.value:
+                        push(Integer(left.value // right.value))
+                    else:
+                        raise VMError(division_by_zero())
+                else:
+                    push(self.check(self.evaluator.eval_infix_expression(INFIX_OPERATORS[op], left, right)))
+                ip += 1
+            elif op == JUMP_NOT_TRUTHY:
+                condition = pop()
+                if condition is FALSE or condition is NULL:
+                    ip = (ins[ip + 1] << 8) | ins[ip + 2]
+                else:
+                    ip += 3
+            elif op == JUMP:
+                ip = (ins[ip + 1] << 8) | ins[ip + 2]
+            elif op == CALL:
+                num_args = ins[ip + 1]
+                ip += 2
+                fn = stack[-1 - num_args]
+                if type(fn) is objects.Closure:
+                    compiled = fn.fn
+                    if num_args != compiled.num_parameters:
+                        raise VMError(new_error(
+                            f"wrong number of arguments: want={compiled.num_parameters}, got={num_args}"))
+                    frames.append((ins, ip, locals_, free, base, names))
+                    locals_ = stack[len(stack) - num_args:]
+                    del stack[len(stack) - num_args - 1:]
+                    if compiled.num_locals > num_args:
+                        locals_.extend([None] * (compiled.num_locals - num_args))
+                    ins = compiled.instructions
+                    ip = 0
+                    free = fn.free
+                    base = len(stack)
+                    names = compiled.local_names
+                elif type(fn) is objects.Builtin:
+                    args = stack[len(stack) - num_args:]
+                    del stack[len(stack) - num_args - 1:]
+                    if fn.higher_order:
+                        push(self.check(fn._fn(*args, apply=self.apply)))
+                    else:
+                        push(self.check(fn._fn(*args)))
+                else:
+                    raise VMError(new_error(f"not a function: {fn.type()}"))
+            elif op == RETURN_VALUE:
+                value = pop()
+                if not frames:
+                    return value
+                del stack[base:]
+                ins, ip, locals_, free, base, names = frames.pop()
+                push(value)
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == SET_LOCAL:
+                locals_[ins[ip + 1]] = pop()
+                ip += 2
+            elif op == GET_FREE:
+                cell = free[ins[ip + 1]]
+                value = cell.value
+                if value is None:
+                    raise VMError(new_error(f"Identifier not found: {cell.name}"))
+                push(value)
+                ip += 2
+            elif op == GET_CELL:
+                value = locals_[ins[ip + 1]].value
+                if value is None:
+                    raise VMError(new_error(f"Identifier not found: {names[ins[ip + 1]]}"))
+                push(value)
+                ip += 2
+            elif op == SET_CELL:
+                locals_[ins[ip + 1]].value = pop()
+                ip += 2
+            elif op == OP_TRUE:
+                push(TRUE)
+                ip += 1
+            elif op == OP_FALSE:
+                push(FALSE)
+                ip += 1
+            elif op == OP_NULL:
+                push(NULL)
+                ip += 1
+            elif op == MINUS:
+                right = pop()
+                if type(right) is Integer:
+                    push(Integer(-right.value))
+                else:
+                    push(self.check(self.evaluator.eval_prefix_expression('-', right)))
+                ip += 1
+            elif op == BANG:
+                push(self.evaluator.eval_bang_operator_expression(pop()))
+                ip += 1
+            elif op == SET_GLOBAL:
+                globals_[(ins[ip + 1] << 8) | ins[ip + 2]] = pop()
+                ip += 3
+            elif op == GET_BUILTIN:
+                push(BUILTINS[ins[ip + 1]])
+                ip += 2
+            elif op == MAKE_CELL:
+                index = ins[ip + 1]
+                locals_[index] = Cell(locals_[index], names[index])
+                ip += 2
+            elif op == LOAD_CELL:
+                push(locals_[ins[ip + 1]])
+                ip += 2
+            elif op == LOAD_FREE:
+                push(free[ins[ip + 1]])
+                ip += 2
+            elif op == CLOSURE:
+                compiled = constants[(ins[ip + 1] << 8) | ins[ip + 2]]
+                num_free = ins[ip + 3]
+                if num_free:
+                    cells = tuple(stack[len(stack) - num_free:])
+                    del stack[len(stack) - num_free:]
+                else:
+                    cells = ()
+                push(objects.Closure(compiled, cells))
+                ip += 4
+            elif op == ARRAY:
+                count = (ins[ip + 1] << 8) | ins[ip + 2]
+                elements = stack[len(stack) - count:]
+                del stack[len(stack) - count:]
+                push(objects.Array.of(elements))
+                ip += 3
+            elif op == HASH:
+                count = (ins[ip + 1] << 8) | ins[ip + 2]
+                items = stack[len(stack) - count:]
+                del stack[len(stack) - count:]
+                for key in items[::2]:
+                    if not hasattr(key, "hash_key"):
+                        raise VMError(new_error(f"unusable as hash key: {key.type()}"))
+                push(objects.Hash.of(zip(items[::2], items[1::2])))
+                ip += 3
+            elif op == STRING:
+                push(objects.String(constants[(ins[ip + 1] << 8) | ins[ip + 2]].value))
+                ip += 3
+            elif op == INDEX:
+                index = pop()
+                left = pop()
+                push(self.check(self.evaluator.eval_index_expression(left, index)))
+                ip += 1
+            elif op == RETURN:
+                if not frames:
+                    return None
+                del stack[base:]
+                ins, ip, locals_, free, base, names = frames.pop()
+                push(NULL)
+            else:
+                raise ValueError(f"unknown opcode {op} at {ip}")
+
+    def apply(self, fn: objects.Object, args: "list[objects.Object]") -> objects.Object:
+        # How map and filter call back into compiled code: a nested run of
+        # CALL with fn and args already on its stack. Errors come back as
+        # Error objects.
+        try:
+            return self.execute(make(Opcode.CALL, len(args)) + RETURN_INSTRUCTION, [fn, *args])
+        except VMError as e:
+            return e.error
+
+    def check(self, obj: objects.Object) -> objects.Object:
+        if type(obj) is objects.Error:
+            raise VMError(obj)
+        return obj
@@ -0,0 +1,74 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey import values
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.native_evaluator import NativeEvaluator
+from monkey.objects import Object, String
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class NativeEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case through the unboxed evaluator.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        return values.box(NativeEvaluator().eval(parse(input), Environment()))
+
+
+class NativeEvaluatorTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "1 == true",
+            "let f = fn() { 1 }; f == f",
+            "let zero = 0; let f = fn(zero) { zero }; f(zero)",
+            '"" == ""',
+            'let s = "a"; s == s',
+            'let s = "a"; [s][0] == s',
+            'let s = "a"; s + "" == s',
+            '{"a": 1}["a"]',
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("native").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_values_are_unboxed(self):
+        env = Environment()
+        NativeEvaluator().eval(parse('let a = 1 + 2; let b = a < 4; let c = "x" + "y"; let d = if (false) { 1 };'), env)
+
+        assert type(env.get("a")) is int
+        assert env.get("b") is True
+        assert type(env.get("c")) is String and env.get("c").value == "xy"
+        assert env.get("d") is values.NULL
+
+    def test_type_tags(self):
+        tests = [
+            (5, values.INTEGER, "INTEGER", "5"),
+            (True, values.BOOLEAN, "BOOLEAN", "True"),
+            (String("hi"), values.STRING, "STRING", "hi"),
+            (values.NULL, values.NULL_TAG, "NULL", "null"),
+            (values.Error("boom"), values.ERROR, "ERROR", "ERROR: boom"),
+        ]
+
+        for value, tag, name, inspected in tests:
+            assert values.tag_of(value) == tag
+            assert values.type_of(value) == name
+            assert values.inspect(value) == inspected
+            assert values.box(value).inspect() == inspected
+            assert values.inspect(values.unbox(values.box(value))) == inspected
+
+    def test_builtins_are_adapted(self):
+        assert Interpreter("native").run('len("four")').value == 4
+        assert Interpreter("native").run("len(1)").message == "argument to 'len' is not supported, got INTEGER"
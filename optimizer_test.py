@@ -0,0 +1,89 @@
+import unittest
+
+from monkey import ast
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import ENGINES, Interpreter
+from monkey.lexer import Lexer
+from monkey.optimizer import Optimizer
+from monkey.parser import Parser
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+def optimize(input: str):
+    optimizer = Optimizer()
+    return optimizer.optimize_program(parse(input)), optimizer
+
+
+class OptimizerTest(unittest.TestCase):
+    def test_constant_folding(self):
+        tests = [
+            ("2 * 60 * 60", ast.IntegerLiteral, 7200),
+            ("-(5 + 10)", ast.IntegerLiteral, -15),
+            ("7 / 2", ast.IntegerLiteral, 3),
+            ("1 < 2", ast.Boolean, True),
+            ("!(1 == 2)", ast.Boolean, True),
+            ("!5", ast.Boolean, False),
+            ("true != false", ast.Boolean, True),
+            ('"a" + "b" + "c"', ast.StringLiteral, "abc"),
+        ]
+
+        for input, node_type, value in tests:
+            program, _ = optimize(input)
+            folded = program.statements[0].expression
+            assert type(folded) is node_type, input
+            assert folded.value == value, input
+
+    def test_errors_are_not_folded(self):
+        for input in ["5 + true", "-true", '"a" - "b"', "1 / 0", '"a" == "a"']:
+            program, optimizer = optimize(input)
+
+            assert type(program.statements[0].expression) in (ast.InfixExpression, ast.PrefixExpression), input
+            assert optimizer.removed == 0, input
+
+    def test_dead_branches(self):
+        program, optimizer = optimize("if (1 > 2) { 10 } else { 20 }; if (true) { 1 } else { 2 + 3 }; if (false) { 1 }")
+        first, second, third = [s.expression for s in program.statements]
+
+        assert first.condition.value is True and first.alternative is None
+        assert str(first.consequence) == "20"
+        assert second.alternative is None
+        assert third.consequence.statements == []
+        # Folding 1 > 2 and 2 + 3 removes two nodes each; dropping { 10 } and
+        # { 5 } removes three each; emptying { 1 } removes two.
+        assert optimizer.removed == 2 + 3 + 2 + 3 + 2
+
+    def test_literals_are_cached(self):
+        program, _ = optimize("let f = fn(x) { x + 1 }")
+        literal = program.statements[0].value.body.statements[0].expression.right
+        evaluator = Evaluator()
+
+        assert evaluator.eval(literal, Environment()) is literal.obj
+
+    def test_preserves_results(self):
+        programs = PROGRAMS + [
+            "let seconds = fn(h) { h * 60 * 60 }; seconds(2 * 3)",
+            "if (1 < 2) { 10 } else { 5 + true }",
+            "if (1 > 2) { 5 + true } else { -(3 * 4) }",
+            "let f = fn(n) { if (false) { 1 } else { if (n == 0) { 0 } else { f(n - 1) } } }; f(50)",
+            "if (!false) { }",
+        ]
+
+        for engine in ENGINES:
+            for input in programs:
+                expected = Interpreter(engine).run(input)
+                actual = Interpreter(engine, optimize=True).run(input)
+
+                assert (actual and actual.inspect()) == (expected and expected.inspect()), (engine, input)
+
+    def test_interpreter_reports_removed_nodes(self):
+        interpreter = Interpreter("eval", optimize=True)
+        interpreter.run("let day = 24 * 60 * 60;")
+        interpreter.run("day / (60 * 60)")
+
+        assert interpreter.optimizer.removed == 4 + 2
+        assert interpreter.run("day").value == 86400
@@ -191,6 +191,14 @@ class ParserTest(unittest.TestCase):
                 "add(a + b + c * d / f + g)",
                 "add((((a + b) + ((c * d) / f)) + g))",
             ),
+            (
+                "a * [1, 2, 3, 4][b * c] * d",
+                "((a * ([1, 2, 3, 4][(b * c)])) * d)",
+            ),
+            (
+                "add(a * b[2], b[1], 2 * [1, 2][1])",
+                "add((a * (b[2])), (b[1]), (2 * ([1, 2][1])))",
+            ),
         ]
 
         for test in infix_tests:
@@ -262,6 +270,49 @@ class ParserTest(unittest.TestCase):
         literal: AST.StringLiteral = stmt.expression
         assert literal.value == "hello world"
 
+    def test_array_literal_parsing(self):
+        input = '[1, 2 * 2, 3 + 3]'
+
+        l = Lexer(input)
+        p = Parser(l)
+        program = p.parse_program()
+
+        array: AST.ArrayLiteral = program.statements[0].expression
+        assert len(array.elements) == 3
+        self.test_integer_literal(array.elements[0], 1)
+        self.test_infix_expression(array.elements[1], 2, "*", 2)
+        self.test_infix_expression(array.elements[2], 3, "+", 3)
+
+        program = Parser(Lexer('[]')).parse_program()
+        assert program.statements[0].expression.elements == []
+
+    def test_index_expression_parsing(self):
+        input = 'myArray[1 + 1]'
+
+        l = Lexer(input)
+        p = Parser(l)
+        program = p.parse_program()
+
+        exp: AST.IndexExpression = program.statements[0].expression
+        self.test_identifier(exp.left, "myArray")
+        self.test_infix_expression(exp.index, 1, "+", 1)
+
+    def test_hash_literal_parsing(self):
+        input = '{"one": 1, "two": 2, "three": 0 + 3}'
+
+        l = Lexer(input)
+        p = Parser(l)
+        program = p.parse_program()
+
+        hash: AST.HashLiteral = program.statements[0].expression
+        assert [str(key) for key, _ in hash.pairs] == ["one", "two", "three"]
+        self.test_integer_literal(hash.pairs[0][1], 1)
+        self.test_integer_literal(hash.pairs[1][1], 2)
+        self.test_infix_expression(hash.pairs[2][1], 0, "+", 3)
+
+        program = Parser(Lexer('{}')).parse_program()
+        assert program.statements[0].expression.pairs == []
+
     @pytest.mark.skip(reason="Don't test helper function")
     def test_integer_literal(self, exp: AST.Expression, value: int):
         integer: AST.IntegerLiteral = exp
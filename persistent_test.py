@@ -0,0 +1,116 @@
+import random
+import unittest
+
+from monkey.persistent import EMPTY_MAP, EMPTY_VECTOR, PersistentVector
+
+
+class Colliding:
+    # A key whose hash is shared with every other key of the same bucket.
+    def __init__(self, name: str, bucket: int) -> None:
+        self.name = name
+        self.bucket = bucket
+
+    def __hash__(self) -> int:
+        return self.bucket
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Colliding) and self.name == other.name
+
+
+class PersistentVectorTest(unittest.TestCase):
+    def test_append_keeps_old_versions(self):
+        versions = [EMPTY_VECTOR]
+        for i in range(40000):
+            versions.append(versions[-1].append(i))
+
+        for n in [0, 1, 31, 32, 33, 1024, 1056, 32 * 32 * 32 + 33, 40000]:
+            assert len(versions[n]) == n
+            assert list(versions[n]) == list(range(n)), n
+
+    def test_from_iterable_matches_appends(self):
+        for n in [0, 1, 32, 33, 64, 65, 1025, 32 * 32 * 32 + 1, 40000]:
+            built = PersistentVector.from_iterable(range(n))
+            appended = EMPTY_VECTOR
+            for i in range(n):
+                appended = appended.append(i)
+
+            assert (built.count, built.shift) == (appended.count, appended.shift), n
+            assert list(built) == list(appended), n
+            assert [built[i] for i in range(n)] == list(range(n)), n
+            assert built.append("x")[n] == "x"
+
+    def test_set_copies_one_path(self):
+        items = list(range(5000))
+        vector = PersistentVector.from_iterable(items)
+        rng = random.Random(1)
+        for _ in range(500):
+            i = rng.randrange(len(items))
+            updated = vector.set(i, -i)
+            assert updated[i] == -i and vector[i] == items[i]
+            if i < len(items) - len(vector.tail):
+                # Subtrees off the changed path are shared, not copied.
+                slot = (i >> vector.shift) & 31
+                shared = [a is b for a, b in zip(updated.root, vector.root)]
+                assert shared == [k != slot for k in range(len(shared))]
+            items[i] = -i
+            vector = updated
+        assert list(vector) == items
+
+    def test_rest_drops_the_first_item(self):
+        for n in [1, 2, 33, 65, 1057]:
+            vector = PersistentVector.from_iterable(range(n))
+            items = list(range(n))
+            while items:
+                assert len(vector) == len(items)
+                assert list(vector) == items, n
+                assert [vector[i] for i in range(len(items))] == items, n
+                assert list(vector.append("x")) == items + ["x"], n
+                assert vector.set(len(items) - 1, "y")[len(items) - 1] == "y", n
+                vector = vector.rest()
+                items = items[1:]
+            assert len(vector) == 0 and list(vector) == []
+
+    def test_index_errors(self):
+        vector = PersistentVector.from_iterable(range(3))
+        for index in [-1, 3]:
+            with self.assertRaises(IndexError):
+                vector[index]
+            with self.assertRaises(IndexError):
+                vector.set(index, 0)
+
+
+class PersistentMapTest(unittest.TestCase):
+    def test_matches_dict(self):
+        rng = random.Random(2)
+        expected = {}
+        hamt = EMPTY_MAP
+        for _ in range(20000):
+            key = rng.randrange(5000)
+            assert hamt.get(key) == expected.get(key)
+            hamt = hamt.set(key, key * 2 + len(expected))
+            expected[key] = key * 2 + len(expected)
+
+        assert len(hamt) == len(expected)
+        assert dict(hamt.items()) == expected
+        assert all(hamt.get(key) == value for key, value in expected.items())
+        assert hamt.get(-1) is None and -1 not in hamt
+
+    def test_old_versions_are_unchanged(self):
+        small = EMPTY_MAP.set("a", 1).set("b", 2)
+        large = small.set("a", 10).set("c", 3)
+
+        assert dict(small.items()) == {"a": 1, "b": 2}
+        assert dict(large.items()) == {"a": 10, "b": 2, "c": 3}
+
+    def test_hash_collisions(self):
+        keys = [Colliding(f"k{i}", i % 3) for i in range(30)]
+        hamt = EMPTY_MAP
+        for i, key in enumerate(keys):
+            hamt = hamt.set(key, i)
+        hamt = hamt.set(Colliding("k4", 1), "again")
+
+        assert len(hamt) == 30
+        assert hamt.get(Colliding("k4", 1)) == "again"
+        assert hamt.get(Colliding("k5", 2)) == 5
+        assert hamt.get(Colliding("k5", 0)) is None
+        assert hamt.get(Colliding("k99", 0)) is None
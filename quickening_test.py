@@ -0,0 +1,75 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import ENGINES, Interpreter
+from monkey.lexer import Lexer
+from monkey.objects import Object
+from monkey.parser import Parser
+from monkey.quickening import GenericInfixExpression, IntAdd, IntLessThan, QuickeningEvaluator
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class QuickEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case through the self-specializing evaluator.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        return QuickeningEvaluator().eval(parse(input), Environment())
+
+
+class QuickeningTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        for input in PROGRAMS:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("quick").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_integer_sites_specialize(self):
+        program = parse("let f = fn(x) { if (x < 10) { x + 1 } else { x } }; f(1) + f(20)")
+        evaluator = QuickeningEvaluator()
+        evaluated = evaluator.eval(program, Environment())
+
+        body = program.statements[0].value.body.statements[0].expression
+        assert evaluated.value == 22
+        assert type(body.condition) is IntLessThan
+        assert type(body.consequence.statements[0].expression) is IntAdd
+        assert (evaluator.specialized, evaluator.deoptimized) == (3, 0)
+
+    def test_guard_failure_deoptimizes(self):
+        program = parse('let add = fn(a, b) { a + b }; let n = add(1, 2); add("a", "b")')
+        evaluator = QuickeningEvaluator()
+        evaluated = evaluator.eval(program, Environment())
+
+        site = program.statements[0].value.body.statements[0].expression
+        assert evaluated.value == "ab"
+        assert type(site) is GenericInfixExpression
+        assert (evaluator.specialized, evaluator.deoptimized) == (1, 1)
+
+        evaluator.eval(parse("add(3, 4)"), Environment())
+        assert type(site) is GenericInfixExpression
+
+    def test_errors_do_not_deoptimize(self):
+        program = parse("let f = fn(a) { a * 2 }; let n = f(1); f(-true)")
+        evaluator = QuickeningEvaluator()
+        evaluated = evaluator.eval(program, Environment())
+
+        assert evaluated.message == "Unknown operator: -BOOLEAN"
+        assert evaluator.deoptimized == 0
+
+    def test_other_engines_run_quickened_ast(self):
+        source = 'let f = fn(x) { if (x < 10) { x + 1 } else { x * 2 } }; let add = fn(a, b) { a + b }; let s = add("a", "b"); f(1) + f(20) + add(1, 2)'
+        program = parse(source)
+        expected = QuickeningEvaluator().eval(program, Environment()).inspect()
+        assert type(program.statements[0].value.body.statements[0].expression.condition) is IntLessThan
+        assert type(program.statements[1].value.body.statements[0].expression) is GenericInfixExpression
+
+        for engine in ENGINES:
+            assert ENGINES[engine]().execute(program).inspect() == expected, engine
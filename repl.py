@@ -1,26 +1,27 @@
-import sys
+import argparse
 
-from monkey.evaluator import Evaluator
-from monkey.lexer import Lexer
-from monkey.environment import Environment
-from monkey.parser import Parser
-from monkey.token import Token, TokenType
+from monkey.interpreter import ENGINES, Interpreter
 
 PROMPT = '>> '
 
-def start():
-    env = Environment()
+def start(engine: str = "eval", optimize: bool = False):
+    interpreter = Interpreter(engine, optimize)
     while True:
         line = input(PROMPT)
         if 'q' == line.rstrip():
             break
-        lexer = Lexer(line)
-        parser = Parser(lexer)
-        program = parser.parse_program()
-        evaluated = Evaluator().eval(program, env)
+        try:
+            evaluated = interpreter.run(line)
+        except SyntaxError as error:
+            print(error)
+            continue
 
         if evaluated:
             print(evaluated.inspect())
 
 if __name__ == '__main__':
-    start()
+    arg_parser = argparse.ArgumentParser(description="Monkey REPL")
+    arg_parser.add_argument("--engine", choices=list(ENGINES), default="eval")
+    arg_parser.add_argument("--optimize", action="store_true", help="fold constants and prune dead branches first")
+    args = arg_parser.parse_args()
+    start(args.engine, args.optimize)
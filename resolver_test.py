@@ -0,0 +1,63 @@
+import unittest
+
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+from monkey.resolver import Resolver, Scope
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class ResolverTest(unittest.TestCase):
+    def test_lexical_addresses(self):
+        program = parse("let a = 1; fn(x) { let y = x; fn(z) { a + y + z + len } }")
+        Resolver(Scope()).resolve_program(program)
+
+        outer = program.statements[1].expression
+        assert outer.scope.names == ["x", "y"]
+
+        inner = outer.body.statements[1].expression
+        a_plus_y, z = inner.body.statements[0].expression.left.left, inner.body.statements[0].expression.left.right
+        a, y = a_plus_y.left, a_plus_y.right
+        assert (a.depth, a.slot) == (2, 0)
+        assert (y.depth, y.slot) == (1, 1)
+        assert (z.depth, z.slot) == (0, 0)
+
+        builtin = inner.body.statements[0].expression.right
+        assert (builtin.depth, builtin.slot) == (2, 1) and builtin.builtin is not None
+
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "let x = 1; let f = fn() { let y = x; let x = 2; y + x }; f()",
+            "let f = fn(c) { if (c) { let v = 1; } v }; f(false)",
+            "let len = fn(x) { 42 }; len(\"abc\")",
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(parse(input), Environment())
+            actual = Interpreter("resolved").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_globals_persist_between_runs(self):
+        interpreter = Interpreter("resolved")
+        interpreter.run("let a = 2;")
+        interpreter.run("let twice = fn(x) { x * a };")
+
+        assert interpreter.run("twice(21)").value == 42
+
+    def test_globals_shadow_builtins_between_runs(self):
+        programs = ["let f = fn(x) { len(x) };", "f(\"abc\")", "let len = fn(x) { 42 };", "f(\"abc\")"]
+
+        env = Environment()
+        expected = [Evaluator().eval(parse(input), env) for input in programs]
+        interpreter = Interpreter("resolved")
+        actual = [interpreter.run(input) for input in programs]
+
+        assert [r and r.inspect() for r in actual] == [r and r.inspect() for r in expected]
+        assert actual[-1].value == 42
@@ -0,0 +1,64 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.objects import Object
+from monkey.parser import Parser
+from monkey.stack_evaluator import StackEvaluator
+from vm_test import PROGRAMS
+
+
+class StackEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case through the explicit-stack evaluator.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        program = Parser(Lexer(input)).parse_program()
+        return StackEvaluator().eval(program, Environment())
+
+
+class StackEvaluatorTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        for input in PROGRAMS:
+            program = Parser(Lexer(input)).parse_program()
+            expected = Evaluator().eval(program, Environment())
+            actual = Interpreter("stack").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_deep_recursion(self):
+        evaluated = Interpreter("stack").run(
+            "let count = fn(n) { if (n == 0) { 0 } else { 1 + count(n - 1) } }; count(5000)")
+
+        assert evaluated.value == 5000
+
+    def test_max_depth(self):
+        evaluated = Interpreter("stack", max_depth=100).run(
+            "let count = fn(n) { if (n == 0) { 0 } else { 1 + count(n - 1) } }; count(101)")
+
+        assert evaluated.message == "Maximum call depth exceeded"
+
+    def test_map_calls_back_on_the_stack(self):
+        count = "let count = fn(n) { if (n == 0) { 0 } else { 1 + count(n - 1) } };"
+
+        evaluated = Interpreter("stack").run(count + "map([5000], count)")
+        assert evaluated.inspect() == "[5000]"
+
+        evaluated = Interpreter("stack", max_depth=100).run(count + "map([5000], count)")
+        assert evaluated.message == "Maximum call depth exceeded"
+
+    def test_nested_map_recursion(self):
+        evaluated = Interpreter("stack").run(
+            "let f = fn(n) { if (n == 0) { 0 } else { first(map([n - 1], f)) + 1 } }; f(5000)")
+
+        assert evaluated.message == "Maximum call depth exceeded"
+
+    def test_tail_calls_do_not_count_towards_depth(self):
+        evaluated = Interpreter("stack", max_depth=10).run(
+            "let count = fn(n) { if (n == 0) { return 0; } return count(n - 1); }; count(1000)")
+
+        assert evaluated.value == 0
@@ -0,0 +1,98 @@
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+from monkey.lexer import tokenize
+from monkey.parser import Parser
+from monkey.stream_lexer import StreamLexer, stream_tokens
+from vm_test import PROGRAMS
+
+
+SOURCES = PROGRAMS + [
+    'let greeting = "héllo, wörld"; let ünicode = 1 != 2 == true;',
+    '"a long string literal that spans several chunks" + "" + "x"',
+    'let x = 12345678901234567890; x == x',
+    '"unterminated',
+    '   \n\t ',
+    '',
+]
+
+
+def pairs(tokens) -> list:
+    return [(t.token_type, t.literal) for t in tokens]
+
+
+class ChunkedReader(io.RawIOBase):
+    # A binary file that produces `repeat` copies of text without holding
+    # them, and counts the bytes handed out per read.
+    def __init__(self, text: bytes, repeat: int) -> None:
+        self.text = text
+        self.position = 0
+        self.remaining = len(text) * repeat
+        self.largest_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        size = min(size, self.remaining)
+        offset = self.position % len(self.text)
+        data = (self.text * (size // len(self.text) + 2))[offset:offset + size]
+        self.position += size
+        self.remaining -= size
+        self.largest_read = max(self.largest_read, size)
+        return data
+
+
+class StreamLexerTest(unittest.TestCase):
+    def test_buffers_match_tokenize(self):
+        for source in SOURCES:
+            expected = pairs(tokenize(source))
+            data = source.encode("utf-8")
+
+            for buffer in [source, data, bytearray(data), memoryview(data)]:
+                assert pairs(stream_tokens(buffer)) == expected, (source, type(buffer))
+
+    def test_chunk_boundaries(self):
+        # Every chunk size up to 9 splits some identifier, number, string,
+        # two-character operator and multi-byte character.
+        for source in SOURCES:
+            expected = pairs(tokenize(source))
+            for chunk_size in range(1, 10):
+                binary = io.BytesIO(source.encode("utf-8"))
+                assert pairs(stream_tokens(binary, chunk_size)) == expected, (source, chunk_size)
+                text = io.StringIO(source)
+                assert pairs(stream_tokens(text, chunk_size)) == expected, (source, chunk_size)
+
+    def test_mmap(self):
+        source = "\n".join(SOURCES)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "program.monkey")
+            with open(path, "wb") as file:
+                file.write(source.encode("utf-8"))
+
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                assert pairs(stream_tokens(mapped)) == pairs(tokenize(source))
+                # The view on the mapping is released, so it can be closed.
+
+            with open(path, encoding="utf-8") as file:
+                assert pairs(stream_tokens(file, 16)) == pairs(tokenize(source))
+
+    def test_reads_stay_bounded(self):
+        reader = ChunkedReader(b"let x = fn(a) { a + 1 };\n", 100000)
+        tokens = stream_tokens(reader, 4096)
+
+        count = 0
+        for token in tokens:
+            count += 1
+        assert count == 13 * 100000 + 1
+        assert reader.largest_read == 4096
+
+    def test_parser_reads_stream_lexer(self):
+        source = "let add = fn(a, b) { a + b }; add(\"é\", [1, 2][0])"
+        expected = str(Parser(StreamLexer(source)).parse_program())
+        for chunk_size in (1, 3, 64):
+            program = Parser(StreamLexer(io.BytesIO(source.encode("utf-8")), chunk_size)).parse_program()
+            assert str(program) == expected
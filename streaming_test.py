@@ -0,0 +1,63 @@
+import io
+import unittest
+
+from arrays_test import PROGRAMS as COLLECTION_PROGRAMS
+from monkey.interpreter import Interpreter
+from monkey.parser import Parser
+from monkey.stream_lexer import StreamLexer
+from vm_test import PROGRAMS
+
+
+ENGINES = ["eval", "stack", "quick", "tiered", "pooled"]
+
+
+class StreamingTest(unittest.TestCase):
+    def test_matches_run(self):
+        for engine in ENGINES:
+            for source in PROGRAMS + COLLECTION_PROGRAMS:
+                expected = Interpreter(engine).run(source)
+                actual = Interpreter(engine).run_stream(source)
+                assert (actual and actual.inspect()) == (expected and expected.inspect()), (engine, source)
+
+    def test_optimized_matches_run(self):
+        for source in PROGRAMS:
+            expected = Interpreter().run(source)
+            actual = Interpreter(optimize=True).run_stream(source)
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), source
+
+    def test_yields_each_statement_as_it_runs(self):
+        source = io.StringIO("let a = 2; a * 3; let f = fn(x) { x + a }; f(10)")
+        results = Interpreter().stream(source)
+
+        assert next(results) is None
+        assert next(results).inspect() == "6"
+        assert next(results) is None
+        assert next(results).inspect() == "12"
+        assert next(results, "done") == "done"
+
+    def test_stops_at_return_and_errors(self):
+        source = "1; if (true) { return 2; }; 3"
+        assert [r.inspect() for r in Interpreter().stream(source)] == ["1", "2"]
+
+        source = "1; 1 + true; 3"
+        assert [r.inspect() for r in Interpreter().stream(source)] == ["1", "ERROR: Type mismatch: INTEGER + BOOLEAN"]
+
+    def test_runs_statements_before_a_syntax_error(self):
+        interpreter = Interpreter()
+        results = interpreter.stream(b"let a = 5; a; let b 3; a")
+
+        assert next(results) is None
+        assert next(results).inspect() == "5"
+        with self.assertRaises(SyntaxError) as raised:
+            next(results)
+        assert str(raised.exception) == "expected next token to be ASSIGN, got INT instead"
+        assert interpreter.run("a").inspect() == "5"
+
+    def test_parser_yields_statements(self):
+        for source in PROGRAMS:
+            expected = [str(s) for s in Parser(StreamLexer(source)).parse_program().statements]
+            assert [str(s) for s in Parser(StreamLexer(source)).parse_statements()] == expected, source
+
+    def test_engines_without_stream(self):
+        with self.assertRaises(ValueError):
+            Interpreter("vm").stream("1")
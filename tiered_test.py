@@ -0,0 +1,119 @@
+import unittest
+
+import pytest
+
+import eval_test
+from monkey import ast
+from monkey.codegen import PythonGenerator, fast_locals
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.objects import Object
+from monkey.parser import Parser
+from monkey.tiered import TieredEvaluator
+from vm_test import PROGRAMS
+
+
+def parse(input: str):
+    return Parser(Lexer(input)).parse_program()
+
+
+class TieredEvalTest(eval_test.EvalTest):
+    # Re-runs every EvalTest case with each function promoted on first call.
+    @pytest.mark.skip(reason="Don't test helper function")
+    def test_eval(self, input: str) -> Object:
+        return TieredEvaluator(threshold=1).eval(parse(input), Environment())
+
+
+class TieredTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "let x = 1; let f = fn() { let y = x; let x = 2; y + x }; f()",
+            "let f = fn(c) { if (c) { let v = 1; } v }; f(false)",
+            "let f = fn(a, a) { a }; f(1, 2)",
+            "let f = fn(n) { let m = n * 2; if (m > 4) { return m; } -m }; f(1) + f(3)",
+            "let f = fn(s) { s + \"!\" }; f(\"hi\")",
+            "let f = fn(b) { !b }; f(f(true))",
+            "let f = fn(x) { let g = fn() { x + y }; let y = 2; g() }; f(1)",
+            "let f = fn(n) { if (n < 1) { 0 } else { n + f(n - 1) } }; f(30)",
+        ]
+
+        for threshold in [1, 3]:
+            for input in programs:
+                expected = Evaluator().eval(parse(input), Environment())
+                actual = Interpreter("tiered", threshold=threshold).run(input)
+
+                assert (actual and actual.inspect()) == (expected and expected.inspect()), (threshold, input)
+
+    def test_hot_functions_are_promoted(self):
+        interpreter = Interpreter("tiered", threshold=10)
+        evaluated = interpreter.run("let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(15)")
+        report = interpreter.engine.evaluator.report()
+
+        assert evaluated.value == 610
+        assert [(s.name, s.promoted_after) for s in report] == [("fib", 10)]
+
+    def test_results_do_not_change_on_promotion(self):
+        # A return inside an expression only makes its value a ReturnValue, so
+        # those bodies stay interpreted; the statement-position one is promoted.
+        for body, promoted in [
+            ("let x = if (true) { return 1; }; 5", []),
+            ("let x = 2 * if (true) { return 1; }; 5", []),
+            ("if (true) { return 1; }; 5", [3]),
+        ]:
+            program = f"let f = fn() {{ {body} }}; [f(), f(), f(), f(), f()]"
+            expected = Evaluator().eval(parse(program), Environment())
+            interpreter = Interpreter("tiered", threshold=3)
+
+            assert interpreter.run(program).inspect() == expected.inspect(), body
+            assert [s.promoted_after for s in interpreter.engine.evaluator.report()] == promoted, body
+
+    def test_tiering_can_be_disabled(self):
+        interpreter = Interpreter("tiered", threshold=1, tiering=False)
+        interpreter.run("let double = fn(x) { x * 2 }; double(double(2))")
+
+        assert interpreter.engine.evaluator.report() == []
+
+    def test_profile_reports_speedup(self):
+        interpreter = Interpreter("tiered", threshold=20, profile=True)
+        interpreter.run("let sum = fn(n, acc) { if (n == 0) { acc } else { sum(n - 1, acc + n) } }; sum(200, 0)")
+        stats, = interpreter.engine.evaluator.report()
+
+        assert (stats.interpreted_calls, stats.compiled_calls) == (19, 182)
+        assert stats.speedup > 0
+
+    def test_compiled_tail_calls_use_constant_stack(self):
+        evaluated = Interpreter("tiered", threshold=1).run(
+            "let count = fn(n) { if (n == 0) { return 0; } return count(n - 1); }; count(10000)")
+
+        assert evaluated.value == 0
+
+    def test_fast_locals(self):
+        tests = [
+            ("fn(a, b) { let c = a + b; c * 2 }", {"a", "b", "c"}),
+            ("fn(a) { let b = a; let a = 2; b + a }", {"a", "b"}),
+            ("fn(a) { let b = c; let c = 2; b }", None),
+            ("fn(a) { if (a) { let b = 1; } b }", None),
+            ("fn(a) { fn() { a } }", None),
+        ]
+
+        for input, expected in tests:
+            literal = parse(input).statements[0].expression
+            assert fast_locals(literal) == expected, input
+
+    def test_generated_source(self):
+        literal = parse("fn(n) { n + 1 }").statements[0].expression
+        generator = PythonGenerator()
+        generator.function(literal, "inc")
+
+        assert generator.source() == (
+            "def inc(env, v_n):\n"
+            "    if type(v_n) is Integer and type(k0) is Integer:\n"
+            "        t1 = Integer(v_n.value + k0.value)\n"
+            "    else:\n"
+            "        t1 = infix('+', v_n, k0)\n"
+            "        if type(t1) is Error:\n"
+            "            return t1\n"
+            "    return t1\n"
+        )
@@ -0,0 +1,81 @@
+import unittest
+import unittest.mock
+
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer, tokenize
+from monkey.parser import Parser
+from monkey.token import TokenType
+from monkey.token_stream import CHUNK_SIZE, TokenStream
+from vm_test import PROGRAMS
+
+
+SOURCE = 'let add = fn(a, b) {\n  a + b;\n};\nadd("x y", 10) != ""'
+
+
+class TokenStreamTest(unittest.TestCase):
+    def test_matches_tokenize(self):
+        for source in PROGRAMS + [SOURCE, "", "  ", '"open string', "x @ y"]:
+            stream = TokenStream(source)
+            expected = [(t.token_type, t.literal) for t in tokenize(source)]
+
+            assert [(stream.token_type(i), stream.literal(i)) for i in range(len(stream))] == expected, source
+
+    def test_columns(self):
+        stream = TokenStream(SOURCE)
+
+        assert stream.types.itemsize == 1 and stream.starts.itemsize == 4
+        assert stream.text(18) == '"x y"' and stream.literal(18) == "x y"
+        assert stream.token_type(len(stream) - 1) == TokenType.EOF
+        assert stream.starts[-1] == len(SOURCE) and stream.lengths[-1] == 0
+
+    def test_line_column(self):
+        stream = TokenStream(SOURCE)
+        positions = {}
+        for i in range(len(stream)):
+            positions.setdefault(stream.text(i), stream.line_column(i))
+
+        assert positions["let"] == (1, 1)
+        assert positions["{"] == (1, 20)
+        assert positions[";"] == (2, 8)
+        assert positions['"x y"'] == (4, 5)
+        assert stream.line_column(len(stream) - 1) == (4, 21)
+
+    def test_sources_longer_than_a_chunk(self):
+        source = "x + 1;\n" * CHUNK_SIZE
+        stream = TokenStream(source)
+
+        assert len(stream) == 4 * CHUNK_SIZE + 1
+        assert stream.line_column(len(stream) - 2) == (CHUNK_SIZE, 6)
+
+    def test_parser_reads_stream(self):
+        for source in PROGRAMS + [SOURCE]:
+            expected = str(Parser(Lexer(source)).parse_program())
+            assert str(Parser(TokenStream(source)).parse_program()) == expected, source
+
+    def test_parse_errors_have_locations(self):
+        parser = Parser(TokenStream("let x = 1;\nlet y = (2 + ;\nlet z 3;"))
+        parser.parse_program()
+
+        assert parser.errors == [
+            "2:14: no prefix parse function for SEMICOLON found",
+            "3:1: expected next token to be RPAREN, got LET instead",
+            "3:7: expected next token to be ASSIGN, got INT instead",
+        ]
+
+        parser = Parser(Lexer("let z 3;"))
+        parser.parse_program()
+        assert parser.errors == ["expected next token to be ASSIGN, got INT instead"]
+
+    def test_interpreter_raises_syntax_errors(self):
+        with self.assertRaises(SyntaxError) as raised:
+            Interpreter().run("if (x { 1 }")
+        assert str(raised.exception).splitlines()[0] == "1:7: expected next token to be RPAREN, got LBRACE instead"
+
+    def test_streams_are_built_only_for_errors(self):
+        with unittest.mock.patch("monkey.interpreter.TokenStream", wraps=TokenStream) as stream:
+            assert Interpreter().run("let a = 2; a * 3").value == 6
+            stream.assert_not_called()
+
+            with self.assertRaises(SyntaxError):
+                Interpreter().run("let = 1;")
+            stream.assert_called_once_with("let = 1;")
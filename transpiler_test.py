@@ -0,0 +1,105 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from monkey.__main__ import main
+from monkey.codegen import GenerateError
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+from monkey.transpiler import load, module_path, transpile, transpile_file
+from vm_test import PROGRAMS
+
+
+def run_transpiled(source: str):
+    namespace = {}
+    exec(compile(transpile(source), "<transpiled>", "exec"), namespace)
+    return namespace["run"]()
+
+
+class TranspilerTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        programs = PROGRAMS + [
+            "let x = 1; let f = fn() { let y = x; let x = 2; y + x }; f()",
+            "let f = fn(c) { if (c) { let v = 1; } v }; f(false)",
+            "let newAdder = fn(x) { fn(y) { fn(z) { x + y + z } } }; newAdder(1)(2)(3)",
+            "let count = fn(n) { if (n == 0) { return 0; } return count(n - 1); }; count(10000)",
+            "if (true) { return 5; } 10",
+        ]
+
+        for input in programs:
+            expected = Evaluator().eval(Parser(Lexer(input)).parse_program(), Environment())
+            actual = run_transpiled(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_module_is_cached_next_to_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "answer.monkey"
+            source.write_text("let answer = fn() { 6 * 7 }; answer()")
+
+            target = transpile_file(source)
+            assert target == module_path(source) == Path(directory) / "answer_monkey.py"
+            assert load(source).run().value == 42
+
+            os.utime(target, (0, 0))
+            transpile_file(source)
+            assert target.stat().st_mtime == 0
+
+            source.write_text("let answer = fn() { 6 * 8 }; answer()")
+            transpile_file(source)
+            assert target.stat().st_mtime != 0
+            assert load(source).run().value == 48
+
+    def test_run_subcommand(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "error.monkey"
+            source.write_text("let f = fn(x) { x + true }; f(1)")
+
+            with unittest.mock.patch("builtins.print") as printed:
+                main(["run", str(source)])
+
+            printed.assert_called_once_with("ERROR: Type mismatch: INTEGER + BOOLEAN")
+
+    def test_runs_like_evaluator(self):
+        tests = [
+            ("sum(map(range(0, 3), fn(x) { x * 2 }))", "6"),
+            ("collect(filter(iter(range(4)), fn(x) { x > 1 }))", "[2, 3]"),
+            ("let g = fn(n) { if (n == 0) { return 0; } return n + g(n - 1); }; g(100000)", "ERROR: Maximum call depth exceeded"),
+        ]
+        for input, expected in tests:
+            assert run_transpiled(input).inspect() == expected, input
+
+        # Evaluator only turns the let value into a ReturnValue, which a
+        # Python return cannot express.
+        with self.assertRaises(GenerateError):
+            transpile("let f = fn() { let x = if (true) { return 1; }; 5 }; f()")
+
+    def test_parse_errors_are_reported(self):
+        with self.assertRaises(SyntaxError) as raised:
+            transpile("let x = 1; let = 2; x")
+        assert str(raised.exception) == "expected next token to be IDENT, got ASSIGN instead\nno prefix parse function for ASSIGN found"
+
+        with self.assertRaises(GenerateError):
+            transpile("[1, 2][0]")
+
+    def test_cli_reports_untranslatable_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, source, message in [
+                ("bad.monkey", "let = 2;", "expected next token to be IDENT, got ASSIGN instead"),
+                ("array.monkey", "let a = [1, 2]; len(a)", "cannot generate ArrayLiteral"),
+            ]:
+                path = Path(directory) / name
+                path.write_text(source)
+                for argv in (["transpile", str(path)], ["run", str(path)]):
+                    stderr = io.StringIO()
+                    with self.assertRaises(SystemExit) as exited, contextlib.redirect_stderr(stderr):
+                        main(argv)
+                    assert exited.exception.code == 1
+                    assert stderr.getvalue().startswith(f"python -m monkey: {path}: {message}")
+                assert not module_path(path).exists()
@@ -0,0 +1,113 @@
+import unittest
+
+from monkey.environment import Environment
+from monkey.evaluator import Evaluator
+from monkey.interpreter import Interpreter
+from monkey.lexer import Lexer
+from monkey.parser import Parser
+
+
+PROGRAMS = [
+    "5",
+    "-10",
+    "(5 + 10 * 2 + 15 / 3) * 2 + -10",
+    "1 < 2",
+    "(1 > 2) == false",
+    "!5",
+    "!!true",
+    "if (1 > 2) { 10 }",
+    "if (1 > 2) { 10 } else { 20 }",
+    "if (10 > 1) { if (10 > 1) { return 10; } return 1; }",
+    "5 + true; 5;",
+    "-true",
+    "true + false;",
+    "if (10 > 1) { true + false; }",
+    "foobar",
+    "let a = 5; let b = a; let c = a + b + 5; c;",
+    "let add = fn(x, y) { x + y; }; add(5 + 5, add(5, 5));",
+    "fn(x) { x; }(5)",
+    '"Hello" + " " + "World!"',
+    '"Hello" - "World"',
+    'len("four")',
+    'len(1)',
+    'len("one", "two")',
+    "let newAdder = fn(x) { fn(y) { x + y } }; let addTwo = newAdder(2); addTwo(3);",
+    "let a = 1; let f = fn() { a }; let a = 2; f()",
+    "let fib = fn(x) { if (x < 2) { x } else { fib(x - 1) + fib(x - 2) } }; fib(15)",
+    "let f = fn() { let g = fn() { h() }; let h = fn() { 7 }; g() }; f()",
+    "let counter = fn(x) { if (x > 100) { return true; } counter(x + 1); }; counter(0)",
+    "let f = fn(x) { let y = x * 2; y + 1 }; f(3) + f(4)",
+    "1(2)",
+    "let add = fn(a, b) { a + b }; add(1, add(2, -true)) + 1",
+    "let add = fn(a, b) { a + b }; let x = add(1, 2 + add(3, 4)); x * 2",
+    "fn(a, b) { a }(1)",
+    "fn(a) { a }(1, 2)",
+    "let f = fn(n) { if (n == 0) { 0 } else { f(n - 1, n) } }; f(3)",
+]
+
+
+class VMTest(unittest.TestCase):
+    def test_matches_evaluator(self):
+        for input in PROGRAMS:
+            program = Parser(Lexer(input)).parse_program()
+            expected = Evaluator().eval(program, Environment())
+            actual = Interpreter("vm").run(input)
+
+            assert (actual and actual.inspect()) == (expected and expected.inspect()), input
+
+    def test_integer_arithmetic(self):
+        tests = [
+            ("1 + 2", 3),
+            ("50 / 2 * 2 + 10", 60),
+            ("-50 + 100 + -50", 0),
+            ("let x = 7; x * x", 49),
+        ]
+
+        for input, expected in tests:
+            assert Interpreter("vm").run(input).value == expected
+
+    def test_wrong_number_of_arguments(self):
+        evaluated = Interpreter("vm").run("fn(a, b) { a }(1)")
+
+        assert evaluated.message == "wrong number of arguments: want=2, got=1"
+
+    def test_bindings_persist_between_runs(self):
+        interpreter = Interpreter("vm")
+        interpreter.run("let double = fn(x) { x * 2 };")
+        interpreter.run("let four = double(2);")
+
+        assert interpreter.run("double(four)").value == 8
+
+    def test_deep_recursion(self):
+        evaluated = Interpreter("vm").run(
+            "let count = fn(n) { if (n == 0) { 0 } else { 1 + count(n - 1) } }; count(5000)")
+
+        assert evaluated.value == 5000
+
+    def test_constants_do_not_grow_between_runs(self):
+        interpreter = Interpreter("vm")
+        for _ in range(3):
+            interpreter.run('1 + 2; "x"')
+
+        assert len(interpreter.engine.constants) == 3
+
+    def test_matches_evaluator_semantics(self):
+        tests = [
+            ('"a" == "a"', "False"),
+            ('let s = "a"; s == s', "True"),
+            ('let f = fn() { "x" }; f() == f()', "False"),
+            ("1 / 0", "ERROR: Division by zero"),
+            ("let f = fn(x) { 10 / x }; f(5) + f(0)", "ERROR: Division by zero"),
+            ("{fn(x) { x }: 1}", "ERROR: unusable as hash key: FUNCTION"),
+        ]
+
+        for input, expected in tests:
+            assert Interpreter("eval").run(input).inspect() == expected, input
+            assert Interpreter("vm").run(input).inspect() == expected, input
+
+    def test_programs_too_large_are_errors(self):
+        interpreter = Interpreter("vm")
+        interpreter.engine.constants.extend([None] * 65536)
+        evaluated = interpreter.run("fn() { 1 }")
+
+        assert evaluated.message == "program too large: CONSTANT operand 65536 does not fit in 2 byte(s)"